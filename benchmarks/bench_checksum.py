@@ -0,0 +1,30 @@
+"""
+Check that checksum.compute_fast matches checksum.compute bit for bit and compare their speed.
+
+    python benchmarks/bench_checksum.py [--number N]
+"""
+
+import argparse
+import os
+import timeit
+
+from pydualsense.checksum import compute, compute_fast
+
+
+def run(number: int) -> None:
+    buffers = [bytes([0x31]) + os.urandom(77) for _ in range(1000)]
+    for buffer in buffers:
+        assert compute(buffer) == compute_fast(buffer) == compute_fast(list(buffer)), buffer.hex()
+        assert compute(bytearray(buffer)) == compute_fast(bytearray(buffer)) == compute_fast(memoryview(buffer))
+    print(f"compute_fast matches compute on {len(buffers)} random reports")
+
+    buffer = bytearray(buffers[0])
+    for name, func in (("compute", lambda: compute(buffer)), ("compute_fast", lambda: compute_fast(buffer))):
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        print(f"{name:15s} {number / seconds:12,.0f} reports/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    run(parser.parse_args().number)
@@ -0,0 +1,51 @@
+"""
+Compare DeviceInputState.from_state with the struct based FastInputState decoder.
+
+    python benchmarks/bench_decode.py [--number N]
+"""
+
+import argparse
+import random
+import timeit
+
+from pydualsense.decoder import FastInputState
+from pydualsense.models import DeviceInputState
+
+
+def sample_reports(count: int = 64, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    reports = []
+    for _ in range(count):
+        report = bytearray(rng.getrandbits(8) for _ in range(64))
+        report[0] = 0x01
+        reports.append(bytes(report))
+    return reports
+
+
+def run(number: int) -> None:
+    reports = sample_reports()
+    model = DeviceInputState()
+    fast = FastInputState()
+
+    def decode_model():
+        for report in reports:
+            model.from_state(report)
+
+    def decode_fast():
+        for report in reports:
+            fast.from_state(report)
+
+    results = {}
+    for name, func in (("DeviceInputState.from_state", decode_model), ("FastInputState.from_state", decode_fast)):
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        results[name] = number * len(reports) / seconds
+        print(f"{name:30s} {results[name]:12,.0f} reports/s")
+
+    speedup = results["FastInputState.from_state"] / results["DeviceInputState.from_state"]
+    print(f"{'speedup':30s} {speedup:12.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200)
+    run(parser.parse_args().number)
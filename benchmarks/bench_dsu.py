@@ -0,0 +1,84 @@
+"""
+Throughput and end-to-end latency of the DSU server over loopback.
+
+    python benchmarks/bench_dsu.py [--reports N] [--clients N] [--bt]
+
+Reports of a virtual controller are fed through DualsenseController.process_report as fast as possible; every
+subscribed DsuClient receives the packets in its own thread. Latency is measured from the start of process_report
+to the arrival of the packet in the client.
+"""
+
+import argparse
+import threading
+import time
+
+from pydualsense.dsu import DsuClient, DsuServer
+from pydualsense.enums import ConnectionType
+from pydualsense.pydualsense import DualsenseController
+from pydualsense.virtual import VirtualDualsense
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(reports: int, clients: int, connection_type: ConnectionType) -> None:
+    virtual = VirtualDualsense(connection_type, rate_hz=None)
+    controller = DualsenseController(transport=virtual, start_reader=False)
+    length = connection_type.get_in_report_length()
+    server = DsuServer(port=0)
+    server.add(controller)
+
+    subscribers = [DsuClient(port=server.address[1]) for _ in range(clients)]
+    for client in subscribers:
+        client.subscribe(slot=0)
+    while any(len(slot.targets) < clients for slot in server.slots if slot is not None):
+        time.sleep(0.01)
+
+    sent_ns = [0] * (reports + 1)  # by packet number
+    latencies: list[list[int]] = [[] for _ in subscribers]
+
+    def receive(client: DsuClient, results: list) -> None:
+        while True:
+            data = client.receive(timeout=0.5)
+            if data is None:
+                return
+            results.append(data.received_ns - sent_ns[data.packet_number])
+
+    threads = [
+        threading.Thread(target=receive, args=(client, results)) for client, results in zip(subscribers, latencies)
+    ]
+    for thread in threads:
+        thread.start()
+
+    start = time.perf_counter()
+    for number in range(1, reports + 1):
+        report = virtual.read(length)
+        sent_ns[number] = time.perf_counter_ns()
+        controller.process_report(report)  # type: ignore
+    elapsed = time.perf_counter() - start
+
+    for thread in threads:
+        thread.join()
+    server.close()
+    controller.close()
+
+    print(f"{connection_type.name}, {clients} client(s): {reports / elapsed:,.0f} reports/s served")
+    for index, results in enumerate(latencies):
+        if not results:
+            print(f"  client {index}: nothing received")
+            continue
+        print(
+            f"  client {index}: {len(results) / reports:6.1%} received,"
+            f" latency p50 {percentile(results, 0.5) / 1e3:.1f} us p99 {percentile(results, 0.99) / 1e3:.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=1)
+    parser.add_argument("--bt", action="store_true", help="serve BT reports instead of USB reports")
+    arguments = parser.parse_args()
+    run(arguments.reports, arguments.clients, ConnectionType.BT if arguments.bt else ConnectionType.USB)
@@ -0,0 +1,420 @@
+"""
+Benchmark suite for the report hot paths.
+
+    python benchmarks/suite.py [--json results.json] [--filter decode] [--min-time 0.2]
+
+Every case reports operations per second and two allocation figures: the peak traced memory of a single operation
+and the number of memory blocks that are still alive per operation afterwards (non zero means something is kept).
+With --json the results are written machine readable, so runs of different releases can be compared.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+import weakref
+from importlib import metadata
+from typing import Callable
+
+from pydualsense import checksum, force_feedback
+from pydualsense.decoder import FastInputState
+from pydualsense.enums import ConnectionType
+from pydualsense.models import DeviceInputState, DeviceOutputState
+from pydualsense.motion import MotionTracker
+from pydualsense.pydualsense import DualsenseController
+from pydualsense.virtual import VirtualDualsense
+
+CASES: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def case(name: str):
+    """Register a setup function returning the operation to measure."""
+
+    def register(setup):
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+def random_report(connection_type: ConnectionType, seed: int = 0) -> bytes:
+    virtual = VirtualDualsense(connection_type, rate_hz=None)
+    rng = random.Random(seed)
+    virtual.sticks = [rng.randrange(256) for _ in range(4)]
+    virtual.triggers = [rng.randrange(256) for _ in range(2)]
+    virtual.gyro = [rng.randrange(-32768, 32768) for _ in range(3)]
+    return virtual.read(100)  # type: ignore
+
+
+@case("decode.DeviceInputState.usb")
+def _decode_usb():
+    state, report = DeviceInputState(), random_report(ConnectionType.USB)
+    return lambda: state.from_state(report)
+
+
+@case("decode.DeviceInputState.bt")
+def _decode_bt():
+    state, report = DeviceInputState(), random_report(ConnectionType.BT)
+    return lambda: state.from_state(report[1:])
+
+
+@case("decode.FastInputState.usb")
+def _fast_decode_usb():
+    state, report = FastInputState(), random_report(ConnectionType.USB)
+    return lambda: state.from_state(report)
+
+
+@case("decode.FastInputState.bt")
+def _fast_decode_bt():
+    state, report = FastInputState(), random_report(ConnectionType.BT)
+    return lambda: state.from_state(report, 1)
+
+
+@case("motion.MotionTracker.process")
+def _motion():
+    tracker, report = MotionTracker(), bytearray(random_report(ConnectionType.USB))
+    tracker.process(report)
+
+    def process():
+        report[28] = (report[28] + 1) & 0xFF  # advance the sensor timestamp, so the filter runs
+        tracker.process(report)
+
+    return process
+
+
+def _batch_reports(connection_type: ConnectionType, count: int):
+    import numpy as np
+
+    reports = [random_report(connection_type, seed) for seed in range(count)]
+    return np.frombuffer(b"".join(reports), dtype=np.uint8).reshape(count, -1)
+
+
+@case("decode.batch_1024.usb")
+def _batch_decode_usb():
+    from pydualsense.batch import decode_reports
+
+    reports = _batch_reports(ConnectionType.USB, 1024)
+    return lambda: decode_reports(reports)
+
+
+@case("decode.batch_1024.bt")
+def _batch_decode_bt():
+    from pydualsense.batch import decode_reports
+
+    reports = _batch_reports(ConnectionType.BT, 1024)
+    return lambda: decode_reports(reports, 1)
+
+
+@case("encode.prepareReport.usb")
+def _encode_usb():
+    state = DeviceOutputState()
+    return lambda: state.prepareReport(ConnectionType.USB)
+
+
+@case("encode.prepareReport.bt")
+def _encode_bt():
+    state = DeviceOutputState()
+    return lambda: state.prepareReport(ConnectionType.BT)
+
+
+@case("checksum.compute")
+def _checksum():
+    report = bytearray(random_report(ConnectionType.BT))
+    return lambda: checksum.compute(report)
+
+
+@case("checksum.compute_fast")
+def _checksum_fast():
+    report = bytearray(random_report(ConnectionType.BT))
+    return lambda: checksum.compute_fast(report)
+
+
+@case("force_feedback.ffb_off")
+def _ffb_off():
+    return force_feedback.ffb_off
+
+
+@case("force_feedback.ffb_feedback")
+def _ffb_feedback():
+    return lambda: force_feedback.ffb_feedback(3, 6)
+
+
+@case("force_feedback.ffb_weapon")
+def _ffb_weapon():
+    return lambda: force_feedback.ffb_weapon(3, 6, 8)
+
+
+@case("force_feedback.ffb_vibration")
+def _ffb_vibration():
+    return lambda: force_feedback.ffb_vibration(2, 5, 40)
+
+
+@case("force_feedback.ffb_bow")
+def _ffb_bow():
+    return lambda: force_feedback.ffb_bow(1, 6, 4, 8)
+
+
+@case("force_feedback.ffb_galloping")
+def _ffb_galloping():
+    return lambda: force_feedback.ffb_galloping(1, 9, 2, 5, 40)
+
+
+@case("force_feedback.ffb_machine")
+def _ffb_machine():
+    return lambda: force_feedback.ffb_machine(1, 9, 3, 7, 5, 3)
+
+
+@case("force_feedback.effect_bow.cached")
+def _effect_bow():
+    return lambda: force_feedback.effect_bow(1, 6, 4, 8)
+
+
+@case("force_feedback.set_effect")
+def _set_effect():
+    trigger, effect = DeviceOutputState().triggerR, force_feedback.effect_machine(1, 9, 3, 7, 5, 3)
+    return lambda: trigger.set_effect(effect)
+
+
+@case("history.InputHistory.record")
+def _history_record():
+    from pydualsense.history import InputHistory
+
+    history, report = InputHistory(seconds=2.0), random_report(ConnectionType.USB)
+    return lambda: history.record(report)
+
+
+@case("history.InputHistory.axis_max_120ms")
+def _history_query():
+    from pydualsense.enums import Axis
+    from pydualsense.history import InputHistory
+
+    history, report = InputHistory(seconds=2.0), random_report(ConnectionType.USB)
+    for index in range(history.capacity):
+        history.record(report, timestamp=index / 1000)
+    now = (history.capacity - 1) / 1000
+    return lambda: history.axis_max(Axis.R2, 0.12, now)
+
+
+@case("combos.ComboRecognizer.process_64_combos")
+def _combos_process():
+    import itertools
+
+    from pydualsense.combos import ComboRecognizer
+    from pydualsense.enums import Button
+
+    rng = random.Random(0)
+    directions = [Button(0), Button.DpadUp, Button.DpadDown, Button.DpadLeft, Button.DpadRight]
+    directions += [Button.DpadDown | Button.DpadRight, Button.DpadDown | Button.DpadLeft]
+    face = [Button.Square, Button.Cross, Button.Circle, Button.Triangle, Button.L1, Button.R1]
+    combos = ComboRecognizer()
+    for index in range(64):
+        steps = [rng.choice(directions) for _ in range(rng.randint(2, 5))] + [rng.choice(face)]
+        combos.add(f"combo{index}", steps, lambda match: None)
+
+    # every report changes the buttons, so each one is decoded into symbols
+    reports = []
+    for _ in range(256):
+        report = bytearray(random_report(ConnectionType.USB))
+        report[8] = rng.randrange(9) | rng.choice((0, 0x10, 0x20, 0x40, 0x80))
+        report[9] = rng.choice((0, 0, 1, 2))
+        reports.append(report)
+    feed = itertools.cycle(reports)
+    return lambda: combos.process(next(feed), 0, 0.0)
+
+
+@case("gestures.GestureTracker.process_scroll")
+def _gestures_scroll():
+    import itertools
+
+    from pydualsense.gestures import GestureTracker
+
+    tracker, virtual = GestureTracker(), VirtualDualsense(ConnectionType.USB, rate_hz=None)
+    tracker.on_gesture(lambda event: None)
+    # two fingers moving up and down, every report changes the touch words
+    reports = []
+    for step in range(256):
+        y = 300 + abs(128 - step) * 2
+        virtual.set_touch(0, 800, y, 1)
+        virtual.set_touch(1, 1100, y, 2)
+        reports.append(virtual.read(64))
+    feed = itertools.cycle(reports)
+    return lambda: tracker.process(next(feed))
+
+
+@case("rumble.RumbleStream.apply")
+def _rumble_apply():
+    import numpy as np
+
+    from pydualsense.rumble import RumbleStream
+
+    stream, state = RumbleStream(1000.0, capacity_s=1.0), DeviceOutputState()
+    samples = np.random.default_rng(0).random((1000, 2))
+    clock = [0.0]
+
+    def apply():
+        if stream.queued == 0:
+            stream.write(samples)
+        clock[0] += 0.001  # one report period, so every call plays one sample
+        stream.apply(state, clock[0])
+
+    return apply
+
+
+@case("shared.publish_read_decode")
+def _shared():
+    from pydualsense.shared import SharedReportPublisher, SharedReportSubscriber
+
+    publisher = SharedReportPublisher(ConnectionType.USB, slots=64)
+    subscriber = SharedReportSubscriber(publisher.name)
+    report = random_report(ConnectionType.USB)
+
+    def publish_read_decode():
+        publisher.publish(report)
+        subscriber.read_next()
+        subscriber.decode()
+
+    weakref.finalize(publish_read_decode, publisher.close)  # remove the segment once the case is done
+    return publish_read_decode
+
+
+@case("dsu.DsuSlot.process")
+def _dsu():
+    from pydualsense.dsu import DsuClient, DsuServer
+
+    virtual = VirtualDualsense(ConnectionType.USB, rate_hz=None)
+    controller = DualsenseController(transport=virtual, start_reader=False)
+    server = DsuServer(port=0)
+    slot = server.add(controller)
+    client = DsuClient(port=server.address[1])
+    client.subscribe(slot=0)
+    while not slot.targets:
+        time.sleep(0.01)
+    report = random_report(ConnectionType.USB)
+
+    def process():
+        slot.process(report)
+        client.receive(timeout=None)
+
+    weakref.finalize(process, server.close)
+    return process
+
+
+def _cycle(connection_type: ConnectionType, change_output: bool):
+    virtual = VirtualDualsense(connection_type, rate_hz=None)
+    controller = DualsenseController(transport=virtual, start_reader=False)
+    length = connection_type.get_in_report_length()
+    output = controller.output_state
+    counter = [0]
+
+    def cycle():
+        report = virtual.read(length)
+        if controller.process_report(report):  # type: ignore
+            if change_output:
+                counter[0] = (counter[0] + 1) & 0xFF
+                output.rgb_led.R = counter[0] / 255.0
+            controller.write_output()
+
+    return cycle
+
+
+@case("cycle.usb.idle_output")
+def _cycle_usb_idle():
+    return _cycle(ConnectionType.USB, False)
+
+
+@case("cycle.usb.changing_output")
+def _cycle_usb_changing():
+    return _cycle(ConnectionType.USB, True)
+
+
+@case("cycle.bt.idle_output")
+def _cycle_bt_idle():
+    return _cycle(ConnectionType.BT, False)
+
+
+@case("cycle.bt.changing_output")
+def _cycle_bt_changing():
+    return _cycle(ConnectionType.BT, True)
+
+
+def measure(operation: Callable[[], object], min_time: float, repeat: int = 5) -> dict:
+    operation()  # warm up caches and lazy state
+
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    gc.collect()
+    tracemalloc.start()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    for _ in range(1000):
+        operation()
+    gc.collect()
+    retained = (sys.getallocatedblocks() - blocks) / 1000
+
+    return {
+        "ops_per_sec": 1 / best,
+        "ns_per_op": best * 1e9,
+        "peak_bytes_per_op": peak,
+        "retained_blocks_per_op": retained,
+    }
+
+
+def package_version() -> str:
+    try:
+        return metadata.version("pydualsense")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--filter", default="", help="only run cases containing this string")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing repeat")
+    args = parser.parse_args()
+
+    results = {}
+    for name, setup in CASES.items():
+        if args.filter not in name:
+            continue
+        try:
+            operation = setup()
+        except ImportError as error:  # optional dependency such as numpy
+            print(f"{name:40s} skipped: {error}")
+            continue
+        result = measure(operation, args.min_time)
+        results[name] = result
+        print(
+            f"{name:40s} {result['ops_per_sec']:14,.0f} ops/s {result['ns_per_op']:12,.0f} ns/op "
+            f"{result['peak_bytes_per_op']:8,d} B peak {result['retained_blocks_per_op']:6.2f} blocks retained"
+        )
+
+    if args.json:
+        document = {
+            "meta": {
+                "pydualsense": package_version(),
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            },
+            "results": results,
+        }
+        with open(args.json, "w") as file:
+            json.dump(document, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,58 @@
-from .enums import LedOptions, Brightness, PlayerID, PulseOptions, TriggerModes
-from .pydualsense import DualsenseController
+from .aio import AsyncDualsenseController
+from .cache import DeviceCache
+from .combos import ComboMatch, ComboRecognizer
+from .decoder import FastInputState
+from .enums import Axis, Button, Gesture, GesturePhase, LedOptions, Brightness, PlayerID, PulseOptions, TriggerModes
+from .dsu import DsuClient, DsuServer
+from .events import AxisEvent, ButtonEvent, InputEvents, TouchEvent
+from .gestures import GestureEvent, GestureTracker
+from .history import InputHistory
+from .instrumentation import ReportStats
+from .manager import DualsenseManager
+from .motion import ImuCalibration, MotionTracker
+from .pydualsense import DualsenseController, find_devices
+from .shared import SharedReportPublisher, SharedReportSubscriber
+from .timeline import Clip, Timeline, Track
+from .transport import HidapiTransport, HidrawTransport, Transport
+from .virtual import VirtualDualsense
 
 __all__ = [
+    "AsyncDualsenseController",
+    "Axis",
+    "AxisEvent",
+    "Button",
+    "ButtonEvent",
+    "Clip",
+    "ComboMatch",
+    "ComboRecognizer",
+    "DeviceCache",
+    "DsuClient",
+    "DsuServer",
     "DualsenseController",
+    "DualsenseManager",
+    "FastInputState",
+    "Gesture",
+    "GestureEvent",
+    "GesturePhase",
+    "GestureTracker",
+    "HidapiTransport",
+    "HidrawTransport",
+    "ImuCalibration",
+    "InputHistory",
+    "InputEvents",
     "LedOptions",
+    "MotionTracker",
     "Brightness",
     "PlayerID",
     "PulseOptions",
+    "ReportStats",
+    "SharedReportPublisher",
+    "SharedReportSubscriber",
+    "Timeline",
+    "TouchEvent",
+    "Track",
+    "Transport",
     "TriggerModes",
+    "VirtualDualsense",
+    "find_devices",
 ]
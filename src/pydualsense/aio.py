@@ -0,0 +1,230 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator
+
+from .events import InputEvents
+from .models import DeviceInputState, DeviceOutputState
+from .pydualsense import DualsenseController, find_devices
+from .transport import Transport, open_transport
+
+
+class AsyncDualsenseController:
+    """
+    asyncio front end for :class:`DualsenseController`.
+
+    When the transport has a file descriptor (hidraw on Linux) it is registered with the event loop and reports
+    are decoded in the loop without any thread. Otherwise a single executor thread blocks in the transport read and
+    hands every report to the loop with one ``call_soon_threadsafe``.
+
+    .. code-block:: python
+
+        async with AsyncDualsenseController() as controller:
+            async for state in controller.reports():
+                print(state.left_joystick)
+    """
+
+    def __init__(
+        self, output_keepalive: float | None = None, read_timeout_ms: int = 100, transport: Transport | None = None
+    ) -> None:
+        """
+        Args:
+            output_keepalive (float | None, optional): see :class:`DualsenseController`. Defaults to None.
+            read_timeout_ms (int, optional): how long the executor thread blocks in one read, bounds the time
+                :func:`close` waits for it. Defaults to 100.
+            transport (Transport | None, optional): already opened connection. Defaults to None, which opens the
+                last detected controller.
+        """
+        self.output_keepalive = output_keepalive
+        self.read_timeout_ms = read_timeout_ms
+        self.transport = transport
+
+        self.controller: DualsenseController | None = None
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._fd: int | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._reader: asyncio.Future | None = None
+        self._waiters: list[asyncio.Future] = []
+        self._closed = False
+        self._error: OSError | None = None  # why the device stopped, see _disconnect
+
+    @property
+    def input_state(self) -> DeviceInputState:
+        return self.controller.input_state  # type: ignore
+
+    @property
+    def output_state(self) -> DeviceOutputState:
+        return self.controller.output_state  # type: ignore
+
+    @property
+    def events(self) -> InputEvents:
+        return self.controller.events  # type: ignore
+
+    async def open(self) -> None:
+        """Find and open the controller without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+
+        controller = await loop.run_in_executor(None, self._open_controller)
+        self.controller = controller
+
+        self._fd = controller.device.fileno()  # type: ignore
+        if self._fd is not None:
+            loop.add_reader(self._fd, self._on_readable)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dualsense-reader")
+            self._reader = loop.run_in_executor(self._executor, self._read_blocking)
+
+    def _open_controller(self) -> DualsenseController:
+        transport = self.transport
+        if transport is None:
+            devices = find_devices()
+            if not devices:
+                raise Exception("No device detected")
+            transport = open_transport(devices[-1], prefer_hidraw=True)
+        return DualsenseController(output_keepalive=self.output_keepalive, start_reader=False, transport=transport)
+
+    async def close(self) -> None:
+        """Stop reading, close the device and end every running :func:`reports` iterator."""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)  # type: ignore
+        if self._reader is not None:
+            await self._reader
+            self._executor.shutdown()  # type: ignore
+
+        if self.controller is not None:
+            self.controller.close()
+        self._wake(closed=True)
+
+    async def __aenter__(self) -> "AsyncDualsenseController":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def next_report(self) -> DeviceInputState | None:
+        """
+        Wait for the next decoded input report.
+
+        Returns:
+            DeviceInputState | None: the updated input state, None once the controller is closed
+
+        Raises:
+            ConnectionError: the controller failed to read or write, e.g. because it was unplugged
+        """
+        if self._error is not None:
+            raise ConnectionError("dualsense disconnected") from self._error
+        if self._closed:
+            return None
+        waiter = self._loop.create_future()  # type: ignore
+        self._waiters.append(waiter)
+        return await waiter
+
+    async def reports(self) -> AsyncIterator[DeviceInputState]:
+        """
+        Iterate over input reports as they arrive.
+
+        Reports arriving while the consumer is busy are decoded as well (events still fire for each of them), the
+        iterator continues with the latest state. It ends when the
+        controller is closed and raises ConnectionError when it is unplugged.
+        """
+        while True:
+            state = await self.next_report()
+            if state is None:
+                return
+            yield state
+
+    async def update_output(self) -> bool:
+        """
+        Write the output state now instead of with the next input report.
+
+        Returns:
+            bool: True if a report was written, False if the device already had this state
+        """
+        if self._fd is not None:
+            return self.controller.write_output()  # type: ignore
+        return await self._loop.run_in_executor(None, self.controller.write_output)  # type: ignore
+
+    def _wake(self, closed: bool = False) -> None:
+        waiters = self._waiters
+        if not waiters:
+            return
+        self._waiters = []
+        if self._error is not None:
+            for waiter in waiters:
+                if not waiter.done():
+                    error = ConnectionError("dualsense disconnected")
+                    error.__cause__ = self._error
+                    waiter.set_exception(error)
+            return
+        # input_state is only built from the snapshot when somebody waits for it
+        state = None if closed else self.controller.input_state  # type: ignore
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(state)
+
+    def _on_readable(self) -> None:
+        # drain everything the kernel buffered, then write the output and wake the consumers once
+        controller: DualsenseController = self.controller  # type: ignore
+        device = controller.device
+        length = controller.conType.get_in_report_length()
+        received = False
+
+        try:
+            while True:
+                report = device.read(length, 0)  # type: ignore
+                if not report:
+                    break
+                if controller.process_report(report):
+                    received = True
+
+            if received:
+                try:
+                    controller.write_output()
+                except BlockingIOError:
+                    controller.output_report.invalidate()
+        except OSError as error:
+            self._disconnect(error)
+            return
+        if received:
+            self._wake()
+
+    def _on_report(self, report: bytes) -> None:
+        controller: DualsenseController = self.controller  # type: ignore
+        if controller.process_report(report):
+            self._wake()
+
+    def _read_blocking(self) -> None:
+        controller: DualsenseController = self.controller  # type: ignore
+        device = controller.device
+        length = controller.conType.get_in_report_length()
+        call_soon_threadsafe = self._loop.call_soon_threadsafe  # type: ignore
+
+        try:
+            while not self._closed:
+                report = device.read(length, timeout_ms=self.read_timeout_ms)  # type: ignore
+                if not report:
+                    continue
+                call_soon_threadsafe(self._on_report, report)
+                controller.write_output()
+        except OSError as error:
+            if not self._closed:
+                call_soon_threadsafe(self._disconnect, error)
+
+    def _disconnect(self, error: OSError) -> None:
+        """stop reading a failed device and end the waiting consumers with ConnectionError"""
+        if self._closed:
+            return
+        self._error = error
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)  # type: ignore
+        try:
+            self.controller.close()  # type: ignore
+        except OSError:
+            pass  # already gone
+        self._wake()
@@ -0,0 +1,267 @@
+"""
+Vectorized decoding of many input reports at once, for offline analysis of captures.
+
+Requires numpy, which is not needed by the rest of the package:
+
+.. code-block:: python
+
+    from pydualsense.batch import decode_capture
+
+    timestamps, states = decode_capture("session.dsrc")
+    print(states["left_x"].mean(), states["cross"].sum())
+
+Every column is computed with the same arithmetic as :class:`DeviceInputState <pydualsense.models.DeviceInputState>`,
+so the values are identical to decoding the reports one by one.
+"""
+
+import numpy as np
+
+from .decoder import _DPAD
+from .enums import ConnectionType
+from .motion import _MAX_DT, MOTION_OFFSET, MOTION_STRUCT, SENSOR_CLOCK_HZ, ImuCalibration, MadgwickFilter
+from .recording import HEADER, MAGIC, MAX_REPORT_LENGTH, RECORD, VERSION
+
+# name, byte (relative to the USB layout) and bit of the boolean button columns
+_BUTTONS = (
+    ("triangle", 8, 7),
+    ("circle", 8, 6),
+    ("cross", 8, 5),
+    ("square", 8, 4),
+    ("L1", 9, 0),
+    ("R1", 9, 1),
+    ("share", 9, 4),
+    ("options", 9, 5),
+    ("left_pressed", 9, 6),
+    ("right_pressed", 9, 7),
+    ("ps", 10, 0),
+    ("touchBtn", 10, 1),
+    ("mic", 10, 2),
+)
+
+STATE_DTYPE = np.dtype(
+    [
+        ("left_x", "f8"),
+        ("left_y", "f8"),
+        ("right_x", "f8"),
+        ("right_y", "f8"),
+        ("L2", "f8"),
+        ("R2", "f8"),
+        ("sequence", "u1"),
+        ("buttons", "u4"),  # bytes 8-10 as in FastInputState.buttons
+        *((name, "?") for name, _, _ in _BUTTONS),
+        ("dpad_up", "?"),
+        ("dpad_down", "?"),
+        ("dpad_left", "?"),
+        ("dpad_right", "?"),
+        ("gyro_x", "f8"),
+        ("gyro_y", "f8"),
+        ("gyro_z", "f8"),
+        ("accel_x", "f8"),
+        ("accel_y", "f8"),
+        ("accel_z", "f8"),
+        ("sensor_timestamp", "u4"),
+        ("touch0_active", "?"),
+        ("touch0_id", "u1"),
+        ("touch0_x", "u2"),
+        ("touch0_y", "u2"),
+        ("touch1_active", "?"),
+        ("touch1_id", "u1"),
+        ("touch1_x", "u2"),
+        ("touch1_y", "u2"),
+        ("battery_state", "u1"),
+        ("battery_level", "u1"),
+    ]
+)
+
+_DPAD_TABLE = np.array(_DPAD, dtype=bool)
+_BATTERY_LEVEL_TABLE = np.minimum(np.arange(16) * 10 + 5, 100).astype(np.uint8)
+
+# record layout of ReportRecorder capture files
+_RECORD_DTYPE = np.dtype([("timestamp_ns", "<u8"), ("length", "<u2"), ("report", "u1", (MAX_REPORT_LENGTH,))])
+assert _RECORD_DTYPE.itemsize == RECORD.size
+
+
+def decode_reports(reports, offset: int = 0) -> np.ndarray:
+    """
+    Decode a batch of raw input reports.
+
+    Args:
+        reports (array_like): (N, L) uint8 array of reports, e.g. ``np.frombuffer(data, np.uint8).reshape(-1, 64)``.
+        offset (int, optional): position of the USB layout in each report, 1 for BT reports. Defaults to 0.
+
+    Raises:
+        ValueError: reports are not a 2D array or too short
+
+    Returns:
+        np.ndarray: structured array of length N with the fields of :data:`STATE_DTYPE`
+    """
+    reports = np.asarray(reports, dtype=np.uint8)
+    if reports.ndim != 2:
+        raise ValueError(f"expected an (N, report length) array, got shape {reports.shape}")
+    if reports.shape[1] < offset + 54:
+        raise ValueError(f"reports of {reports.shape[1]} bytes are too short")
+
+    def u8(index: int) -> np.ndarray:
+        return reports[:, offset + index]
+
+    def u16(index: int) -> np.ndarray:
+        return u8(index).astype(np.uint16) | (u8(index + 1).astype(np.uint16) << 8)
+
+    out = np.empty(len(reports), dtype=STATE_DTYPE)
+
+    for name, index in (("left_x", 1), ("left_y", 2), ("right_x", 3), ("right_y", 4)):
+        out[name] = (u8(index).astype(np.float64) - 127) / 127.0
+    out["L2"] = u8(5) / 255.0
+    out["R2"] = u8(6) / 255.0
+    out["sequence"] = u8(7)
+
+    out["buttons"] = u8(8).astype(np.uint32) | (u8(9).astype(np.uint32) << 8) | (u8(10).astype(np.uint32) << 16)
+    for name, index, bit in _BUTTONS:
+        out[name] = (u8(index) & (1 << bit)) != 0
+    dpad = _DPAD_TABLE[u8(8) & 0x0F]
+    out["dpad_up"] = dpad[:, 0]
+    out["dpad_down"] = dpad[:, 1]
+    out["dpad_left"] = dpad[:, 2]
+    out["dpad_right"] = dpad[:, 3]
+
+    for name, index in (
+        ("gyro_x", 16),
+        ("gyro_y", 18),
+        ("gyro_z", 20),
+        ("accel_x", 22),
+        ("accel_y", 24),
+        ("accel_z", 26),
+    ):
+        out[name] = u16(index).view(np.int16) / 8192.0
+
+    out["sensor_timestamp"] = u16(28).astype(np.uint32) | (u16(30).astype(np.uint32) << 16)
+
+    for touch, index in (("touch0", 33), ("touch1", 37)):
+        out[f"{touch}_active"] = (u8(index) & 0x80) == 0
+        out[f"{touch}_id"] = u8(index) & 0x7F
+        out[f"{touch}_x"] = ((u8(index + 2).astype(np.uint16) & 0x0F) << 8) | u8(index + 1)
+        out[f"{touch}_y"] = (u8(index + 3).astype(np.uint16) << 4) | (u8(index + 2) >> 4)
+
+    out["battery_state"] = u8(53) >> 4
+    out["battery_level"] = _BATTERY_LEVEL_TABLE[u8(53) & 0x0F]
+    return out
+
+
+def load_capture(path: str) -> tuple[ConnectionType, np.ndarray]:
+    """
+    Memory map the records of a :class:`ReportRecorder <pydualsense.recording.ReportRecorder>` capture file.
+
+    Args:
+        path (str): capture file.
+
+    Raises:
+        ValueError: not a capture file or unsupported version
+
+    Returns:
+        tuple[ConnectionType, np.ndarray]: connection type and the records, with the fields ``timestamp_ns``,
+        ``length`` and ``report`` (the report padded to 78 bytes)
+    """
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        size = file.seek(0, 2)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a report capture")
+    magic, version, connection_type, record_size = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path} is not a supported report capture")
+
+    # a trailing partial record (recorder killed mid write) is ignored
+    count = (size - HEADER.size) // RECORD.size
+    if count == 0:
+        return ConnectionType(connection_type), np.empty(0, dtype=_RECORD_DTYPE)
+    records = np.memmap(path, dtype=_RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+    return ConnectionType(connection_type), records
+
+
+def decode_capture(path: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decode every report of a capture file.
+
+    Args:
+        path (str): capture file written by :class:`ReportRecorder <pydualsense.recording.ReportRecorder>`.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: arrival timestamps in ns and the decoded states, see :func:`decode_reports`
+    """
+    connection_type, records = load_capture(path)
+    offset = 1 if connection_type == ConnectionType.BT else 0
+    return np.array(records["timestamp_ns"]), decode_reports(records["report"], offset)
+
+
+def decode_motion(
+    reports, offset: int = 0, calibration: ImuCalibration | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calibrated IMU data of a batch of raw input reports.
+
+    Args:
+        reports (array_like): (N, L) uint8 array of reports.
+        offset (int, optional): position of the USB layout in each report, 1 for BT reports. Defaults to 0.
+        calibration (ImuCalibration | None, optional): device calibration. Defaults to None, the nominal ranges.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: raw sensor timestamps (N,), gyro in rad/s (N, 3) and accel in g
+        (N, 3)
+    """
+    reports = np.asarray(reports, dtype=np.uint8)
+    if reports.ndim != 2 or reports.shape[1] < offset + MOTION_OFFSET + MOTION_STRUCT.size:
+        raise ValueError(f"expected an (N, report length) array, got shape {reports.shape}")
+    calibration = calibration or ImuCalibration()
+
+    start = offset + MOTION_OFFSET
+    words = reports[:, start : start + 12].astype(np.uint16)
+    raw = (words[:, 0::2] | (words[:, 1::2] << 8)).view(np.int16).astype(np.float64)
+    gyro = (raw[:, :3] - calibration.gyro_bias) * calibration.gyro_scale
+    accel = (raw[:, 3:] - calibration.accel_bias) * calibration.accel_scale
+
+    timestamp = reports[:, start + 12 : start + 16].astype(np.uint32)
+    timestamps = timestamp[:, 0] | (timestamp[:, 1] << 8) | (timestamp[:, 2] << 16) | (timestamp[:, 3] << 24)
+    return timestamps, gyro, accel
+
+
+def orientation(reports, offset: int = 0, calibration: ImuCalibration | None = None, beta: float = 0.05) -> np.ndarray:
+    """
+    Orientation after every report of a recorded stream, the same values :class:`MotionTracker` produces live.
+
+    Calibration, axis remapping and time steps are computed for the whole batch; the filter itself is recursive, so
+    it runs as one tight loop over the prepared samples.
+
+    Args:
+        reports (array_like): (N, L) uint8 array of reports.
+        offset (int, optional): position of the USB layout in each report, 1 for BT reports. Defaults to 0.
+        calibration (ImuCalibration | None, optional): device calibration. Defaults to None, the nominal ranges.
+        beta (float, optional): filter gain. Defaults to 0.05.
+
+    Returns:
+        np.ndarray: (N, 4) quaternions (w, x, y, z)
+    """
+    timestamps, gyro, accel = decode_motion(reports, offset, calibration)
+    count = len(timestamps)
+    out = np.empty((count, 4))
+    if count == 0:
+        return out
+
+    dt = np.empty(count)
+    dt[0] = 0.0
+    dt[1:] = ((timestamps[1:] - timestamps[:-1]) & 0xFFFFFFFF) / SENSOR_CLOCK_HZ
+    np.minimum(dt, _MAX_DT, out=dt)
+
+    # same axis order as MotionTracker: (X, -Z, Y)
+    samples = np.column_stack(
+        (gyro[:, 0], -gyro[:, 2], gyro[:, 1], accel[:, 0], -accel[:, 2], accel[:, 1], dt)
+    ).tolist()
+
+    motion_filter = MadgwickFilter(beta)
+    update = motion_filter.update
+    quaternion = (1.0, 0.0, 0.0, 0.0)
+    for index, (gx, gy, gz, ax, ay, az, step) in enumerate(samples):
+        if step != 0.0:
+            update(gx, gy, gz, ax, ay, az, step)
+            quaternion = (motion_filter.w, motion_filter.x, motion_filter.y, motion_filter.z)
+        out[index] = quaternion
+    return out
@@ -0,0 +1,215 @@
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from .enums import ConnectionType
+from .motion import CALIBRATION_REPORT_ID, CALIBRATION_REPORT_LENGTH, ImuCalibration
+from .transport import Transport, device_id
+
+# feature report 0x20: build date and time strings followed by hardware and firmware version (report id not included)
+FIRMWARE_REPORT_ID = 0x20
+FIRMWARE_REPORT_LENGTH = 63
+_FIRMWARE = struct.Struct("<23xII")
+
+CACHE_VERSION = 1
+
+
+def default_cache_path() -> str:
+    """
+    Returns:
+        str: ``pydualsense/devices.json`` in the user cache directory of the platform
+    """
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "pydualsense", "devices.json")
+
+
+@dataclass
+class CachedDevice:
+    """What is known about one controller from an earlier session."""
+
+    path: str
+    connection_type: ConnectionType
+    calibration: bytes | None = None  # raw feature report 0x05
+    firmware_version: int | None = None
+    hardware_version: int | None = None
+    updated: float = 0.0
+
+    @property
+    def imu_calibration(self) -> ImuCalibration | None:
+        if self.calibration is None:
+            return None
+        return ImuCalibration.from_feature_report(self.calibration)
+
+    def to_json(self) -> dict:
+        return {
+            "path": self.path,
+            "connection_type": self.connection_type.name,
+            "calibration": self.calibration.hex() if self.calibration is not None else None,
+            "firmware_version": self.firmware_version,
+            "hardware_version": self.hardware_version,
+            "updated": self.updated,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "CachedDevice":
+        calibration = data.get("calibration")
+        return cls(
+            path=data["path"],
+            connection_type=ConnectionType[data["connection_type"]],
+            calibration=bytes.fromhex(calibration) if calibration is not None else None,
+            firmware_version=data.get("firmware_version"),
+            hardware_version=data.get("hardware_version"),
+            updated=data.get("updated", 0.0),
+        )
+
+
+class DeviceCache:
+    """
+    JSON file with the calibration, firmware version, connection type and HID path of known controllers.
+
+    Entries are keyed by :func:`device_id <pydualsense.transport.device_id>`, i.e. the MAC address. A cached entry
+    lets a controller be used without waiting for its feature reports; :func:`refresh_in_background` reads them
+    again afterwards and updates the file. A missing or corrupt file is treated as empty.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Args:
+            path (str | None, optional): cache file. Defaults to None, which uses :func:`default_cache_path`.
+        """
+        self.path = path or default_cache_path()
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> dict[str, CachedDevice]:
+        try:
+            with open(self.path) as file:
+                document = json.load(file)
+            if document.get("version") != CACHE_VERSION:
+                return {}
+            return {key: CachedDevice.from_json(entry) for key, entry in document["devices"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def save(self) -> None:
+        """Write the cache, the file is replaced atomically so concurrent readers never see a partial file."""
+        with self._lock:
+            document = {
+                "version": CACHE_VERSION,
+                "devices": {key: entry.to_json() for key, entry in self._entries.items()},
+            }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(document, file, indent=2)
+        os.replace(temporary, self.path)
+
+    def get(self, key: str) -> CachedDevice | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def lookup(self, transport: Transport) -> CachedDevice | None:
+        """
+        Cached entry of an opened controller.
+
+        Args:
+            transport (Transport): the opened controller.
+
+        Returns:
+            CachedDevice | None: the entry, None if the controller is unknown
+        """
+        return self.get(device_id(transport.serial_number, transport.path))  # type: ignore
+
+    def put(self, key: str, entry: CachedDevice, save: bool = True) -> None:
+        with self._lock:
+            self._entries[key] = entry
+        if save:
+            self.save()
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            removed = self._entries.pop(key, None)
+        if removed is not None:
+            self.save()
+
+    def refresh(self, transport: Transport, connection_type: ConnectionType) -> CachedDevice:
+        """
+        Read the feature reports of a controller and store them.
+
+        Reports that can not be read keep their cached value.
+
+        Args:
+            transport (Transport): the opened controller.
+            connection_type (ConnectionType): its connection type.
+
+        Returns:
+            CachedDevice: the updated entry
+        """
+        key = device_id(transport.serial_number, transport.path)  # type: ignore
+        previous = self.get(key)
+        entry = CachedDevice(path=os.fsdecode(transport.path), connection_type=connection_type)  # type: ignore
+        if previous is not None:
+            entry.calibration = previous.calibration
+            entry.firmware_version = previous.firmware_version
+            entry.hardware_version = previous.hardware_version
+
+        try:
+            calibration = bytes(transport.get_feature_report(CALIBRATION_REPORT_ID, CALIBRATION_REPORT_LENGTH))
+            ImuCalibration.from_feature_report(calibration)  # reject short reports before caching them
+            entry.calibration = calibration
+        except (OSError, ValueError):
+            pass
+
+        try:
+            firmware = transport.get_feature_report(FIRMWARE_REPORT_ID, FIRMWARE_REPORT_LENGTH)
+            entry.hardware_version, entry.firmware_version = _FIRMWARE.unpack_from(firmware)
+        except (OSError, struct.error):
+            pass
+
+        if previous is not None:
+            entry.updated = previous.updated
+        if entry != previous:
+            entry.updated = time.time()
+            self.put(key, entry)
+        return entry
+
+    def refresh_in_background(
+        self,
+        transport: Transport,
+        connection_type: ConnectionType,
+        callback: Callable[[CachedDevice], None] | None = None,
+    ) -> threading.Thread:
+        """
+        Run :func:`refresh` in a daemon thread.
+
+        Args:
+            transport (Transport): the opened controller.
+            connection_type (ConnectionType): its connection type.
+            callback (Callable[[CachedDevice], None] | None, optional): called with the updated entry from the
+                refresh thread. Defaults to None.
+
+        Returns:
+            threading.Thread: the started thread
+        """
+
+        def task() -> None:
+            try:
+                entry = self.refresh(transport, connection_type)
+            except OSError:
+                return  # device went away or the cache is not writable, the next session tries again
+            if callback is not None:
+                callback(entry)
+
+        thread = threading.Thread(target=task, daemon=True)
+        thread.start()
+        return thread
@@ -1,4 +1,6 @@
 import array
+import struct
+import zlib
 
 # from South-River
 
@@ -272,3 +274,62 @@ def compute(buffer):
         result = hashTable[(result & 0xFF) ^ (buffer[i] & 0xFF)] ^ (result >> 8)
 
     return result
+
+
+# The table above is the standard CRC-32 with the BT header byte already fed in,
+# so zlib gives the same result when seeded with the CRC of that header.
+BT_OUTPUT_SEED = zlib.crc32(b"\xa2")  # 0xEADA2D49
+BT_INPUT_SEED = zlib.crc32(b"\xa1")
+
+CRC_OFFSET = 74
+_CRC = struct.Struct("<I")
+
+
+def compute_fast(buffer, seed: int = BT_OUTPUT_SEED) -> int:
+    """
+    Same result as :func:`compute`, calculated by zlib.
+
+    Args:
+        buffer (bytes | bytearray | memoryview | list): report, only the first 74 bytes are used.
+        seed (int, optional): CRC of the BT header. Defaults to the output report header.
+
+    Returns:
+        int: checksum to place at byte 74 of the report
+    """
+    if isinstance(buffer, list):
+        buffer = bytes(buffer[:CRC_OFFSET])
+    else:
+        buffer = memoryview(buffer)[:CRC_OFFSET]
+    return zlib.crc32(buffer, seed)
+
+
+def verify_input(report) -> bool:
+    """
+    Check the CRC at the end of a 78 byte BT input report.
+
+    Args:
+        report (bytes | bytearray | memoryview): complete input report including the report id.
+
+    Returns:
+        bool: True if the report is intact
+    """
+    return _verify(report, BT_INPUT_SEED)
+
+
+def verify_output(report) -> bool:
+    """
+    Check the CRC at the end of a 78 byte BT output report.
+
+    Args:
+        report (bytes | bytearray | memoryview): complete output report including the report id.
+
+    Returns:
+        bool: True if the report is intact
+    """
+    return _verify(report, BT_OUTPUT_SEED)
+
+
+def _verify(report, seed: int) -> bool:
+    if len(report) < CRC_OFFSET + 4:
+        return False
+    return zlib.crc32(memoryview(report)[:CRC_OFFSET], seed) == _CRC.unpack_from(report, CRC_OFFSET)[0]
@@ -0,0 +1,267 @@
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Sequence
+
+from .enums import Button
+from .events import _DPAD_MASK
+
+_DPAD_BITS = int(Button.DpadUp | Button.DpadDown | Button.DpadLeft | Button.DpadRight)
+
+# symbols of the input stream: a newly pressed Button bit, or a new dpad direction (including neutral) tagged with
+# a bit no Button uses, so holding a direction and pressing a button are different symbols
+_DPAD_SYMBOL = 1 << 24
+
+
+@dataclass(frozen=True, slots=True)
+class ComboMatch:
+    name: str
+    start: float  # time.monotonic() of the report with the first step
+    end: float  # time.monotonic() of the report that completed the combo
+
+
+ComboHandler = Callable[[ComboMatch], None]
+
+
+@dataclass(frozen=True, slots=True)
+class _Combo:
+    name: str
+    length: int
+    handler: ComboHandler
+    max_gap: float
+    window: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class _Automaton:
+    combos: tuple[_Combo, ...]
+    delta: list[dict[int, int]]  # complete transition table, missing symbols go back to the root
+    outputs: list[tuple[int, ...]]  # combos completed in each state, longest first
+    history: int  # length of the longest pattern, number of symbol times kept
+
+
+def _step_symbols(step: Button | int) -> list[tuple[int, ...]]:
+    """Symbol sequences that satisfy one step, several for chords of buttons pressed in any order."""
+    mask = int(step)
+    dpad = mask & _DPAD_BITS
+    buttons = mask & ~_DPAD_BITS
+    if dpad and buttons:
+        raise ValueError(f"a combo step is either a dpad direction or buttons, got {Button(mask)!r}")
+    if not buttons:
+        return [(_DPAD_SYMBOL | dpad,)]  # 0 is the neutral dpad
+    bits = [bit for bit in (1 << shift for shift in range(24)) if buttons & bit]
+    return list(itertools.permutations(bits))
+
+
+class ComboRecognizer:
+    """
+    Matches input sequences, e.g. fighting game motions, against the stream of press edges.
+
+    .. code-block:: python
+
+        combos = controller.enable_combos()
+        combos.add(
+            "hadouken",
+            [Button.DpadDown, Button.DpadDown | Button.DpadRight, Button.DpadRight, Button.Square],
+            print,
+            max_gap=0.15,
+        )
+
+    The reports are turned into symbols: a new dpad direction (``Button(0)`` is neutral) or a newly pressed button.
+    All patterns are compiled into one Aho-Corasick automaton over these symbols, so a symbol costs one table lookup
+    no matter how many patterns are registered; only patterns that complete at that symbol have their timing
+    checked. Steps must follow each other directly, any other symbol in between breaks the sequence. A step with
+    several buttons is a chord, its buttons may be pressed in any order.
+
+    Combos can be added and removed from any thread while reports are processed. The automaton is rebuilt on the
+    next report and replaced as a whole, so a report is always matched against one complete automaton.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()  # serializes changes of the combos with building the automaton
+        self._combos: list[_Combo] = []
+        self._sequences: list[tuple[int, tuple[int, ...]]] = []  # (combo index, symbols) after chord expansion
+        self._automaton: _Automaton | None = None  # None after a change, rebuilt by the next report
+
+        # matching state, only used by the thread feeding the reports
+        self._active: _Automaton | None = None  # automaton _state and _times belong to
+        self._state = 0
+        self._raw_buttons = -1
+        self._buttons = 0
+        self._times = [0.0]
+        self._symbols = 0  # symbols seen so far, the position in _times is this modulo the automaton's history
+
+    def add(
+        self,
+        name: str,
+        steps: Sequence[Button | int],
+        handler: ComboHandler,
+        max_gap: float = 0.2,
+        window: float | None = None,
+    ) -> None:
+        """
+        Register a sequence.
+
+        Args:
+            name (str): name passed to the handler in :class:`ComboMatch`.
+            steps (Sequence[Button | int]): dpad directions (combinations of the Dpad bits, ``Button(0)`` for
+                neutral) and buttons, in the order they have to be entered.
+            handler (ComboHandler): called with a :class:`ComboMatch` from the report thread.
+            max_gap (float, optional): longest time in seconds between two consecutive steps. Defaults to 0.2.
+            window (float | None, optional): longest time from the first to the last step. Defaults to None, only
+                ``max_gap`` applies.
+
+        Raises:
+            ValueError: empty sequence or a step mixing dpad and buttons
+        """
+        if not steps:
+            raise ValueError("a combo needs at least one step")
+        alternatives = [_step_symbols(step) for step in steps]
+        sequences = [tuple(itertools.chain.from_iterable(choice)) for choice in itertools.product(*alternatives)]
+
+        combo = _Combo(name, len(sequences[0]), handler, max_gap, window)
+        with self._lock:
+            index = len(self._combos)
+            self._combos.append(combo)
+            self._sequences.extend((index, sequence) for sequence in sequences)
+            self._automaton = None
+
+    def remove(self, name: str) -> None:
+        """Unregister every combo called ``name``."""
+        with self._lock:
+            keep = [index for index, combo in enumerate(self._combos) if combo.name != name]
+            renumber = {old: new for new, old in enumerate(keep)}
+            self._combos = [self._combos[index] for index in keep]
+            self._sequences = [(renumber[index], seq) for index, seq in self._sequences if index in renumber]
+            self._automaton = None
+
+    def compile(self) -> None:
+        """Build the automaton, done automatically by the first :func:`process` after a change."""
+        with self._lock:
+            self._automaton = self._build()
+
+    def _current(self) -> _Automaton:
+        automaton = self._automaton
+        if automaton is None:
+            with self._lock:
+                automaton = self._automaton
+                if automaton is None:
+                    automaton = self._automaton = self._build()
+        return automaton
+
+    def _build(self) -> _Automaton:
+        """build the automaton of the current combos, called with the lock held"""
+        combos = tuple(self._combos)
+        sequences = self._sequences
+        goto: list[dict[int, int]] = [{}]
+        outputs: list[set[int]] = [set()]
+        for index, sequence in sequences:
+            state = 0
+            for symbol in sequence:
+                following = goto[state].get(symbol)
+                if following is None:
+                    following = len(goto)
+                    goto[state][symbol] = following
+                    goto.append({})
+                    outputs.append(set())
+                state = following
+            outputs[state].add(index)
+
+        # breadth first: failure links, merged outputs and the complete transition table
+        alphabet = {symbol for _, sequence in sequences for symbol in sequence}
+        fail = [0] * len(goto)
+        delta: list[dict[int, int]] = [{} for _ in goto]
+        queue = []
+        for symbol in alphabet:
+            following = goto[0].get(symbol)
+            if following is not None:
+                delta[0][symbol] = following
+                queue.append(following)
+        for state in queue:  # the queue grows while it is iterated
+            outputs[state] |= outputs[fail[state]]
+            for symbol in alphabet:
+                following = goto[state].get(symbol)
+                if following is not None:
+                    fail[following] = delta[fail[state]].get(symbol, 0)
+                    delta[state][symbol] = following
+                    queue.append(following)
+                else:
+                    target = delta[fail[state]].get(symbol, 0)
+                    if target:
+                        delta[state][symbol] = target
+
+        # longest combos first, so a longer motion is reported before the shorter one it ends with
+        return _Automaton(
+            combos,
+            delta,
+            [tuple(sorted(found, key=lambda index: -combos[index].length)) for found in outputs],
+            max((len(sequence) for _, sequence in sequences), default=1),
+        )
+
+    def reset(self) -> None:
+        """Forget the symbols seen so far."""
+        self._state = 0
+
+    def process(self, report, offset: int = 0, timestamp: float | None = None) -> None:
+        """
+        Feed one input report.
+
+        Args:
+            report (bytes | bytearray | memoryview): raw input report.
+            offset (int, optional): position of the USB layout inside ``report``, 1 for BT reports. Defaults to 0.
+            timestamp (float | None, optional): arrival time, ``time.monotonic()`` if not given.
+        """
+        raw = report[offset + 8] | (report[offset + 9] << 8) | (report[offset + 10] << 16)
+        if raw == self._raw_buttons:
+            return
+        self._raw_buttons = raw
+        automaton = self._current()
+        if automaton is not self._active:
+            # state numbers of an older automaton mean nothing in this one
+            self._active = automaton
+            self._times = [0.0] * automaton.history
+            self._symbols = 0
+            self._state = 0
+
+        buttons = (raw & ~0x0F) | _DPAD_MASK[raw & 0x0F]
+        previous = self._buttons
+        self._buttons = buttons
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        dpad = buttons & _DPAD_BITS
+        if dpad != previous & _DPAD_BITS:
+            self._feed(automaton, _DPAD_SYMBOL | dpad, timestamp)
+
+        pressed = buttons & ~previous & ~_DPAD_BITS
+        while pressed:
+            bit = pressed & -pressed
+            pressed ^= bit
+            self._feed(automaton, bit, timestamp)
+
+    def _feed(self, automaton: _Automaton, symbol: int, timestamp: float) -> None:
+        times, history = self._times, automaton.history
+        position = self._symbols
+        times[position % history] = timestamp
+        self._symbols = position + 1
+
+        state = automaton.delta[self._state].get(symbol, 0)
+        self._state = state
+        for index in automaton.outputs[state]:
+            combo = automaton.combos[index]
+            length = combo.length
+            if length > position + 1:
+                continue
+            start = times[(position - length + 1) % history]
+            if combo.window is not None and timestamp - start > combo.window:
+                continue
+            max_gap = combo.max_gap
+            previous = start
+            for offset in range(position - length + 2, position + 1):
+                current = times[offset % history]
+                if current - previous > max_gap:
+                    break
+                previous = current
+            else:
+                combo.handler(ComboMatch(combo.name, start, timestamp))
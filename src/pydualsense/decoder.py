@@ -0,0 +1,235 @@
+import struct
+
+from .enums import BatteryState
+
+# Layout of the part of the input report that carries controller state. Offsets are the ones used by
+# DeviceInputState.from_state, i.e. a USB report or a BT report with its leading byte skipped.
+#
+#   1-6   sticks LX, LY, RX, RY and triggers L2, R2
+#   7     sequence counter
+#   8-10  button bytes (low nibble of byte 8 is the dpad hat)
+#   16-27 gyroscope X/Y/Z and accelerometer X/Y/Z, signed little endian
+#   28-31 sensor timestamp
+#   33-40 two touch points, 4 bytes each: [id | inactive << 7][x low][x high | y low << 4][y high]
+#   53    battery state (high nibble) and level (low nibble)
+REPORT_STRUCT = struct.Struct("<6BB3B5x6hIx2I12xB")
+REPORT_OFFSET = 1
+REPORT_LENGTH = REPORT_OFFSET + REPORT_STRUCT.size
+
+_STICK = tuple((value - 127) / 127.0 for value in range(256))
+_TRIGGER = tuple(value / 255.0 for value in range(256))
+_MOTION_SCALE = 1 / 8192.0
+
+# hat value -> (up, down, left, right)
+_DPAD = (
+    (True, False, False, False),
+    (True, False, False, True),
+    (False, False, False, True),
+    (False, True, False, True),
+    (False, True, False, False),
+    (False, True, True, False),
+    (False, False, True, False),
+    (True, False, True, False),
+) + ((False, False, False, False),) * 8
+
+_BATTERY_LEVEL = tuple(min(value * 10 + 5, 100) for value in range(16))
+
+
+class FastInputState:
+    """
+    Compact input state filled straight from a raw report.
+
+    Only the values that need arithmetic are decoded eagerly; buttons, touch points and battery are kept as the
+    raw report words and unpacked by the properties below when they are read.
+    """
+
+    __slots__ = (
+        "left_x",
+        "left_y",
+        "right_x",
+        "right_y",
+        "L2",
+        "R2",
+        "sequence",
+        "buttons",
+        "gyro_x",
+        "gyro_y",
+        "gyro_z",
+        "accel_x",
+        "accel_y",
+        "accel_z",
+        "sensor_timestamp",
+        "touch0",
+        "touch1",
+        "battery",
+    )
+
+    def __init__(self) -> None:
+        self.left_x = 0.0
+        self.left_y = 0.0
+        self.right_x = 0.0
+        self.right_y = 0.0
+        self.L2 = 0.0
+        self.R2 = 0.0
+        self.sequence = 0
+        self.buttons = 0x08  # dpad released
+        self.gyro_x = 0.0
+        self.gyro_y = 0.0
+        self.gyro_z = 0.0
+        self.accel_x = 0.0
+        self.accel_y = 0.0
+        self.accel_z = 0.0
+        self.sensor_timestamp = 0
+        self.touch0 = 0x80  # inactive
+        self.touch1 = 0x80
+        self.battery = 0
+
+    def from_state(self, state, offset: int = 0) -> None:
+        """
+        Decode an input report in place.
+
+        Args:
+            state (bytes | bytearray | memoryview): raw input report, it is read without being copied.
+            offset (int, optional): position of the USB layout inside ``state``, 1 for BT reports. Defaults to 0.
+        """
+        (
+            lx,
+            ly,
+            rx,
+            ry,
+            l2,
+            r2,
+            self.sequence,
+            b0,
+            b1,
+            b2,
+            gx,
+            gy,
+            gz,
+            ax,
+            ay,
+            az,
+            self.sensor_timestamp,
+            self.touch0,
+            self.touch1,
+            self.battery,
+        ) = REPORT_STRUCT.unpack_from(state, offset + REPORT_OFFSET)
+
+        self.left_x = _STICK[lx]
+        self.left_y = _STICK[ly]
+        self.right_x = _STICK[rx]
+        self.right_y = _STICK[ry]
+        self.L2 = _TRIGGER[l2]
+        self.R2 = _TRIGGER[r2]
+        self.buttons = b0 | (b1 << 8) | (b2 << 16)
+
+        scale = _MOTION_SCALE
+        self.gyro_x = gx * scale
+        self.gyro_y = gy * scale
+        self.gyro_z = gz * scale
+        self.accel_x = ax * scale
+        self.accel_y = ay * scale
+        self.accel_z = az * scale
+
+    # buttons
+
+    @property
+    def triangle(self) -> bool:
+        return (self.buttons & 0x80) != 0
+
+    @property
+    def circle(self) -> bool:
+        return (self.buttons & 0x40) != 0
+
+    @property
+    def cross(self) -> bool:
+        return (self.buttons & 0x20) != 0
+
+    @property
+    def square(self) -> bool:
+        return (self.buttons & 0x10) != 0
+
+    @property
+    def dpad(self) -> tuple:
+        """(up, down, left, right)"""
+        return _DPAD[self.buttons & 0x0F]
+
+    @property
+    def L1(self) -> bool:
+        return (self.buttons & 0x100) != 0
+
+    @property
+    def R1(self) -> bool:
+        return (self.buttons & 0x200) != 0
+
+    @property
+    def share(self) -> bool:
+        return (self.buttons & 0x1000) != 0
+
+    @property
+    def options(self) -> bool:
+        return (self.buttons & 0x2000) != 0
+
+    @property
+    def left_pressed(self) -> bool:
+        return (self.buttons & 0x4000) != 0
+
+    @property
+    def right_pressed(self) -> bool:
+        return (self.buttons & 0x8000) != 0
+
+    @property
+    def ps(self) -> bool:
+        return (self.buttons & 0x10000) != 0
+
+    @property
+    def touchBtn(self) -> bool:
+        return (self.buttons & 0x20000) != 0
+
+    @property
+    def mic(self) -> bool:
+        return (self.buttons & 0x40000) != 0
+
+    # touchpad
+
+    @property
+    def touch0_active(self) -> bool:
+        return (self.touch0 & 0x80) == 0
+
+    @property
+    def touch0_id(self) -> int:
+        return self.touch0 & 0x7F
+
+    @property
+    def touch0_x(self) -> int:
+        return (self.touch0 >> 8) & 0x0FFF
+
+    @property
+    def touch0_y(self) -> int:
+        return self.touch0 >> 20
+
+    @property
+    def touch1_active(self) -> bool:
+        return (self.touch1 & 0x80) == 0
+
+    @property
+    def touch1_id(self) -> int:
+        return self.touch1 & 0x7F
+
+    @property
+    def touch1_x(self) -> int:
+        return (self.touch1 >> 8) & 0x0FFF
+
+    @property
+    def touch1_y(self) -> int:
+        return self.touch1 >> 20
+
+    # battery
+
+    @property
+    def battery_state(self) -> BatteryState:
+        return BatteryState(self.battery >> 4)
+
+    @property
+    def battery_level(self) -> int:
+        return _BATTERY_LEVEL[self.battery & 0x0F]
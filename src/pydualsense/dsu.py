@@ -0,0 +1,584 @@
+"""
+DSU (cemuhook) UDP server, so emulators and remote tools receive buttons, sticks, touch and motion directly.
+
+.. code-block:: python
+
+    server = DsuServer()  # 127.0.0.1:26760, the port the emulators use by default
+    server.add(controller)  # slot 0
+
+Packets are encoded from the raw input report in the report thread, into one preallocated packet per slot, and
+sent to every client subscribed to that slot. :class:`DsuClient` speaks the client side of the protocol, for tests
+and loopback benchmarks.
+"""
+
+import random
+import socket
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable
+
+from .enums import ConnectionType
+from .motion import SENSOR_CLOCK_HZ, ImuCalibration
+from .transport import device_id
+
+if TYPE_CHECKING:
+    from .pydualsense import DualsenseController
+
+DSU_PORT = 26760
+PROTOCOL_VERSION = 1001
+SLOTS = 4
+SUBSCRIPTION_TIMEOUT = 5.0  # clients repeat their data request, silent ones are dropped after this many seconds
+
+MSG_VERSION = 0x100000
+MSG_PORTS = 0x100001
+MSG_DATA = 0x100002
+
+SERVER_MAGIC = b"DSUS"
+CLIENT_MAGIC = b"DSUC"
+
+# slot state, device model and connection type of the shared part of port info and data packets
+STATE_DISCONNECTED = 0
+STATE_CONNECTED = 2
+MODEL_FULL_GYRO = 2
+_CONNECTION = {ConnectionType.USB: 1, ConnectionType.BT: 2}
+
+# registration flags of data requests, 0 subscribes to every slot
+REGISTER_SLOT = 0x01
+REGISTER_MAC = 0x02
+
+# magic, protocol version, length after the header, crc32 of the packet with this field zeroed, sender id
+HEADER = struct.Struct("<4sHHII")
+_CRC_OFFSET = 8
+_CRC = struct.Struct("<I")
+_MESSAGE = struct.Struct("<I")
+
+# packet bodies after the header, starting with the message type and the slot, state, model, connection type, mac
+# and battery shared by port info and data packets
+_SHARED = "I BBBB6sB"
+_VERSION_PACKET = struct.Struct("<I H")
+_PORT_PACKET = struct.Struct(f"<{_SHARED} x")
+# followed by: connected, packet number, buttons, PS, touch button, sticks, 12 analog buttons, 2 touches, motion
+_DATA_PACKET = struct.Struct(f"<{_SHARED} B I BBBB BBBB 12B BBHH BBHH Q 6f")
+
+# input report fields used, relative to the USB layout: sticks, triggers, buttons, IMU, sensor time, touches, battery
+_INPUT = struct.Struct("<x4B2Bx3B5x6hIx4B4B12xB")
+_SENSOR_TIME = struct.Struct("<I")
+_SENSOR_TIME_OFFSET = 28
+
+# DSU button bits: share 0x01, L3 0x02, R3 0x04, options 0x08, up 0x10, right 0x20, down 0x40, left 0x80 and
+# L2 0x01, R2 0x02, L1 0x04, R1 0x08, triangle 0x10, circle 0x20, cross 0x40, square 0x80
+_HAT_BITS = (0x10, 0x30, 0x20, 0x60, 0x40, 0xC0, 0x80, 0x90) + (0,) * 8
+_BUTTONS1 = tuple(
+    (0x01 if b & 0x10 else 0) | (0x08 if b & 0x20 else 0) | (0x02 if b & 0x40 else 0) | (0x04 if b & 0x80 else 0)
+    for b in range(256)
+)
+_BUTTONS2_SHOULDERS = tuple(
+    (0x04 if b & 0x01 else 0) | (0x08 if b & 0x02 else 0) | (0x01 if b & 0x04 else 0) | (0x02 if b & 0x08 else 0)
+    for b in range(256)
+)
+_BUTTONS2_FACE = tuple(
+    (0x80 if b & 0x10 else 0) | (0x40 if b & 0x20 else 0) | (0x20 if b & 0x40 else 0) | (0x10 if b & 0x80 else 0)
+    for b in range(256)
+)
+
+# battery nibble of the report (level 0-10) to the DSU battery state, charging and full have their own codes
+_BATTERY_LEVELS = (1, 1, 2, 2, 3, 3, 3, 4, 4, 4, 5) + (5,) * 5
+_BATTERY_CHARGING = 0xEE
+_BATTERY_CHARGED = 0xEF
+
+_DEGREES = 180 / 3.141592653589793
+
+
+def _battery(value: int) -> int:
+    status = value >> 4
+    if status == 1:
+        return _BATTERY_CHARGING
+    if status == 2:
+        return _BATTERY_CHARGED
+    return _BATTERY_LEVELS[value & 0x0F]
+
+
+def _seal(packet: bytearray | memoryview) -> None:
+    """Fill in the crc32 of a packet whose crc field is zero."""
+    _CRC.pack_into(packet, _CRC_OFFSET, zlib.crc32(packet))
+
+
+def _verify(packet: bytes | bytearray | memoryview) -> bool:
+    crc = _CRC.unpack_from(packet, _CRC_OFFSET)[0]
+    zeroed = bytearray(packet)
+    _CRC.pack_into(zeroed, _CRC_OFFSET, 0)
+    return zlib.crc32(zeroed) == crc
+
+
+def _mac(serial_number: str | None, path: bytes | str) -> bytes:
+    key = device_id(serial_number, path)
+    try:
+        mac = bytes.fromhex(key)
+    except ValueError:
+        return bytes(6)
+    return mac if len(mac) == 6 else bytes(6)
+
+
+class DsuSlot:
+    """
+    One controller of a :class:`DsuServer`, fed by the report thread of the controller through :func:`process`.
+    """
+
+    def __init__(
+        self,
+        server: "DsuServer",
+        index: int,
+        connection_type: ConnectionType,
+        mac: bytes,
+        calibration: ImuCalibration | None = None,
+    ) -> None:
+        self.server = server
+        self.index = index
+        self.connection_type = connection_type
+        self.mac = mac
+        self.battery = 0
+        self.packets = 0  # data packets encoded, the packet number clients see
+        self.targets: tuple = ()  # subscribed client addresses, replaced by the server thread
+        self.controller: "DualsenseController | None" = None
+
+        calibration = calibration or ImuCalibration()
+        self._gyro_bias = calibration.gyro_bias
+        self._gyro_scale = tuple(scale * _DEGREES for scale in calibration.gyro_scale)  # deg/s
+        self._accel_bias = calibration.accel_bias
+        self._accel_scale = calibration.accel_scale
+
+        self._sensor_time: int | None = None
+        self._timestamp_us = 0.0  # 32 bit sensor clock extended to 64 bit microseconds
+
+        self._packet = bytearray(HEADER.size + _DATA_PACKET.size)
+        HEADER.pack_into(self._packet, 0, SERVER_MAGIC, PROTOCOL_VERSION, _DATA_PACKET.size, 0, server.server_id)
+
+    def shared(self) -> tuple:
+        """Slot, state, model, connection type, mac and battery as sent in every packet of this slot."""
+        return (self.index, STATE_CONNECTED, MODEL_FULL_GYRO, _CONNECTION[self.connection_type], self.mac, self.battery)
+
+    def process(self, report, offset: int = 0) -> None:
+        """
+        Encode a raw input report and send it to the subscribed clients.
+
+        Args:
+            report (bytes | bytearray | memoryview): input report as read from the device.
+            offset (int, optional): position of the USB layout inside ``report``, 1 for BT reports. Defaults to 0.
+        """
+        # the sensor time keeps running without subscribers, so timestamps stay continuous
+        sensor_time = _SENSOR_TIME.unpack_from(report, offset + _SENSOR_TIME_OFFSET)[0]
+        previous = self._sensor_time
+        if previous is not None:
+            self._timestamp_us += ((sensor_time - previous) & 0xFFFFFFFF) * 1_000_000 / SENSOR_CLOCK_HZ
+        self._sensor_time = sensor_time
+
+        targets = self.targets
+        if not targets:
+            return
+
+        (
+            left_x,
+            left_y,
+            right_x,
+            right_y,
+            l2,
+            r2,
+            buttons0,
+            buttons1,
+            buttons2,
+            gyro_x,
+            gyro_y,
+            gyro_z,
+            accel_x,
+            accel_y,
+            accel_z,
+            _,
+            touch0_id,
+            touch0_low,
+            touch0_mid,
+            touch0_high,
+            touch1_id,
+            touch1_low,
+            touch1_mid,
+            touch1_high,
+            battery,
+        ) = _INPUT.unpack_from(report, offset)
+        self.battery = battery = _battery(battery)
+        self.packets += 1
+
+        dpad = _HAT_BITS[buttons0 & 0x0F]
+        face = _BUTTONS2_FACE[buttons0]
+        gyro_bias, gyro_scale = self._gyro_bias, self._gyro_scale
+        accel_bias, accel_scale = self._accel_bias, self._accel_scale
+
+        packet = self._packet
+        _DATA_PACKET.pack_into(
+            packet,
+            HEADER.size,
+            MSG_DATA,
+            self.index,
+            STATE_CONNECTED,
+            MODEL_FULL_GYRO,
+            _CONNECTION[self.connection_type],
+            self.mac,
+            battery,
+            1,
+            self.packets,
+            dpad | _BUTTONS1[buttons1],
+            face | _BUTTONS2_SHOULDERS[buttons1],
+            buttons2 & 0x01,
+            (buttons2 >> 1) & 0x01,
+            left_x,
+            255 - left_y,  # DSU sticks point up with larger values
+            right_x,
+            255 - right_y,
+            255 if dpad & 0x80 else 0,
+            255 if dpad & 0x40 else 0,
+            255 if dpad & 0x20 else 0,
+            255 if dpad & 0x10 else 0,
+            255 if face & 0x80 else 0,
+            255 if face & 0x40 else 0,
+            255 if face & 0x20 else 0,
+            255 if face & 0x10 else 0,
+            255 if buttons1 & 0x02 else 0,
+            255 if buttons1 & 0x01 else 0,
+            r2,
+            l2,
+            0 if touch0_id & 0x80 else 1,
+            touch0_id & 0x7F,
+            ((touch0_mid & 0x0F) << 8) | touch0_low,
+            (touch0_high << 4) | (touch0_mid >> 4),
+            0 if touch1_id & 0x80 else 1,
+            touch1_id & 0x7F,
+            ((touch1_mid & 0x0F) << 8) | touch1_low,
+            (touch1_high << 4) | (touch1_mid >> 4),
+            int(self._timestamp_us),
+            (accel_x - accel_bias[0]) * accel_scale[0],
+            (accel_y - accel_bias[1]) * accel_scale[1],
+            (accel_z - accel_bias[2]) * accel_scale[2],
+            (gyro_x - gyro_bias[0]) * gyro_scale[0],  # pitch
+            (gyro_y - gyro_bias[1]) * gyro_scale[1],  # yaw
+            (gyro_z - gyro_bias[2]) * gyro_scale[2],  # roll
+        )
+        _CRC.pack_into(packet, _CRC_OFFSET, 0)
+        _seal(packet)
+
+        sendto = self.server.socket.sendto
+        for address in targets:
+            try:
+                sendto(packet, address)
+            except OSError:
+                pass  # client went away, its subscription expires on its own
+
+
+class DsuServer:
+    """
+    Serves up to four controllers over the DSU protocol.
+
+    A daemon thread answers version, port info and data requests; data requests subscribe the client for
+    :data:`SUBSCRIPTION_TIMEOUT` seconds, by slot, by MAC address or to every slot, and clients repeat them to stay
+    subscribed. The data packets themselves are sent from the report threads of the controllers.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DSU_PORT, server_id: int | None = None) -> None:
+        """
+        Args:
+            host (str, optional): address to listen on, "0.0.0.0" for remote clients. Defaults to "127.0.0.1".
+            port (int, optional): UDP port, 0 picks a free one. Defaults to 26760.
+            server_id (int | None, optional): id sent in every packet. Defaults to None, a random id.
+        """
+        self.server_id = random.getrandbits(32) if server_id is None else server_id
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.settimeout(0.5)
+        self.address = self.socket.getsockname()
+
+        self.slots: list[DsuSlot | None] = [None] * SLOTS
+        self.requests = 0
+        self.invalid = 0  # dropped requests: bad magic, crc or length
+
+        self._lock = threading.Lock()
+        self._subscriptions: dict[tuple, float] = {}  # (address, flags, slot, mac) -> expiry time
+        self._stop = False
+        self._thread = threading.Thread(target=self.serve, daemon=True)
+        self._thread.start()
+
+    def add(self, controller: "DualsenseController", slot: int | None = None) -> DsuSlot:
+        """
+        Serve a controller, its report thread sends the data packets from now on.
+
+        Args:
+            controller (DualsenseController): the controller.
+            slot (int | None, optional): slot 0-3. Defaults to None, the first free slot.
+
+        Raises:
+            ValueError: no free slot or the slot is taken
+
+        Returns:
+            DsuSlot: the slot
+        """
+        with self._lock:
+            if slot is None:
+                free = [index for index, entry in enumerate(self.slots) if entry is None]
+                if not free:
+                    raise ValueError("every DSU slot is taken")
+                slot = free[0]
+            elif not 0 <= slot < SLOTS or self.slots[slot] is not None:
+                raise ValueError(f"DSU slot {slot} is not available")
+
+            entry = DsuSlot(
+                self,
+                slot,
+                controller.conType,
+                _mac(controller.serial_number, controller.device_path),  # type: ignore
+                controller.calibration,
+            )
+            entry.controller = controller
+            self.slots[slot] = entry
+            self._update_targets()
+        controller.dsu = entry
+        return entry
+
+    def remove(self, slot: DsuSlot) -> None:
+        with self._lock:
+            if self.slots[slot.index] is slot:
+                self.slots[slot.index] = None
+        controller = slot.controller
+        if controller is not None and controller.dsu is slot:
+            controller.dsu = None
+        slot.targets = ()
+
+    def close(self) -> None:
+        """Detach every controller and stop the server."""
+        for slot in list(self.slots):
+            if slot is not None:
+                self.remove(slot)
+        self._stop = True
+        self._thread.join()
+        self.socket.close()
+
+    def __enter__(self) -> "DsuServer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def serve(self) -> None:
+        """background thread answering requests"""
+        buffer = bytearray(1024)
+        last_prune = time.monotonic()
+        while not self._stop:
+            try:
+                length, address = self.socket.recvfrom_into(buffer)
+            except socket.timeout:
+                length = 0
+            except OSError:
+                if self._stop:
+                    return
+                length = 0  # e.g. ICMP port unreachable of a client that went away, reported on Windows
+
+            if length:
+                self._handle(memoryview(buffer)[:length], address)
+
+            now = time.monotonic()
+            if now - last_prune >= 1.0:
+                last_prune = now
+                with self._lock:
+                    expired = [key for key, expiry in self._subscriptions.items() if expiry < now]
+                    for key in expired:
+                        del self._subscriptions[key]
+                    if expired:
+                        self._update_targets()
+
+    def _handle(self, packet: memoryview, address) -> None:
+        if len(packet) < HEADER.size + _MESSAGE.size:
+            self.invalid += 1
+            return
+        magic, _, payload_length, _, client_id = HEADER.unpack_from(packet)
+        if magic != CLIENT_MAGIC or HEADER.size + payload_length > len(packet) or not _verify(packet):
+            self.invalid += 1
+            return
+        self.requests += 1
+        message = _MESSAGE.unpack_from(packet, HEADER.size)[0]
+        body = HEADER.size + _MESSAGE.size
+
+        if message == MSG_VERSION:
+            self._reply(_VERSION_PACKET, address, MSG_VERSION, PROTOCOL_VERSION)
+        elif message == MSG_PORTS and len(packet) >= body + 4:
+            count = struct.unpack_from("<i", packet, body)[0]
+            for index in packet[body + 4 : body + 4 + max(0, min(count, SLOTS))]:
+                slot = self.slots[index] if index < SLOTS else None
+                if slot is not None:
+                    shared = slot.shared()
+                else:
+                    shared = (index, STATE_DISCONNECTED, 0, 0, bytes(6), 0)
+                self._reply(_PORT_PACKET, address, MSG_PORTS, *shared)
+        elif message == MSG_DATA and len(packet) >= body + 8:
+            flags, slot_index = packet[body], packet[body + 1]
+            mac = bytes(packet[body + 2 : body + 8])
+            key = (address, flags, slot_index if flags & REGISTER_SLOT else None, mac if flags & REGISTER_MAC else None)
+            with self._lock:
+                known = key in self._subscriptions
+                self._subscriptions[key] = time.monotonic() + SUBSCRIPTION_TIMEOUT
+                if not known:
+                    self._update_targets()
+
+    def _reply(self, layout: struct.Struct, address, *values) -> None:
+        packet = bytearray(HEADER.size + layout.size)
+        HEADER.pack_into(packet, 0, SERVER_MAGIC, PROTOCOL_VERSION, layout.size, 0, self.server_id)
+        layout.pack_into(packet, HEADER.size, *values)
+        _seal(packet)
+        try:
+            self.socket.sendto(packet, address)
+        except OSError:
+            pass
+
+    def _update_targets(self) -> None:
+        """Recompute the addresses of every slot, called with the lock held."""
+        for slot in self.slots:
+            if slot is None:
+                continue
+            targets = []
+            for address, flags, index, mac in self._subscriptions:
+                if flags & REGISTER_SLOT and index != slot.index:
+                    continue
+                if flags & REGISTER_MAC and mac != slot.mac:
+                    continue
+                if address not in targets:
+                    targets.append(address)
+            slot.targets = tuple(targets)
+
+
+@dataclass
+class DsuData:
+    """One data packet as received by :class:`DsuClient`."""
+
+    slot: int
+    packet_number: int
+    buttons1: int
+    buttons2: int
+    ps: bool
+    touch: bool
+    left_x: int
+    left_y: int
+    right_x: int
+    right_y: int
+    analog: tuple[int, ...]  # dpad left, down, right, up, square, cross, circle, triangle, R1, L1, R2, L2
+    touches: tuple[tuple[bool, int, int, int], tuple[bool, int, int, int]]  # active, id, x, y
+    timestamp_us: int
+    accel: tuple[float, float, float]  # g
+    gyro: tuple[float, float, float]  # pitch, yaw, roll in deg/s
+    received_ns: int  # time.perf_counter_ns() at arrival
+
+
+class DsuClient:
+    """
+    Client side of the DSU protocol, for tests and loopback benchmarks of :class:`DsuServer`.
+
+    .. code-block:: python
+
+        client = DsuClient(port=server.address[1])
+        client.subscribe(slot=0)
+        data = client.receive(timeout=1.0)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DSU_PORT, client_id: int | None = None) -> None:
+        self.server = (host, port)
+        self.client_id = random.getrandbits(32) if client_id is None else client_id
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.connect(self.server)
+        self.invalid = 0
+        self._buffer = bytearray(1024)
+
+    def _send(self, message: int, payload: bytes = b"") -> None:
+        packet = bytearray(HEADER.size + _MESSAGE.size + len(payload))
+        HEADER.pack_into(packet, 0, CLIENT_MAGIC, PROTOCOL_VERSION, len(packet) - HEADER.size, 0, self.client_id)
+        _MESSAGE.pack_into(packet, HEADER.size, message)
+        packet[HEADER.size + _MESSAGE.size :] = payload
+        _seal(packet)
+        self.socket.send(packet)
+
+    def _receive(self, message: int, timeout: float | None) -> memoryview | None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            self.socket.settimeout(remaining)
+            try:
+                length = self.socket.recv_into(self._buffer)
+            except (socket.timeout, BlockingIOError):
+                return None
+            packet = memoryview(self._buffer)[:length]
+            if length < HEADER.size + _MESSAGE.size or bytes(packet[:4]) != SERVER_MAGIC or not _verify(packet):
+                self.invalid += 1
+                continue
+            if _MESSAGE.unpack_from(packet, HEADER.size)[0] == message:
+                return packet
+            # other message types are skipped, e.g. data packets while waiting for a port info reply
+
+    def request_version(self, timeout: float = 1.0) -> int | None:
+        self._send(MSG_VERSION)
+        packet = self._receive(MSG_VERSION, timeout)
+        return None if packet is None else _VERSION_PACKET.unpack_from(packet, HEADER.size)[1]
+
+    def request_ports(self, slots: Iterable[int] = range(SLOTS), timeout: float = 1.0) -> list[tuple]:
+        """
+        Returns:
+            list[tuple]: (slot, state, model, connection type, mac, battery) of every slot that was answered
+        """
+        slots = bytes(slots)
+        self._send(MSG_PORTS, struct.pack("<i", len(slots)) + slots)
+        ports = []
+        for _ in slots:
+            packet = self._receive(MSG_PORTS, timeout)
+            if packet is None:
+                break
+            ports.append(_PORT_PACKET.unpack_from(packet, HEADER.size)[1:])
+        return ports
+
+    def subscribe(self, slot: int | None = None, mac: bytes | None = None) -> None:
+        """
+        Request data packets for the next :data:`SUBSCRIPTION_TIMEOUT` seconds, repeat to stay subscribed.
+
+        Args:
+            slot (int | None, optional): only this slot. Defaults to None.
+            mac (bytes | None, optional): only the controller with this MAC address. Defaults to None.
+        """
+        flags = (REGISTER_SLOT if slot is not None else 0) | (REGISTER_MAC if mac is not None else 0)
+        self._send(MSG_DATA, struct.pack("<BB6s", flags, slot or 0, mac or bytes(6)))
+
+    def receive(self, timeout: float | None = 1.0) -> DsuData | None:
+        """
+        Wait for the next data packet.
+
+        Returns:
+            DsuData | None: the packet, None on timeout
+        """
+        packet = self._receive(MSG_DATA, timeout)
+        if packet is None:
+            return None
+        received_ns = time.perf_counter_ns()
+        values = _DATA_PACKET.unpack_from(packet, HEADER.size)
+        return DsuData(
+            slot=values[1],
+            packet_number=values[8],
+            buttons1=values[9],
+            buttons2=values[10],
+            ps=bool(values[11]),
+            touch=bool(values[12]),
+            left_x=values[13],
+            left_y=values[14],
+            right_x=values[15],
+            right_y=values[16],
+            analog=values[17:29],
+            touches=((bool(values[29]), *values[30:33]), (bool(values[33]), *values[34:37])),  # type: ignore
+            timestamp_us=values[37],
+            accel=values[38:41],
+            gyro=values[41:44],
+            received_ns=received_ns,
+        )
+
+    def close(self) -> None:
+        self.socket.close()
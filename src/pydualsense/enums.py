@@ -1,4 +1,4 @@
-from enum import IntFlag
+from enum import IntEnum, IntFlag
 
 
 class ConnectionType(IntFlag):
@@ -91,3 +91,51 @@ class BatteryState(IntFlag):
     POWER_SUPPLY_STATUS_ERROR = 0xF
     POWER_SUPPLY_TEMP_OR_VOLTAGE_OUT_OF_RANGE = 0xA
     POWER_SUPPLY_STATUS_UNKNOWN = 0x0
+
+
+class Button(IntFlag):
+    # the dpad hat of byte 8 is expanded into one bit per direction
+    DpadUp = 0x1
+    DpadDown = 0x2
+    DpadLeft = 0x4
+    DpadRight = 0x8
+    Square = 0x10
+    Cross = 0x20
+    Circle = 0x40
+    Triangle = 0x80
+    # byte 9
+    L1 = 0x100
+    R1 = 0x200
+    L2 = 0x400  # digital trigger click
+    R2 = 0x800
+    Share = 0x1000
+    Options = 0x2000
+    L3 = 0x4000
+    R3 = 0x8000
+    # byte 10
+    PS = 0x10000
+    Touchpad = 0x20000
+    Mic = 0x40000
+
+
+class Axis(IntEnum):
+    # value is the byte offset inside the input report
+    LeftX = 1
+    LeftY = 2
+    RightX = 3
+    RightY = 4
+    L2 = 5
+    R2 = 6
+
+
+class Gesture(IntEnum):
+    Tap = 0
+    Swipe = 1
+    Scroll = 2  # two fingers moving together
+    Pinch = 3  # two fingers moving apart or together
+
+
+class GesturePhase(IntEnum):
+    Begin = 0
+    Update = 1
+    End = 2  # also the only phase of taps and swipes
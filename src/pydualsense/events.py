@@ -0,0 +1,204 @@
+import struct
+from dataclasses import dataclass
+from typing import Callable
+
+from .decoder import _STICK, _TRIGGER
+from .enums import Axis, Button
+
+# dpad hat value -> Button.Dpad* bits
+_DPAD_MASK = (
+    Button.DpadUp,
+    Button.DpadUp | Button.DpadRight,
+    Button.DpadRight,
+    Button.DpadDown | Button.DpadRight,
+    Button.DpadDown,
+    Button.DpadDown | Button.DpadLeft,
+    Button.DpadLeft,
+    Button.DpadUp | Button.DpadLeft,
+) + (0,) * 8
+_DPAD_MASK = tuple(int(mask) for mask in _DPAD_MASK)
+
+_TOUCH = struct.Struct("<2I")
+_TOUCH_OFFSET = 33
+
+
+@dataclass(frozen=True, slots=True)
+class ButtonEvent:
+    button: Button
+    pressed: bool
+
+
+@dataclass(frozen=True, slots=True)
+class AxisEvent:
+    axis: Axis
+    value: float
+
+
+@dataclass(frozen=True, slots=True)
+class TouchEvent:
+    index: int  # touch point 0 or 1
+    active: bool
+    ID: int
+    X: int
+    Y: int
+
+
+ButtonHandler = Callable[[ButtonEvent], None]
+AxisHandler = Callable[[AxisEvent], None]
+TouchHandler = Callable[[TouchEvent], None]
+
+
+class _AxisSubscription:
+    __slots__ = ("axis", "handler", "threshold", "raw", "value")
+
+    def __init__(self, axis: Axis, handler: AxisHandler, threshold: float) -> None:
+        self.axis = axis
+        self.handler = handler
+        self.threshold = threshold
+        self.raw = -1  # forces an event on the first report
+        self.value = 0.0
+
+
+class InputEvents:
+    """
+    Turns raw input reports into press/release/change events.
+
+    Every report is compared against the previous one: the button bytes are merged into one :class:`Button` mask
+    and XORed with the last mask, so only the bits that flipped are dispatched. Axes and touch points are only
+    looked at when somebody subscribed to them. Handlers are called from the thread that feeds :func:`process`.
+    """
+
+    def __init__(self) -> None:
+        self.buttons = 0  # Button mask of the last report
+
+        self._raw_buttons = -1
+        self._watched = 0  # Button bits with at least one handler
+        self._press: dict[int, list[ButtonHandler]] = {}
+        self._release: dict[int, list[ButtonHandler]] = {}
+
+        self._axes: list[_AxisSubscription] = []
+
+        self._touch = (0x80, 0x80)
+        self._touch_handlers: list[TouchHandler] = []
+
+    def on_press(self, button: Button, handler: ButtonHandler) -> None:
+        """
+        Call ``handler`` when one of the buttons in ``button`` gets pressed.
+
+        Args:
+            button (Button): a single button or a combination of them.
+            handler (ButtonHandler): called with a :class:`ButtonEvent`.
+        """
+        self._subscribe(self._press, button, handler)
+
+    def on_release(self, button: Button, handler: ButtonHandler) -> None:
+        """
+        Call ``handler`` when one of the buttons in ``button`` gets released.
+
+        Args:
+            button (Button): a single button or a combination of them.
+            handler (ButtonHandler): called with a :class:`ButtonEvent`.
+        """
+        self._subscribe(self._release, button, handler)
+
+    def on_button(self, button: Button, handler: ButtonHandler) -> None:
+        """Call ``handler`` on press and on release of ``button``."""
+        self.on_press(button, handler)
+        self.on_release(button, handler)
+
+    def on_axis(self, axis: Axis, handler: AxisHandler, threshold: float = 0.01) -> None:
+        """
+        Call ``handler`` when ``axis`` moved at least ``threshold`` away from the last value it was called with.
+
+        Args:
+            axis (Axis): stick or trigger axis.
+            handler (AxisHandler): called with an :class:`AxisEvent`, the value is scaled like in DeviceInputState.
+            threshold (float, optional): minimum change. Defaults to 0.01.
+        """
+        self._axes.append(_AxisSubscription(axis, handler, threshold))
+
+    def on_touch(self, handler: TouchHandler) -> None:
+        """Call ``handler`` whenever a touch point starts, moves or ends."""
+        self._touch_handlers.append(handler)
+
+    def remove(self, handler: Callable) -> None:
+        """Unsubscribe ``handler`` from every event it was registered for."""
+        for handlers in (self._press, self._release):
+            for bit in list(handlers):
+                handlers[bit] = [h for h in handlers[bit] if h != handler]
+                if not handlers[bit]:
+                    del handlers[bit]
+        self._watched = 0
+        for bit in (*self._press, *self._release):
+            self._watched |= bit
+
+        self._axes = [sub for sub in self._axes if sub.handler != handler]
+        self._touch_handlers = [h for h in self._touch_handlers if h != handler]
+
+    def process(self, report, offset: int = 0) -> None:
+        """
+        Dispatch the events of one input report.
+
+        Args:
+            report (bytes | bytearray | memoryview): raw input report.
+            offset (int, optional): position of the USB layout inside ``report``, 1 for BT reports. Defaults to 0.
+        """
+        raw = report[offset + 8] | (report[offset + 9] << 8) | (report[offset + 10] << 16)
+        if raw != self._raw_buttons:
+            self._raw_buttons = raw
+            buttons = (raw & ~0x0F) | _DPAD_MASK[raw & 0x0F]
+            flipped = (buttons ^ self.buttons) & self._watched
+            self.buttons = buttons
+
+            while flipped:
+                bit = flipped & -flipped
+                flipped ^= bit
+                if buttons & bit:
+                    handlers = self._press.get(bit)
+                    pressed = True
+                else:
+                    handlers = self._release.get(bit)
+                    pressed = False
+                if handlers:
+                    event = ButtonEvent(Button(bit), pressed)
+                    for handler in handlers:
+                        handler(event)
+
+        if self._axes:
+            self._process_axes(report, offset)
+
+        if self._touch_handlers:
+            touch = _TOUCH.unpack_from(report, offset + _TOUCH_OFFSET)
+            if touch != self._touch:
+                self._process_touch(touch)
+
+    def _subscribe(self, handlers: dict[int, list], button: Button, handler: Callable) -> None:
+        mask = int(button)
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            handlers.setdefault(bit, []).append(handler)
+            self._watched |= bit
+
+    def _process_axes(self, report, offset: int) -> None:
+        for sub in self._axes:
+            raw = report[offset + sub.axis]
+            if raw == sub.raw:
+                continue
+            first = sub.raw < 0
+            sub.raw = raw
+            value = _TRIGGER[raw] if sub.axis >= Axis.L2 else _STICK[raw]
+            if first or abs(value - sub.value) >= sub.threshold:
+                sub.value = value
+                sub.handler(AxisEvent(sub.axis, value))
+
+    def _process_touch(self, touch: tuple) -> None:
+        previous = self._touch
+        self._touch = touch
+        for index in (0, 1):
+            word = touch[index]
+            if word == previous[index]:
+                continue
+            event = TouchEvent(index, (word & 0x80) == 0, word & 0x7F, (word >> 8) & 0x0FFF, word >> 20)
+            for handler in self._touch_handlers:
+                handler(event)
@@ -1,90 +1,389 @@
 # python implementation of Nielk1/ExtendInput.DataTools.DualSense.TriggerEffectGenerator.cs
 #
 # https://gist.github.com/Nielk1/6d54cc2c00d2201ccb8c2720ad7538db
+#
+# The effect_* functions return the raw 11 byte effect (mode followed by its 10 parameters), which is what the
+# output report carries per trigger. They are memoized, as applications tend to switch between a handful of
+# effects, and the returned bytes can be applied with TriggerModel.set_effect without building new models.
+# The ffb_* functions return the same effects as new TriggerModel instances.
 
-from typing import TypeVar
+from functools import lru_cache
+from typing import Callable, Sequence, TypeVar
 
 from .enums import TriggerModes
 from .models import TriggerModel
 
 T = TypeVar("T", int, float)
 
+EFFECT_LENGTH = 11
+EFFECT_CACHE_SIZE = 256  # distinct effects kept per generator
+
 
 def clip(value: T, min_value: T, max_value: T) -> T:
     return max(min(max_value, value), min_value)
 
 
-def ffb_off() -> TriggerModel:
-    dst: TriggerModel = TriggerModel()
-    dst.mode = TriggerModes.FFB_Off
-    return dst
+def _effect(mode: TriggerModes, *parameters: int) -> bytes:
+    effect = bytearray(EFFECT_LENGTH)
+    effect[0] = mode
+    effect[1 : 1 + len(parameters)] = bytes(parameters)
+    return bytes(effect)
 
 
-def ffb_feedback(position: int, strength: int) -> TriggerModel:
-    dst: TriggerModel = TriggerModel()
+def _zone_effect(mode: TriggerModes, active_zones: int, zone_values: int, *parameters: int) -> bytes:
+    """effect with a 10 bit zone mask and 3 bits per zone, as used by feedback and vibration"""
+    return _effect(
+        mode,
+        active_zones & 0xFF,
+        (active_zones >> 8) & 0xFF,
+        zone_values & 0xFF,
+        (zone_values >> 8) & 0xFF,
+        (zone_values >> 16) & 0xFF,
+        (zone_values >> 24) & 0xFF,
+        *parameters,
+    )
+
+
+def _zones(values: Sequence[int]) -> tuple[int, int]:
+    """zone mask and packed 3 bit values of the zones with a value of 1-8"""
+    active_zones = 0
+    zone_values = 0
+    for i, value in enumerate(values[:10]):
+        if value > 0:
+            zone_values |= ((clip(value, 1, 8) - 1) & 0x07) << (3 * i)
+            active_zones |= 1 << i
+    return active_zones, zone_values
+
+
+# effects of the current firmware
+
 
+@lru_cache(maxsize=1)
+def effect_off() -> bytes:
+    return _effect(TriggerModes.FFB_Off)
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_feedback(position: int, strength: int) -> bytes:
+    """
+    Resistance from ``position`` to the end of the trigger.
+
+    Args:
+        position (int): start zone 0-9.
+        strength (int): resistance 1-8.
+    """
     position = clip(position, 0, 9)
     strength = clip(strength, 1, 8)
+    return effect_multiple_position_feedback((0,) * position + (strength,) * (10 - position))
 
-    force_value = strength - 1
-    force_zones = 0
-    active_zones = 0
-    for i in range(position, 10):
-        force_zones |= force_value << (3 * i)
-        active_zones |= 1 << i
 
-    dst.mode = TriggerModes.FFB_Feedback
-    dst.forces[0] = (active_zones >> 0) & 0xFF
-    dst.forces[1] = (active_zones >> 8) & 0xFF
-    dst.forces[2] = (force_zones >> 0) & 0xFF
-    dst.forces[3] = (force_zones >> 8) & 0xFF
-    dst.forces[4] = (force_zones >> 16) & 0xFF
-    dst.forces[5] = (force_zones >> 24) & 0xFF
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_multiple_position_feedback(strengths: tuple[int, ...]) -> bytes:
+    """
+    Args:
+        strengths (tuple[int, ...]): resistance 0-8 of each of the 10 zones, 0 is no resistance.
+    """
+    active_zones, force_zones = _zones(strengths)
+    if not active_zones:
+        return effect_off()
+    return _zone_effect(TriggerModes.FFB_Feedback, active_zones, force_zones)
 
-    return dst
 
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_slope_feedback(start_position: int, end_position: int, start_strength: int, end_strength: int) -> bytes:
+    """
+    Resistance changing linearly from ``start_strength`` to ``end_strength``, and constant after ``end_position``.
 
-def ffb_weapon(start_position: int, end_position: int, strength: int) -> TriggerModel:
-    dst: TriggerModel = TriggerModel()
+    Args:
+        start_position (int): start zone 0-8.
+        end_position (int): zone 1-9 after the start zone.
+        start_strength (int): resistance 1-8 at the start.
+        end_strength (int): resistance 1-8 at the end.
+    """
+    start_position = clip(start_position, 0, 8)
+    end_position = clip(end_position, start_position + 1, 9)
+    start_strength = clip(start_strength, 1, 8)
+    end_strength = clip(end_strength, 1, 8)
 
+    slope = (end_strength - start_strength) / (end_position - start_position)
+    strengths = [0] * 10
+    for i in range(start_position, 10):
+        strengths[i] = round(start_strength + slope * (i - start_position)) if i <= end_position else end_strength
+    return effect_multiple_position_feedback(tuple(strengths))
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_weapon(start_position: int, end_position: int, strength: int) -> bytes:
+    """
+    Resistance between two zones that snaps away at the end, like a gun trigger.
+
+    Args:
+        start_position (int): start zone 2-7.
+        end_position (int): end zone, from the start zone up to 8.
+        strength (int): resistance 1-8.
+    """
     start_position = clip(start_position, 2, 7)
     end_position = clip(end_position, start_position, 8)
     strength = clip(strength, 1, 8)
 
     start_and_stop_zone = (1 << start_position) | (1 << end_position)
+    return _effect(TriggerModes.FFB_Weapon, start_and_stop_zone & 0xFF, (start_and_stop_zone >> 8) & 0xFF, strength - 1)
 
-    dst.mode = TriggerModes.FFB_Weapon
-    dst.forces[0] = (start_and_stop_zone >> 0) & 0xFF
-    dst.forces[1] = (start_and_stop_zone >> 8) & 0xFF
-    dst.forces[2] = strength - 1
 
-    return dst
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_bow(start_position: int, end_position: int, strength: int, snap_force: int) -> bytes:
+    """
+    Resistance between two zones that snaps back to the start when released, like a bow string.
 
+    Args:
+        start_position (int): start zone 0-7.
+        end_position (int): end zone 1-8 after the start zone.
+        strength (int): resistance 1-8.
+        snap_force (int): force 1-8 of the snap back.
+    """
+    start_position = clip(start_position, 0, 7)
+    end_position = clip(end_position, start_position + 1, 8)
+    strength = clip(strength, 1, 8)
+    snap_force = clip(snap_force, 1, 8)
+
+    start_and_stop_zone = (1 << start_position) | (1 << end_position)
+    force_pair = ((strength - 1) & 0x07) | (((snap_force - 1) & 0x07) << 3)
+    return _effect(
+        TriggerModes.FFB_Bow,
+        start_and_stop_zone & 0xFF,
+        (start_and_stop_zone >> 8) & 0xFF,
+        force_pair & 0xFF,
+        (force_pair >> 8) & 0xFF,
+    )
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_galloping(
+    start_position: int, end_position: int, first_foot: int, second_foot: int, frequency: int
+) -> bytes:
+    """
+    Two taps per cycle between two zones, like a galloping horse.
+
+    Args:
+        start_position (int): start zone 0-8.
+        end_position (int): end zone 1-9 after the start zone.
+        first_foot (int): time of the first tap 0-6 in the cycle.
+        second_foot (int): time of the second tap 1-7, after the first tap.
+        frequency (int): cycles per second 1-255.
+    """
+    start_position = clip(start_position, 0, 8)
+    end_position = clip(end_position, start_position + 1, 9)
+    first_foot = clip(first_foot, 0, 6)
+    second_foot = clip(second_foot, first_foot + 1, 7)
+    frequency = clip(frequency, 1, 255)
+
+    start_and_stop_zone = (1 << start_position) | (1 << end_position)
+    time_and_ratio = (second_foot & 0x07) | ((first_foot & 0x07) << 3)
+    return _effect(
+        TriggerModes.FFB_Galloping,
+        start_and_stop_zone & 0xFF,
+        (start_and_stop_zone >> 8) & 0xFF,
+        time_and_ratio,
+        frequency,
+    )
 
-def ffb_vibration(position: int, amplitude: int, frequency: int) -> TriggerModel:
-    dst: TriggerModel = TriggerModel()
 
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_vibration(position: int, amplitude: int, frequency: int) -> bytes:
+    """
+    Vibration from ``position`` to the end of the trigger.
+
+    Args:
+        position (int): start zone 0-9.
+        amplitude (int): amplitude 1-8.
+        frequency (int): vibrations per second 1-255.
+    """
     position = clip(position, 0, 9)
     amplitude = clip(amplitude, 1, 8)
+    return effect_multiple_position_vibration(frequency, (0,) * position + (amplitude,) * (10 - position))
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_multiple_position_vibration(frequency: int, amplitudes: tuple[int, ...]) -> bytes:
+    """
+    Args:
+        frequency (int): vibrations per second 1-255.
+        amplitudes (tuple[int, ...]): amplitude 0-8 of each of the 10 zones, 0 does not vibrate.
+    """
+    active_zones, amplitude_zones = _zones(amplitudes)
+    if not active_zones:
+        return effect_off()
+    return _zone_effect(TriggerModes.FFB_Vibration, active_zones, amplitude_zones, 0, 0, clip(frequency, 1, 255))
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_machine(
+    start_position: int, end_position: int, amplitude_a: int, amplitude_b: int, frequency: int, period: int
+) -> bytes:
+    """
+    Vibration between two zones that alternates between two amplitudes.
+
+    Args:
+        start_position (int): start zone 0-8.
+        end_position (int): end zone 1-9 after the start zone.
+        amplitude_a (int): first amplitude 0-7.
+        amplitude_b (int): second amplitude 0-7.
+        frequency (int): vibrations per second 1-255.
+        period (int): time between the amplitude changes in tenths of a second 0-255.
+    """
+    start_position = clip(start_position, 0, 8)
+    end_position = clip(end_position, start_position + 1, 9)
+    amplitude_a = clip(amplitude_a, 0, 7)
+    amplitude_b = clip(amplitude_b, 0, 7)
     frequency = clip(frequency, 1, 255)
+    period = clip(period, 0, 255)
+
+    start_and_stop_zone = (1 << start_position) | (1 << end_position)
+    strength_pair = (amplitude_a & 0x07) | ((amplitude_b & 0x07) << 3)
+    return _effect(
+        TriggerModes.FFB_Machine,
+        start_and_stop_zone & 0xFF,
+        (start_and_stop_zone >> 8) & 0xFF,
+        strength_pair,
+        frequency,
+        period,
+    )
+
+
+# effects of older firmware versions, still understood by the current one
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_simple_feedback(position: int, strength: int) -> bytes:
+    """
+    Args:
+        position (int): start position 0-255.
+        strength (int): resistance 0-255.
+    """
+    return _effect(TriggerModes.FFB_SimpleFeedback, clip(position, 0, 255), clip(strength, 0, 255))
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_simple_weapon(start_position: int, end_position: int, strength: int) -> bytes:
+    """
+    Args:
+        start_position (int): start position 0-255.
+        end_position (int): end position 0-255.
+        strength (int): resistance 0-255.
+    """
+    return _effect(
+        TriggerModes.FFB_SimpleWeapon,
+        clip(start_position, 0, 255),
+        clip(end_position, 0, 255),
+        clip(strength, 0, 255),
+    )
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_simple_vibration(position: int, amplitude: int, frequency: int) -> bytes:
+    """
+    Args:
+        position (int): start position 0-255.
+        amplitude (int): amplitude 0-255.
+        frequency (int): vibrations per second 0-255.
+    """
+    return _effect(
+        TriggerModes.FFB_SimpleVibration, clip(frequency, 0, 255), clip(amplitude, 0, 255), clip(position, 0, 255)
+    )
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_limited_feedback(position: int, strength: int) -> bytes:
+    """
+    Args:
+        position (int): start position 0-255.
+        strength (int): resistance 0-10, 0 turns the effect off.
+    """
+    strength = clip(strength, 0, 10)
+    if strength == 0:
+        return effect_off()
+    return _effect(TriggerModes.FFB_LimitedFeedback, clip(position, 0, 255), strength)
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def effect_limited_weapon(start_position: int, end_position: int, strength: int) -> bytes:
+    """
+    Args:
+        start_position (int): start position 16-255.
+        end_position (int): end position, at most 100 after the start position.
+        strength (int): resistance 0-10, 0 turns the effect off.
+    """
+    start_position = clip(start_position, 0x10, 255)
+    end_position = clip(end_position, start_position, min(start_position + 100, 255))
+    strength = clip(strength, 0, 10)
+    if strength == 0:
+        return effect_off()
+    return _effect(TriggerModes.FFB_LimitedWeapon, start_position, end_position, strength)
+
+
+# raw modes
+
+
+@lru_cache(maxsize=1)
+def effect_reset() -> bytes:
+    """Mode 0, which lets the trigger move freely and resets the trigger motor."""
+    return _effect(TriggerModes.Off)
+
+
+@lru_cache(maxsize=1)
+def effect_calibration() -> bytes:
+    """Start the trigger calibration of the controller."""
+    return _effect(TriggerModes.Calibration)
+
+
+# every mode value of TriggerModes and the generator of its effects, the legacy Rigid/Pulse names are aliases
+EFFECTS: dict[TriggerModes, Callable[..., bytes]] = {
+    TriggerModes.Off: effect_reset,
+    TriggerModes.FFB_SimpleFeedback: effect_simple_feedback,  # Rigid
+    TriggerModes.FFB_SimpleWeapon: effect_simple_weapon,  # Pulse
+    TriggerModes.FFB_Off: effect_off,  # Rigid_B
+    TriggerModes.FFB_SimpleVibration: effect_simple_vibration,  # Pulse_B
+    TriggerModes.FFB_LimitedFeedback: effect_limited_feedback,
+    TriggerModes.FFB_LimitedWeapon: effect_limited_weapon,
+    TriggerModes.FFB_Feedback: effect_feedback,  # Rigid_A
+    TriggerModes.FFB_Bow: effect_bow,  # Pulse_A
+    TriggerModes.FFB_Galloping: effect_galloping,
+    TriggerModes.FFB_Weapon: effect_weapon,  # Rigid_AB
+    TriggerModes.FFB_Vibration: effect_vibration,  # Pulse_AB
+    TriggerModes.FFB_Machine: effect_machine,
+    TriggerModes.Calibration: effect_calibration,
+}
+
+
+def ffb_off() -> TriggerModel:
+    return TriggerModel.from_effect(effect_off())
+
+
+def ffb_feedback(position: int, strength: int) -> TriggerModel:
+    return TriggerModel.from_effect(effect_feedback(position, strength))
+
+
+def ffb_weapon(start_position: int, end_position: int, strength: int) -> TriggerModel:
+    return TriggerModel.from_effect(effect_weapon(start_position, end_position, strength))
+
+
+def ffb_vibration(position: int, amplitude: int, frequency: int) -> TriggerModel:
+    return TriggerModel.from_effect(effect_vibration(position, amplitude, frequency))
+
+
+def ffb_bow(start_position: int, end_position: int, strength: int, snap_force: int) -> TriggerModel:
+    return TriggerModel.from_effect(effect_bow(start_position, end_position, strength, snap_force))
+
+
+def ffb_galloping(
+    start_position: int, end_position: int, first_foot: int, second_foot: int, frequency: int
+) -> TriggerModel:
+    return TriggerModel.from_effect(effect_galloping(start_position, end_position, first_foot, second_foot, frequency))
 
-    strength_value = (amplitude - 1) & 0x07
-    amplitude_zones = 0
-    active_zones = 0
 
-    for i in range(position, 10):
-        amplitude_zones |= strength_value << (3 * i)
-        active_zones |= 1 << i
-
-    dst.mode = TriggerModes.FFB_Vibration
-    dst.forces[0] = (active_zones >> 0) & 0xFF
-    dst.forces[1] = (active_zones >> 8) & 0xFF
-    dst.forces[2] = (amplitude_zones >> 0) & 0xFF
-    dst.forces[3] = (amplitude_zones >> 8) & 0xFF
-    dst.forces[4] = (amplitude_zones >> 16) & 0xFF
-    dst.forces[5] = (amplitude_zones >> 24) & 0xFF
-    # dst.forces[6] = (amplitude_zones >> 32) & 0xFF
-    # dst.forces[7] = (amplitude_zones >> 40) & 0xFF
-    dst.forces[8] = frequency
-
-    return dst
+def ffb_machine(
+    start_position: int, end_position: int, amplitude_a: int, amplitude_b: int, frequency: int, period: int
+) -> TriggerModel:
+    return TriggerModel.from_effect(
+        effect_machine(start_position, end_position, amplitude_a, amplitude_b, frequency, period)
+    )
@@ -0,0 +1,306 @@
+import math
+import struct
+from dataclasses import dataclass
+from typing import Callable
+
+from .enums import Gesture, GesturePhase
+from .motion import SENSOR_CLOCK_HZ
+
+_TOUCH = struct.Struct("<Ix2I")  # sensor timestamp and the two touch words, see decoder
+_TOUCH_OFFSET = 28
+
+# velocities are restarted from a single sample after a pause this long, instead of being smoothed with a stale one
+_STALE = 0.1
+
+
+@dataclass(frozen=True, slots=True)
+class GestureEvent:
+    gesture: Gesture
+    phase: GesturePhase
+    timestamp: float  # seconds on the controller's sensor clock, see GestureTracker.time
+    x: float  # touchpad units (0-1919, 0-1079), the centre between both fingers for scroll and pinch
+    y: float
+    dx: float  # movement since the finger(s) touched down
+    dy: float
+    vx: float  # velocity in touchpad units per second
+    vy: float
+    scale: float = 1.0  # finger distance relative to touch down, pinch and scroll only
+    scale_velocity: float = 0.0  # change of scale per second
+
+
+GestureHandler = Callable[[GestureEvent], None]
+
+
+class _Contact:
+    __slots__ = ("id", "x", "y", "start_x", "start_y", "start_time", "time", "vx", "vy")
+
+    def __init__(self) -> None:
+        self.id = -1  # touch ID of the finger, -1 while the slot is free
+        self.x = 0
+        self.y = 0
+        self.start_x = 0
+        self.start_y = 0
+        self.start_time = 0.0
+        self.time = 0.0  # time of the last position change
+        self.vx = 0.0
+        self.vy = 0.0
+
+
+class GestureTracker:
+    """
+    Recognizes tap, swipe, two finger scroll and pinch on the touchpad.
+
+    .. code-block:: python
+
+        gestures = controller.enable_gestures()
+        gestures.on_gesture(lambda event: print(event.gesture.name, event.phase.name, event.dx, event.vx))
+
+    Contacts are keyed by the touch ID the controller assigns to every new finger, so they keep their identity when
+    the controller moves them between its two touch slots. The state lives in two preallocated contacts and a few
+    numbers; a report whose touch words did not change only advances the clock. Velocities are smoothed per contact
+    and timed with the sensor clock of the report, which is not affected by transport jitter.
+
+    Events are only sent when the gesture state changes: tap and swipe once when the finger lifts, scroll and pinch
+    with ``Begin`` once the fingers moved far enough, ``Update`` on every movement and ``End`` when a finger lifts.
+    """
+
+    def __init__(
+        self,
+        tap_time: float = 0.25,
+        tap_distance: float = 40.0,
+        swipe_distance: float = 200.0,
+        swipe_speed: float = 800.0,
+        scroll_distance: float = 40.0,
+        pinch_distance: float = 80.0,
+        smoothing: float = 0.5,
+    ) -> None:
+        """
+        Args:
+            tap_time (float, optional): longest touch in seconds that counts as tap. Defaults to 0.25.
+            tap_distance (float, optional): farthest a tapping finger may move, in touchpad units. Defaults to 40.0.
+            swipe_distance (float, optional): shortest swipe. Defaults to 200.0.
+            swipe_speed (float, optional): lowest mean speed of a swipe in units per second. Defaults to 800.0.
+            scroll_distance (float, optional): movement of the centre of two fingers that starts a scroll.
+                Defaults to 40.0.
+            pinch_distance (float, optional): change of the finger distance that starts a pinch. Defaults to 80.0.
+            smoothing (float, optional): weight of the previous velocity when a new sample arrives, 0 uses only the
+                latest movement. Defaults to 0.5.
+        """
+        self.tap_time = tap_time
+        self.tap_distance = tap_distance
+        self.swipe_distance = swipe_distance
+        self.swipe_speed = swipe_speed
+        self.scroll_distance = scroll_distance
+        self.pinch_distance = pinch_distance
+        self.smoothing = smoothing
+
+        self.time = 0.0  # seconds of sensor clock since the first report
+        self.active = 0  # fingers on the touchpad
+        self.gesture: Gesture | None = None  # running scroll or pinch
+
+        self._contacts = (_Contact(), _Contact())
+        self._sensor_timestamp: int | None = None
+        self._word0 = 0x80
+        self._word1 = 0x80
+        self._fingers = 0  # most fingers at once since the touchpad was last released
+
+        # two finger state, relative to the moment the second finger touched down
+        self._start_x = 0.0
+        self._start_y = 0.0
+        self._start_spread = 1.0
+        self._x = 0.0
+        self._y = 0.0
+        self._scale = 1.0
+        self._scale_velocity = 0.0
+        self._scale_time = 0.0
+
+        self._handlers: list[GestureHandler] = []
+
+    def on_gesture(self, handler: GestureHandler) -> None:
+        """Call ``handler`` with a :class:`GestureEvent` from the thread that feeds :func:`process`."""
+        self._handlers.append(handler)
+
+    def remove(self, handler: GestureHandler) -> None:
+        self._handlers = [h for h in self._handlers if h != handler]
+
+    def process(self, report, offset: int = 0) -> None:
+        """
+        Update the contacts from one input report.
+
+        Args:
+            report (bytes | bytearray | memoryview): raw input report.
+            offset (int, optional): position of the USB layout inside ``report``, 1 for BT reports. Defaults to 0.
+        """
+        timestamp, word0, word1 = _TOUCH.unpack_from(report, offset + _TOUCH_OFFSET)
+        last = self._sensor_timestamp
+        self._sensor_timestamp = timestamp
+        if last is not None:
+            self.time += ((timestamp - last) & 0xFFFFFFFF) / SENSOR_CLOCK_HZ
+        if word0 == self._word0 and word1 == self._word1:
+            return
+        self._word0 = word0
+        self._word1 = word1
+        now = self.time
+
+        id0 = -1 if word0 & 0x80 else word0 & 0x7F
+        id1 = -1 if word1 & 0x80 else word1 & 0x7F
+        first, second = self._contacts
+        # lifts first, the controller may reuse the slot of a lifted finger for a new one in the same report
+        if first.id >= 0 and first.id != id0 and first.id != id1:
+            self._lift(first, now)
+        if second.id >= 0 and second.id != id0 and second.id != id1:
+            self._lift(second, now)
+        if id0 >= 0:
+            self._touch(id0, word0, now)
+        if id1 >= 0:
+            self._touch(id1, word1, now)
+
+        if self.active == 2:
+            self._two_fingers(now)
+
+    def _touch(self, touch_id: int, word: int, now: float) -> None:
+        x = (word >> 8) & 0x0FFF
+        y = word >> 20
+        first, second = self._contacts
+        if first.id == touch_id:
+            contact = first
+        elif second.id == touch_id:
+            contact = second
+        else:
+            contact = first if first.id < 0 else second
+            contact.id = touch_id
+            contact.x = contact.start_x = x
+            contact.y = contact.start_y = y
+            contact.start_time = contact.time = now
+            contact.vx = contact.vy = 0.0
+            self.active += 1
+            if self.active > self._fingers:
+                self._fingers = self.active
+            if self.active == 2:
+                self._begin_two(now)
+            return
+
+        if x == contact.x and y == contact.y:
+            return
+        dt = now - contact.time
+        if dt > 0.0:
+            vx = (x - contact.x) / dt
+            vy = (y - contact.y) / dt
+            if dt < _STALE:
+                keep = self.smoothing
+                vx += keep * (contact.vx - vx)
+                vy += keep * (contact.vy - vy)
+            contact.vx = vx
+            contact.vy = vy
+            contact.time = now
+        contact.x = x
+        contact.y = y
+
+    def _lift(self, contact: _Contact, now: float) -> None:
+        contact.id = -1
+        self.active -= 1
+
+        gesture = self.gesture
+        if gesture is not None:
+            self.gesture = None
+            first, second = self._contacts
+            self._emit(
+                gesture,
+                GesturePhase.End,
+                now,
+                self._x,
+                self._y,
+                self._x - self._start_x,
+                self._y - self._start_y,
+                (first.vx + second.vx) / 2,
+                (first.vy + second.vy) / 2,
+                self._scale,
+                self._scale_velocity,
+            )
+        elif self._fingers == 1:
+            dx = contact.x - contact.start_x
+            dy = contact.y - contact.start_y
+            distance = math.hypot(dx, dy)
+            duration = now - contact.start_time
+            if duration <= self.tap_time and distance <= self.tap_distance:
+                self._emit(Gesture.Tap, GesturePhase.End, now, contact.x, contact.y, dx, dy, 0.0, 0.0)
+            elif distance >= self.swipe_distance and distance >= self.swipe_speed * duration:
+                self._emit(Gesture.Swipe, GesturePhase.End, now, contact.x, contact.y, dx, dy, contact.vx, contact.vy)
+
+        if self.active == 0:
+            self._fingers = 0
+
+    def _begin_two(self, now: float) -> None:
+        first, second = self._contacts
+        self._start_x = self._x = (first.x + second.x) / 2
+        self._start_y = self._y = (first.y + second.y) / 2
+        self._start_spread = max(math.hypot(first.x - second.x, first.y - second.y), 1.0)
+        self._scale = 1.0
+        self._scale_velocity = 0.0
+        self._scale_time = now
+
+    def _two_fingers(self, now: float) -> None:
+        first, second = self._contacts
+        x = (first.x + second.x) / 2
+        y = (first.y + second.y) / 2
+        spread = max(math.hypot(first.x - second.x, first.y - second.y), 1.0)
+        scale = spread / self._start_spread
+
+        dt = now - self._scale_time
+        if dt > 0.0:
+            velocity = (scale - self._scale) / dt
+            if dt < _STALE:
+                velocity += self.smoothing * (self._scale_velocity - velocity)
+            self._scale_velocity = velocity
+            self._scale_time = now
+        if x == self._x and y == self._y and scale == self._scale:
+            return
+        self._x = x
+        self._y = y
+        self._scale = scale
+
+        gesture = self.gesture
+        if gesture is None:
+            if abs(spread - self._start_spread) >= self.pinch_distance:
+                gesture = Gesture.Pinch
+            elif math.hypot(x - self._start_x, y - self._start_y) >= self.scroll_distance:
+                gesture = Gesture.Scroll
+            else:
+                return
+            self.gesture = gesture
+            phase = GesturePhase.Begin
+        else:
+            phase = GesturePhase.Update
+        self._emit(
+            gesture,
+            phase,
+            now,
+            x,
+            y,
+            x - self._start_x,
+            y - self._start_y,
+            (first.vx + second.vx) / 2,
+            (first.vy + second.vy) / 2,
+            scale,
+            self._scale_velocity,
+        )
+
+    def _emit(
+        self,
+        gesture: Gesture,
+        phase: GesturePhase,
+        now: float,
+        x: float,
+        y: float,
+        dx: float,
+        dy: float,
+        vx: float,
+        vy: float,
+        scale: float = 1.0,
+        scale_velocity: float = 0.0,
+    ) -> None:
+        if not self._handlers:
+            return
+        event = GestureEvent(gesture, phase, now, x, y, dx, dy, vx, vy, scale, scale_velocity)
+        for handler in self._handlers:
+            handler(event)
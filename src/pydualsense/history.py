@@ -0,0 +1,175 @@
+import time
+from array import array
+
+from .decoder import _STICK, _TRIGGER
+from .enums import Axis, Button
+from .events import _DPAD_MASK
+
+
+class InputHistory:
+    """
+    Ring of the buttons and axes of the last reports with their arrival time, for questions about the recent past.
+
+    .. code-block:: python
+
+        history = controller.enable_history(seconds=2.0)
+        if history.any_pressed(Button.Cross, 0.12):
+            ...
+        peak = history.axis_max(Axis.R2, 1.0)
+
+    Every column is a preallocated ``array``; :func:`record` writes one slot per report and allocates nothing that
+    is kept. Queries find the start of their window with a binary search over the timestamps and then only look at
+    the reports inside it. The ring holds ``seconds * rate_hz`` reports, so reports arriving faster than
+    ``rate_hz`` shorten the covered time accordingly.
+    """
+
+    def __init__(self, seconds: float = 2.0, rate_hz: float = 1000.0) -> None:
+        """
+        Args:
+            seconds (float, optional): time to keep. Defaults to 2.0.
+            rate_hz (float, optional): highest expected report rate. Defaults to 1000.0.
+        """
+        self.capacity = max(2, int(seconds * rate_hz) + 1)
+        self.count = 0  # reports recorded so far
+
+        self._time = array("d", bytes(8 * self.capacity))  # time.monotonic() of every report
+        self._buttons = array("L", [0]) * self.capacity  # Button masks, dpad hat expanded
+        # raw axis bytes per Axis, indexed by the axis value (its byte offset in the report)
+        self._axes = [array("B", bytes(self.capacity)) for _ in range(Axis.R2 + 1)]
+
+    def record(self, report, offset: int = 0, timestamp: float | None = None) -> None:
+        """
+        Add one report.
+
+        Args:
+            report (bytes | bytearray | memoryview): raw input report.
+            offset (int, optional): position of the USB layout inside ``report``, 1 for BT reports. Defaults to 0.
+            timestamp (float | None, optional): arrival time, ``time.monotonic()`` if not given.
+        """
+        index = self.count % self.capacity
+        self._time[index] = time.monotonic() if timestamp is None else timestamp
+
+        raw = report[offset + 8] | (report[offset + 9] << 8) | (report[offset + 10] << 16)
+        self._buttons[index] = (raw & ~0x0F) | _DPAD_MASK[raw & 0x0F]
+
+        axes = self._axes
+        axes[1][index] = report[offset + 1]
+        axes[2][index] = report[offset + 2]
+        axes[3][index] = report[offset + 3]
+        axes[4][index] = report[offset + 4]
+        axes[5][index] = report[offset + 5]
+        axes[6][index] = report[offset + 6]
+        self.count += 1
+
+    def _bisect(self, value: float, after: bool = False) -> int:
+        """Number of the first stored report at (or with ``after``, past) ``value``."""
+        times, capacity = self._time, self.capacity
+        low = max(0, self.count - capacity)
+        high = self.count
+        while low < high:
+            middle = (low + high) // 2
+            stamp = times[middle % capacity]
+            if stamp < value or (after and stamp == value):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _window(self, seconds: float, now: float | None) -> tuple[int, int]:
+        """Numbers of the first and one past the last report of the window ``[now - seconds, now]``."""
+        if now is None:
+            return self._bisect(time.monotonic() - seconds), self.count
+        return self._bisect(now - seconds), self._bisect(now, after=True)
+
+    def _segments(self, column: array, start: int, end: int) -> tuple:
+        """The ring slice of reports ``start`` to ``end`` as at most two contiguous array slices."""
+        capacity = self.capacity
+        if start >= end:
+            return ()
+        first, last = start % capacity, (end - 1) % capacity + 1
+        if first < last:
+            return (column[first:last],)
+        return (column[first:], column[:last])
+
+    def any_pressed(self, button: Button, seconds: float, now: float | None = None) -> bool:
+        """
+        Returns:
+            bool: True if any of the buttons in ``button`` was held in one of the reports of the last ``seconds``
+        """
+        mask = int(button)
+        start, end = self._window(seconds, now)
+        return any(value & mask for segment in self._segments(self._buttons, start, end) for value in segment)
+
+    def held_duration(self, button: Button, seconds: float, now: float | None = None) -> float:
+        """
+        Time any of the buttons in ``button`` was held during the last ``seconds``.
+
+        A report's state counts until the next report, the state before the window (if still stored) counts from
+        the start of the window.
+
+        Returns:
+            float: held time in seconds
+        """
+        if now is None:
+            now = time.monotonic()
+        since = now - seconds
+        mask = int(button)
+        times, buttons, capacity = self._time, self._buttons, self.capacity
+        start, end = self._window(seconds, now)
+
+        held = 0.0
+        first = start - 1 if start > max(0, self.count - capacity) else start  # the report valid at the window start
+        for number in range(first, end):
+            index = number % capacity
+            if not buttons[index] & mask:
+                continue
+            begin = max(times[index], since)
+            finish = times[(number + 1) % capacity] if number + 1 < end else now
+            if finish > begin:
+                held += finish - begin
+        return held
+
+    def _axis_segments(self, axis: Axis, seconds: float, now: float | None) -> tuple:
+        start, end = self._window(seconds, now)
+        return self._segments(self._axes[axis], start, end)
+
+    @staticmethod
+    def _scale(axis: Axis, raw: int) -> float:
+        return _TRIGGER[raw] if axis >= Axis.L2 else _STICK[raw]
+
+    def axis_min(self, axis: Axis, seconds: float, now: float | None = None) -> float | None:
+        """
+        Returns:
+            float | None: lowest value of ``axis`` in the last ``seconds``, scaled like in DeviceInputState; None
+            without reports in the window
+        """
+        segments = self._axis_segments(axis, seconds, now)
+        if not segments:
+            return None
+        return self._scale(axis, min(min(segment) for segment in segments))
+
+    def axis_max(self, axis: Axis, seconds: float, now: float | None = None) -> float | None:
+        """
+        Returns:
+            float | None: highest value of ``axis`` in the last ``seconds``, None without reports in the window
+        """
+        segments = self._axis_segments(axis, seconds, now)
+        if not segments:
+            return None
+        return self._scale(axis, max(max(segment) for segment in segments))
+
+    def axis_mean(self, axis: Axis, seconds: float, now: float | None = None) -> float | None:
+        """
+        Returns:
+            float | None: mean of ``axis`` over the reports of the last ``seconds``, None without reports in the
+            window
+        """
+        segments = self._axis_segments(axis, seconds, now)
+        if not segments:
+            return None
+        count = sum(len(segment) for segment in segments)
+        mean = sum(sum(segment) for segment in segments) / count
+        # both scales are linear in the raw value, so the scaled mean is the scaled raw mean
+        if axis >= Axis.L2:
+            return mean / 255.0
+        return (mean - 127) / 127.0
@@ -0,0 +1,157 @@
+import array
+import time
+from typing import Callable
+
+READ = 0
+DECODE = 1
+ENCODE = 2
+WRITE = 3
+STAGES = ("read", "decode", "encode", "write")
+
+# bucket n counts durations below 2**n ns, the last bucket takes everything longer (about 2 s)
+_BUCKETS = 32
+
+
+class LatencyHistogram:
+    """Duration histogram with power of two buckets, adding a sample does not allocate."""
+
+    __slots__ = ("counts", "count", "total_ns", "max_ns")
+
+    def __init__(self) -> None:
+        self.counts = array.array("Q", bytes(8 * _BUCKETS))
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, ns: int) -> None:
+        bucket = ns.bit_length()
+        self.counts[bucket if bucket < _BUCKETS else _BUCKETS - 1] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def clear(self) -> None:
+        for bucket in range(_BUCKETS):
+            self.counts[bucket] = 0
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def percentile(self, q: float, other: "LatencyHistogram | None" = None) -> int:
+        """
+        Args:
+            q (float): percentile between 0 and 100.
+            other (LatencyHistogram | None, optional): histogram to merge in.
+
+        Returns:
+            int: upper bound in ns of the bucket that contains the percentile
+        """
+        count = self.count + (other.count if other else 0)
+        if count == 0:
+            return 0
+        rank = q / 100 * count
+        seen = 0
+        for bucket in range(_BUCKETS):
+            seen += self.counts[bucket] + (other.counts[bucket] if other else 0)
+            if seen >= rank:
+                return 1 << bucket
+        return 1 << (_BUCKETS - 1)
+
+
+class ReportStats:
+    """
+    Per stage latencies and sequence counter accounting of the report loop.
+
+    The stages are recorded into two sets of histograms: the current window and the one before it. Every
+    ``window_s`` seconds the older set is cleared and becomes the current one, so :func:`snapshot` describes the
+    last one to two windows. Gaps and duplicates come from the sequence counter in byte 7 of the input report,
+    which the controller increments for every report it sends.
+    """
+
+    def __init__(
+        self,
+        window_s: float = 10.0,
+        callback: Callable[[dict], None] | None = None,
+        callback_interval_s: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            window_s (float, optional): length of one histogram window. Defaults to 10.0.
+            callback (Callable[[dict], None] | None, optional): called with :func:`snapshot` from the report thread
+                every ``callback_interval_s``. Defaults to None.
+            callback_interval_s (float, optional): seconds between callback calls. Defaults to 1.0.
+        """
+        self.window_ns = int(window_s * 1e9)
+        self.callback = callback
+        self.callback_interval_ns = int(callback_interval_s * 1e9)
+
+        self.reports = 0
+        self.gaps = 0  # number of times one or more reports were missing
+        self.lost = 0  # number of missing reports
+        self.duplicates = 0
+        self.dropped = 0  # reports read but rejected, e.g. BT CRC errors
+
+        self._current = [LatencyHistogram() for _ in STAGES]
+        self._previous = [LatencyHistogram() for _ in STAGES]
+        self._last_sequence = -1
+        now = time.perf_counter_ns()
+        self._window_end = now + self.window_ns
+        self._next_callback = now + self.callback_interval_ns
+
+    def add(self, stage: int, ns: int) -> None:
+        """Record the duration of one stage (READ, DECODE, ENCODE or WRITE)."""
+        self._current[stage].add(ns)
+
+    def sequence(self, value: int) -> None:
+        """Account for the sequence counter of a received report."""
+        self.reports += 1
+        last = self._last_sequence
+        self._last_sequence = value
+        if last < 0:
+            return
+        missing = (value - last - 1) & 0xFF
+        if missing == 0xFF:
+            self.duplicates += 1
+        elif missing:
+            self.gaps += 1
+            self.lost += missing
+
+    def tick(self, now_ns: int) -> None:
+        """Rotate the histogram window and call the callback when due, called once per report."""
+        if now_ns >= self._window_end:
+            self._previous, self._current = self._current, self._previous
+            for histogram in self._current:
+                histogram.clear()
+            self._window_end = now_ns + self.window_ns
+
+        if self.callback is not None and now_ns >= self._next_callback:
+            self._next_callback = now_ns + self.callback_interval_ns
+            self.callback(self.snapshot())
+
+    def snapshot(self) -> dict:
+        """
+        Current statistics, safe to call from any thread while the loop is running.
+
+        Returns:
+            dict: counters and, per stage, sample count, mean, p50/p90/p99 and max in microseconds
+        """
+        stages = {}
+        for name, current, previous in zip(STAGES, self._current, self._previous):
+            count = current.count + previous.count
+            stages[name] = {
+                "count": count,
+                "mean_us": (current.total_ns + previous.total_ns) / count / 1000 if count else 0.0,
+                "p50_us": current.percentile(50, previous) / 1000,
+                "p90_us": current.percentile(90, previous) / 1000,
+                "p99_us": current.percentile(99, previous) / 1000,
+                "max_us": max(current.max_ns, previous.max_ns) / 1000,
+            }
+        return {
+            "reports": self.reports,
+            "gaps": self.gaps,
+            "lost": self.lost,
+            "duplicates": self.duplicates,
+            "dropped": self.dropped,
+            "stages": stages,
+        }
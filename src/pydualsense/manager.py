@@ -0,0 +1,207 @@
+import selectors
+import threading
+import time
+from typing import Callable, Iterator
+
+from .pydualsense import DualsenseController, find_devices
+from .transport import Transport, device_id, open_transport
+
+# reports decoded per controller and wake-up, so one busy controller can not starve the others
+MAX_BATCH = 16
+
+
+class DualsenseManager:
+    """
+    Opens every connected dualsense and drives all of them from one reader thread.
+
+    On Linux the hidraw nodes are multiplexed with a selector (epoll), so the thread only wakes up for devices that
+    have reports. Transports without a file descriptor (hidapi on other platforms, virtual devices) are polled
+    with a short timeout. Every controller keeps its own input/output state and events; its output report is
+    written at most once per wake-up, after all buffered input reports of that controller were decoded.
+
+    .. code-block:: python
+
+        with DualsenseManager() as manager:
+            for device_id, controller in manager.items():
+                controller.events.on_press(Button.Cross, print)
+    """
+
+    def __init__(
+        self,
+        output_keepalive: float | None = None,
+        poll_timeout_ms: int = 1,
+        on_disconnect: Callable[[str, DualsenseController], None] | None = None,
+    ) -> None:
+        """
+        Args:
+            output_keepalive (float | None, optional): see :class:`DualsenseController`. Defaults to None.
+            poll_timeout_ms (int, optional): per device read timeout of the polling fallback. Defaults to 1.
+            on_disconnect (Callable[[str, DualsenseController], None] | None, optional): called from the reader
+                thread with the id and the closed controller when a controller fails to read or write, e.g. because
+                it was unplugged. Defaults to None.
+        """
+        self.output_keepalive = output_keepalive
+        self.poll_timeout_ms = poll_timeout_ms
+        self.on_disconnect = on_disconnect
+
+        self.controllers: dict[str, DualsenseController] = {}
+
+        self._lock = threading.Lock()
+        self._selector: selectors.BaseSelector | None = None
+        self._polled: list[DualsenseController] = []
+        self._thread: threading.Thread | None = None
+        self._stop = False
+
+    def open(self) -> list[str]:
+        """
+        Open every connected controller that is not open yet, can be called again to pick up new controllers.
+
+        Returns:
+            list[str]: ids of the newly opened controllers
+        """
+        opened = []
+        for info in find_devices():
+            if device_id(info.serial_number, info.path) in self.controllers:
+                continue
+            opened.append(self.add(open_transport(info, prefer_hidraw=True)))
+        return opened
+
+    def add(self, transport: Transport) -> str:
+        """
+        Add an already opened controller, e.g. a :class:`VirtualDualsense <pydualsense.virtual.VirtualDualsense>`.
+
+        Returns:
+            str: id of the controller
+        """
+        key = device_id(transport.serial_number, transport.path)  # type: ignore
+        controller = DualsenseController(
+            output_keepalive=self.output_keepalive, start_reader=False, transport=transport
+        )
+
+        with self._lock:
+            fd = transport.fileno()
+            if fd is not None:
+                if self._selector is None:
+                    self._selector = selectors.DefaultSelector()
+                self._selector.register(fd, selectors.EVENT_READ, controller)
+            else:
+                self._polled.append(controller)
+            self.controllers[key] = controller
+        return key
+
+    def remove(self, key: str) -> DualsenseController:
+        """
+        Stop reading a controller and close it.
+
+        Returns:
+            DualsenseController: the closed controller
+        """
+        with self._lock:
+            controller = self.controllers.pop(key)
+            if controller in self._polled:
+                self._polled.remove(controller)
+            if self._selector is not None:
+                for selector_key in list(self._selector.get_map().values()):
+                    if selector_key.data is controller:
+                        self._selector.unregister(selector_key.fileobj)
+        try:
+            controller.close()
+        except OSError:
+            pass  # already gone
+        return controller
+
+    def start(self) -> None:
+        """Open the controllers if needed and start the reader thread."""
+        if not self.controllers:
+            self.open()
+        if self._thread is None:
+            self._stop = False
+            self._thread = threading.Thread(target=self.read_task, daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the reader thread and close every controller."""
+        self._stop = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        with self._lock:
+            if self._selector is not None:
+                self._selector.close()
+                self._selector = None
+            for controller in self.controllers.values():
+                controller.close()
+            self.controllers.clear()
+            self._polled.clear()
+
+    def __enter__(self) -> "DualsenseManager":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __getitem__(self, key: str) -> DualsenseController:
+        return self.controllers[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.controllers)
+
+    def __len__(self) -> int:
+        return len(self.controllers)
+
+    def items(self):
+        return self.controllers.items()
+
+    def read_task(self) -> None:
+        """background thread reading all controllers"""
+        while not self._stop:
+            with self._lock:
+                selector = self._selector
+                polled = list(self._polled)
+
+            if selector is not None:
+                # block in the selector only if there is nothing to poll
+                timeout = 0 if polled else 0.1
+                for key, _ in selector.select(timeout):
+                    self._drain_or_remove(key.data, 0)
+
+            for controller in polled:
+                self._drain_or_remove(controller, self.poll_timeout_ms)
+
+            if selector is None and not polled:
+                # nothing opened yet
+                time.sleep(0.1)
+
+    def _drain_or_remove(self, controller: DualsenseController, timeout_ms: int) -> None:
+        try:
+            self._drain(controller, timeout_ms)
+        except OSError:
+            # unplugged: drop only this controller, the others keep being read
+            key = next((key for key, value in self.controllers.items() if value is controller), None)
+            if key is None:
+                return  # removed by another thread meanwhile
+            self.remove(key)
+            if self.on_disconnect is not None:
+                self.on_disconnect(key, controller)
+
+    def _drain(self, controller: DualsenseController, timeout_ms: int) -> None:
+        device = controller.device
+        if device is None:
+            return  # removed while this round was running
+        length = controller.conType.get_in_report_length()
+        received = False
+
+        for _ in range(MAX_BATCH):
+            report = device.read(length, timeout_ms=timeout_ms)  # type: ignore
+            if not report:
+                break
+            if controller.process_report(report):
+                received = True
+
+        if received:
+            try:
+                controller.write_output()
+            except BlockingIOError:
+                controller.output_report.invalidate()
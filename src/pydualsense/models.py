@@ -1,11 +1,71 @@
-from typing import List
+import dataclasses
+import functools
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, List
 
-from .checksum import compute
+from .checksum import compute_fast
 from .enums import BatteryState, Brightness, ConnectionType, LedOptions, PlayerID, PulseOptions, TriggerModes
-from pydantic import BaseModel, Field
 import math
 
-class TouchpaModel(BaseModel):
+if TYPE_CHECKING:
+    import pydantic
+
+    from .decoder import FastInputState
+
+
+class StateModel:
+    """
+    Base of the state classes.
+
+    The states are plain slotted dataclasses, so the report thread can update them without any validation overhead
+    and importing the package does not import pydantic. :func:`to_pydantic` converts a state into a generated
+    pydantic model for validation or serialization; pydantic is only imported then.
+    """
+
+    __slots__ = ()
+
+    def model_dump(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: the state as nested dicts, like pydantic's ``model_dump()``
+        """
+        return dataclasses.asdict(self)  # type: ignore
+
+    @classmethod
+    def pydantic_model(cls) -> "type[pydantic.BaseModel]":
+        """
+        Returns:
+            type[pydantic.BaseModel]: pydantic model with the same fields and defaults, generated on first use
+        """
+        return _pydantic_model(cls)
+
+    def to_pydantic(self) -> "pydantic.BaseModel":
+        """
+        Returns:
+            pydantic.BaseModel: validated copy of the state, e.g. for ``model_dump_json()``
+        """
+        return self.pydantic_model().model_validate(self.model_dump())
+
+
+@functools.cache
+def _pydantic_model(cls: type) -> "type[pydantic.BaseModel]":
+    import pydantic
+
+    fields: dict[str, Any] = {}
+    for state_field in dataclasses.fields(cls):
+        annotation = state_field.type
+        if dataclasses.is_dataclass(annotation):
+            annotation = _pydantic_model(annotation)  # type: ignore
+            fields[state_field.name] = (annotation, pydantic.Field(default_factory=annotation))
+        elif state_field.default_factory is not dataclasses.MISSING:
+            fields[state_field.name] = (annotation, pydantic.Field(default_factory=state_field.default_factory))
+        else:
+            fields[state_field.name] = (annotation, state_field.default)
+    return pydantic.create_model(cls.__name__, __module__=cls.__module__, **fields)
+
+
+@dataclass(slots=True)
+class TouchpaModel(StateModel):
     isActive: bool = False
     ID: int = 0
     X: int = 0
@@ -17,7 +77,8 @@ class TouchpaModel(BaseModel):
         )
 
 
-class VectorModel(BaseModel):
+@dataclass(slots=True)
+class VectorModel(StateModel):
     X: float = 0
     Y: float = 0
     Z: float = 0
@@ -26,12 +87,14 @@ class VectorModel(BaseModel):
         return f"X: {self.X:7.3f}, Y: {self.Y:7.3f}, Z: {self.Z:7.3f}"
 
 
-class DSBatteryModel(BaseModel):
+@dataclass(slots=True)
+class DSBatteryModel(StateModel):
     State: BatteryState = BatteryState.POWER_SUPPLY_STATUS_DISCHARGING
     Level: int = 0
 
 
-class JoystickModel(BaseModel):
+@dataclass(slots=True)
+class JoystickModel(StateModel):
     X: float = 0
     Y: float = 0
     pressed: bool = False
@@ -44,7 +107,8 @@ class JoystickModel(BaseModel):
     def angle(self) -> float:
         return math.degrees(math.atan2(self.Y, self.X))
     
-class DpadModel(BaseModel):
+@dataclass(slots=True)
+class DpadModel(StateModel):
     up: bool = False
     down: bool = False
     left: bool = False
@@ -87,9 +151,14 @@ class DpadModel(BaseModel):
             self.up, self.down, self.left, self.right = False, False, False, False
 
 
-class TriggerModel(BaseModel):
+# mode byte -> member, looking up an IntFlag by value is slow
+_TRIGGER_MODES = {int(mode): mode for mode in TriggerModes.__members__.values()}
+
+
+@dataclass(slots=True)
+class TriggerModel(StateModel):
     mode: TriggerModes = TriggerModes.Off
-    forces: List[int] = Field(default_factory=lambda: [0 for i in range(10)])
+    forces: List[int] = field(default_factory=lambda: [0 for i in range(10)])
 
     def setForce(self, forceID: int = 0, force: int = 0):
         """
@@ -111,8 +180,26 @@ class TriggerModel(BaseModel):
 
         self.forces[forceID] = force
 
+    def set_effect(self, effect: bytes) -> None:
+        """
+        Apply a raw trigger effect in place, see :mod:`pydualsense.force_feedback`.
+
+        Args:
+            effect (bytes): 11 byte effect, the mode followed by its 10 parameters.
+        """
+        mode = effect[0]
+        self.mode = _TRIGGER_MODES.get(mode) or TriggerModes(mode)
+        self.forces[:10] = effect[1:11]
+
+    @classmethod
+    def from_effect(cls, effect: bytes) -> "TriggerModel":
+        model = cls()
+        model.set_effect(effect)
+        return model
 
-class LedState(BaseModel):
+
+@dataclass(slots=True)
+class LedState(StateModel):
     R: float = 0
     G: float = 0
     B: float = 0
@@ -123,7 +210,8 @@ class LedState(BaseModel):
         self.B = color[2] / 255.0
 
 
-class DeviceInputState(BaseModel):
+@dataclass(slots=True)
+class DeviceInputState(StateModel):
     L1: bool = False
     L2: float = 0
     # L3: bool = False See joystick.pressed
@@ -132,15 +220,15 @@ class DeviceInputState(BaseModel):
     R2: float = 0
     # R3: bool = False
 
-    left_joystick: JoystickModel = JoystickModel()
-    right_joystick: JoystickModel = JoystickModel()
+    left_joystick: JoystickModel = field(default_factory=JoystickModel)
+    right_joystick: JoystickModel = field(default_factory=JoystickModel)
 
     triangle: bool = False
     circle: bool = False
     cross: bool = False
     square: bool = False
 
-    dpad: DpadModel = DpadModel()
+    dpad: DpadModel = field(default_factory=DpadModel)
 
     options: bool = False
     share: bool = False
@@ -148,13 +236,13 @@ class DeviceInputState(BaseModel):
     mic: bool = False
     touchBtn: bool = False
     
-    accel: VectorModel = VectorModel()
-    gyroscope: VectorModel = VectorModel()
+    accel: VectorModel = field(default_factory=VectorModel)
+    gyroscope: VectorModel = field(default_factory=VectorModel)
 
-    trackPadTouch0: TouchpaModel = TouchpaModel()
-    trackPadTouch1: TouchpaModel = TouchpaModel()
+    trackPadTouch0: TouchpaModel = field(default_factory=TouchpaModel)
+    trackPadTouch1: TouchpaModel = field(default_factory=TouchpaModel)
 
-    battery: DSBatteryModel = DSBatteryModel()
+    battery: DSBatteryModel = field(default_factory=DSBatteryModel)
     
     def from_state(self, state: bytes):
         states = list(state)
@@ -219,8 +307,56 @@ class DeviceInputState(BaseModel):
         self.battery.State = BatteryState((battery & 0xF0) >> 4)
         self.battery.Level = min((battery & 0x0F) * 10 + 5, 100)
 
+    def from_fast(self, state: "FastInputState") -> None:
+        """
+        Fill the state from a report already decoded by :class:`FastInputState`, without reading the report again.
+
+        Args:
+            state (FastInputState): decoded report, e.g. :func:`SnapshotBuffer.latest`.
+        """
+        self.left_joystick.X = state.left_x
+        self.left_joystick.Y = state.left_y
+        self.right_joystick.X = state.right_x
+        self.right_joystick.Y = state.right_y
+        self.L2 = state.L2
+        self.R2 = state.R2
+
+        buttons = state.buttons
+        self.triangle = (buttons & 0x80) != 0
+        self.circle = (buttons & 0x40) != 0
+        self.cross = (buttons & 0x20) != 0
+        self.square = (buttons & 0x10) != 0
+        self.dpad.from_state(buttons & 0x0F)
+        self.right_joystick.pressed = (buttons & 0x8000) != 0
+        self.left_joystick.pressed = (buttons & 0x4000) != 0
+        self.options = (buttons & 0x2000) != 0
+        self.share = (buttons & 0x1000) != 0
+        self.R1 = (buttons & 0x200) != 0
+        self.L1 = (buttons & 0x100) != 0
+        self.ps = (buttons & 0x10000) != 0
+        self.touchBtn = (buttons & 0x20000) != 0
+        self.mic = (buttons & 0x40000) != 0
+
+        for touch, word in ((self.trackPadTouch0, state.touch0), (self.trackPadTouch1, state.touch1)):
+            touch.ID = word & 0x7F
+            touch.isActive = (word & 0x80) == 0
+            touch.X = (word >> 8) & 0x0FFF
+            touch.Y = word >> 20
+
+        self.gyroscope.X = state.gyro_x
+        self.gyroscope.Y = state.gyro_y
+        self.gyroscope.Z = state.gyro_z
+        self.accel.X = state.accel_x
+        self.accel.Y = state.accel_y
+        self.accel.Z = state.accel_z
+
+        battery = state.battery
+        self.battery.State = BatteryState((battery & 0xF0) >> 4)
+        self.battery.Level = min((battery & 0x0F) * 10 + 5, 100)
+
 
-class PlayerLed(BaseModel):
+@dataclass(slots=True)
+class PlayerLed(StateModel):
     brightness: float = 0
     player_count: int = 0
 
@@ -256,18 +392,20 @@ class PlayerLed(BaseModel):
         return PulseOptions.Off
 
 
-class DeviceOutputState(BaseModel):
+@dataclass(slots=True)
+class DeviceOutputState(StateModel):
+    # rumble strength 0-1, sent as 0-255 over USB and BT
     right_motor: float = 0
     left_motor: float = 0
 
     microphone_led: bool = False
     microphone_mute: bool = False
 
-    triggerR: TriggerModel = TriggerModel()
-    triggerL: TriggerModel = TriggerModel()
+    triggerR: TriggerModel = field(default_factory=TriggerModel)
+    triggerL: TriggerModel = field(default_factory=TriggerModel)
 
-    rgb_led: LedState = LedState()
-    player_led: PlayerLed = PlayerLed()
+    rgb_led: LedState = field(default_factory=LedState)
+    player_led: PlayerLed = field(default_factory=PlayerLed)
     
     bt_led_initialized: bool = False
     
@@ -376,8 +514,8 @@ class DeviceOutputState(BaseModel):
             else:
                 outReport[3] = 0x1 | 0x2 | 0x4 | 0x10 | 0x40  # [2]
 
-            outReport[4] = int(self.right_motor)  # right low freq motor 0-255 # [3]
-            outReport[5] = int(self.left_motor)  # left low freq motor 0-255 # [4]
+            outReport[4] = int(self.right_motor*255)  # right low freq motor 0-255 # [3]
+            outReport[5] = int(self.left_motor*255)  # left low freq motor 0-255 # [4]
 
             # outReport[5] - outReport[8] audio related
 
@@ -394,7 +532,10 @@ class DeviceOutputState(BaseModel):
             outReport[16] = self.triggerR.forces[3]
             outReport[17] = self.triggerR.forces[4]
             outReport[18] = self.triggerR.forces[5]
-            outReport[21] = self.triggerR.forces[6]
+            outReport[19] = self.triggerR.forces[6]
+            outReport[20] = self.triggerR.forces[7]
+            outReport[21] = self.triggerR.forces[8]
+            outReport[22] = self.triggerR.forces[9]
 
             outReport[23] = self.triggerL.mode.value
             outReport[24] = self.triggerL.forces[0]
@@ -403,7 +544,10 @@ class DeviceOutputState(BaseModel):
             outReport[27] = self.triggerL.forces[3]
             outReport[28] = self.triggerL.forces[4]
             outReport[29] = self.triggerL.forces[5]
-            outReport[32] = self.triggerL.forces[6]
+            outReport[30] = self.triggerL.forces[6]
+            outReport[31] = self.triggerL.forces[7]
+            outReport[32] = self.triggerL.forces[8]
+            outReport[33] = self.triggerL.forces[9]
 
             outReport[40] = self.player_led.get_led_option()
             outReport[43] = self.player_led.get_pulse_options()
@@ -413,7 +557,7 @@ class DeviceOutputState(BaseModel):
             outReport[47] = int(self.rgb_led.G * 255)
             outReport[48] = int(self.rgb_led.B * 255)
 
-            crcChecksum = compute(outReport)
+            crcChecksum = compute_fast(outReport)
 
             outReport[74] = crcChecksum & 0x000000FF
             outReport[75] = (crcChecksum & 0x0000FF00) >> 8
@@ -0,0 +1,265 @@
+import math
+import struct
+from dataclasses import dataclass
+
+from .transport import Transport
+
+# Feature report 0x05 holds the factory IMU calibration as 17 signed 16 bit values (report id not included):
+#
+#   gyro pitch/yaw/roll bias,
+#   gyro pitch plus/minus, yaw plus/minus, roll plus/minus, gyro speed plus/minus,
+#   accel x plus/minus, y plus/minus, z plus/minus
+CALIBRATION_REPORT_ID = 0x05
+CALIBRATION_REPORT_LENGTH = 40
+_CALIBRATION = struct.Struct("<17h")
+
+# gyro X/Y/Z, accel X/Y/Z and sensor timestamp, at byte 16 of the USB layout
+MOTION_STRUCT = struct.Struct("<6hI")
+MOTION_OFFSET = 16
+SENSOR_CLOCK_HZ = 3_000_000
+_MAX_DT = 0.1  # longer gaps between reports are integrated as this many seconds
+
+# used when the device has no usable calibration, the nominal ranges are +-2048 deg/s and +-4 g
+_DEFAULT_GYRO_SCALE = 2048 / 32767 * math.pi / 180
+_DEFAULT_ACCEL_SCALE = 4 / 32767
+
+
+@dataclass(frozen=True)
+class ImuCalibration:
+    """
+    Per axis bias and scale that turn raw IMU values into rad/s and g.
+
+    ``calibrated = (raw - bias) * scale``, the default instance uses the nominal sensor ranges.
+    """
+
+    gyro_bias: tuple[float, float, float] = (0.0, 0.0, 0.0)
+    gyro_scale: tuple[float, float, float] = (_DEFAULT_GYRO_SCALE,) * 3
+    accel_bias: tuple[float, float, float] = (0.0, 0.0, 0.0)
+    accel_scale: tuple[float, float, float] = (_DEFAULT_ACCEL_SCALE,) * 3
+
+    @classmethod
+    def from_feature_report(cls, data: bytes) -> "ImuCalibration":
+        """
+        Args:
+            data (bytes): feature report 0x05 without the report id.
+
+        Raises:
+            ValueError: report is too short
+
+        Returns:
+            ImuCalibration: calibration of the device, axes with invalid values keep the nominal scale
+        """
+        if len(data) < _CALIBRATION.size:
+            raise ValueError(f"calibration report of {len(data)} bytes is too short")
+        (
+            pitch_bias,
+            yaw_bias,
+            roll_bias,
+            pitch_plus,
+            pitch_minus,
+            yaw_plus,
+            yaw_minus,
+            roll_plus,
+            roll_minus,
+            speed_plus,
+            speed_minus,
+            *accel_ranges,
+        ) = _CALIBRATION.unpack_from(data)
+
+        # the plus/minus values are the readings at +-speed deg/s
+        speed_2x = speed_plus + speed_minus
+        gyro_scale = []
+        for plus, minus in ((pitch_plus, pitch_minus), (yaw_plus, yaw_minus), (roll_plus, roll_minus)):
+            denominator = plus - minus
+            if denominator == 0 or speed_2x == 0:
+                gyro_scale.append(_DEFAULT_GYRO_SCALE)
+            else:
+                gyro_scale.append(speed_2x / denominator * math.pi / 180)
+
+        # and the accel plus/minus values are the readings at +-1 g
+        accel_bias = []
+        accel_scale = []
+        for plus, minus in zip(accel_ranges[0::2], accel_ranges[1::2]):
+            range_2g = plus - minus
+            if range_2g == 0:
+                accel_bias.append(0.0)
+                accel_scale.append(_DEFAULT_ACCEL_SCALE)
+            else:
+                accel_bias.append(plus - range_2g / 2)
+                accel_scale.append(2 / range_2g)
+
+        return cls(
+            gyro_bias=(float(pitch_bias), float(yaw_bias), float(roll_bias)),
+            gyro_scale=tuple(gyro_scale),  # type: ignore
+            accel_bias=tuple(accel_bias),  # type: ignore
+            accel_scale=tuple(accel_scale),  # type: ignore
+        )
+
+    @classmethod
+    def read(cls, transport: Transport) -> "ImuCalibration":
+        """
+        Read the calibration from the controller.
+
+        Raises:
+            OSError: the feature report could not be read
+        """
+        return cls.from_feature_report(transport.get_feature_report(CALIBRATION_REPORT_ID, CALIBRATION_REPORT_LENGTH))
+
+
+class MadgwickFilter:
+    """
+    Madgwick gradient descent orientation filter for a gyroscope and accelerometer.
+
+    The quaternion (w, x, y, z) rotates from the sensor frame to an earth frame with z pointing up; ``beta`` trades
+    gyro drift correction against accelerometer noise.
+    """
+
+    __slots__ = ("beta", "w", "x", "y", "z")
+
+    def __init__(self, beta: float = 0.05) -> None:
+        self.beta = beta
+        self.reset()
+
+    def reset(self) -> None:
+        self.w, self.x, self.y, self.z = 1.0, 0.0, 0.0, 0.0
+
+    @property
+    def quaternion(self) -> tuple[float, float, float, float]:
+        return (self.w, self.x, self.y, self.z)
+
+    def update(self, gx: float, gy: float, gz: float, ax: float, ay: float, az: float, dt: float) -> None:
+        """
+        Advance the orientation by one sample.
+
+        Args:
+            gx, gy, gz (float): angular rate in rad/s.
+            ax, ay, az (float): acceleration in any unit, only the direction is used.
+            dt (float): seconds since the previous sample.
+        """
+        q0, q1, q2, q3 = self.w, self.x, self.y, self.z
+
+        # rate of change from the gyroscope
+        dq0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+        dq1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+        dq2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+        dq3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+
+        norm = ax * ax + ay * ay + az * az
+        if norm > 0.0:
+            # gradient descent step towards the measured gravity direction
+            norm = 1.0 / math.sqrt(norm)
+            ax *= norm
+            ay *= norm
+            az *= norm
+
+            q0q0 = q0 * q0
+            q1q1 = q1 * q1
+            q2q2 = q2 * q2
+            q3q3 = q3 * q3
+            s0 = 4.0 * q0 * q2q2 + 2.0 * q2 * ax + 4.0 * q0 * q1q1 - 2.0 * q1 * ay
+            s1 = (
+                4.0 * q1 * q3q3
+                - 2.0 * q3 * ax
+                + 4.0 * q0q0 * q1
+                - 2.0 * q0 * ay
+                - 4.0 * q1
+                + 8.0 * q1 * q1q1
+                + 8.0 * q1 * q2q2
+                + 4.0 * q1 * az
+            )
+            s2 = (
+                4.0 * q0q0 * q2
+                + 2.0 * q0 * ax
+                + 4.0 * q2 * q3q3
+                - 2.0 * q3 * ay
+                - 4.0 * q2
+                + 8.0 * q2 * q1q1
+                + 8.0 * q2 * q2q2
+                + 4.0 * q2 * az
+            )
+            s3 = 4.0 * q1q1 * q3 - 2.0 * q1 * ax + 4.0 * q2q2 * q3 - 2.0 * q2 * ay
+
+            norm = s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3
+            if norm > 0.0:
+                norm = self.beta / math.sqrt(norm)
+                dq0 -= s0 * norm
+                dq1 -= s1 * norm
+                dq2 -= s2 * norm
+                dq3 -= s3 * norm
+
+        q0 += dq0 * dt
+        q1 += dq1 * dt
+        q2 += dq2 * dt
+        q3 += dq3 * dt
+        norm = 1.0 / math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+        self.w, self.x, self.y, self.z = q0 * norm, q1 * norm, q2 * norm, q3 * norm
+
+
+class MotionTracker:
+    """
+    Calibrated motion data and orientation, updated from every input report.
+
+    The controller reports gravity on its Y axis when it lies flat, so the axes are passed to the filter as
+    (X, -Z, Y). The resulting :attr:`quaternion` is the identity for a controller lying flat with the initial
+    heading. The time step comes from the controller's sensor timestamp, so the result does not depend on when
+    the reports are read.
+    """
+
+    def __init__(self, calibration: ImuCalibration | None = None, beta: float = 0.05) -> None:
+        """
+        Args:
+            calibration (ImuCalibration | None, optional): device calibration, see :func:`ImuCalibration.read`.
+                Defaults to None, which uses the nominal sensor ranges.
+            beta (float, optional): filter gain, see :class:`MadgwickFilter`. Defaults to 0.05.
+        """
+        self.calibration = calibration or ImuCalibration()
+        self.filter = MadgwickFilter(beta)
+
+        self.gyro = (0.0, 0.0, 0.0)  # rad/s
+        self.accel = (0.0, 0.0, 0.0)  # g
+        self.quaternion = (1.0, 0.0, 0.0, 0.0)
+        self.sensor_timestamp: int | None = None
+
+    def reset(self) -> None:
+        self.filter.reset()
+        self.quaternion = (1.0, 0.0, 0.0, 0.0)
+        self.sensor_timestamp = None
+
+    def process(self, report, offset: int = 0) -> None:
+        """
+        Update from a raw input report.
+
+        Args:
+            report (bytes | bytearray | memoryview): raw input report.
+            offset (int, optional): position of the USB layout inside ``report``, 1 for BT reports. Defaults to 0.
+        """
+        gx, gy, gz, ax, ay, az, timestamp = MOTION_STRUCT.unpack_from(report, offset + MOTION_OFFSET)
+        self.update(gx, gy, gz, ax, ay, az, timestamp)
+
+    def update(self, gx: int, gy: int, gz: int, ax: int, ay: int, az: int, timestamp: int) -> None:
+        """Update from raw IMU values and the raw sensor timestamp."""
+        calibration = self.calibration
+        bias, scale = calibration.gyro_bias, calibration.gyro_scale
+        gx = (gx - bias[0]) * scale[0]
+        gy = (gy - bias[1]) * scale[1]
+        gz = (gz - bias[2]) * scale[2]
+        bias, scale = calibration.accel_bias, calibration.accel_scale
+        ax = (ax - bias[0]) * scale[0]
+        ay = (ay - bias[1]) * scale[1]
+        az = (az - bias[2]) * scale[2]
+        self.gyro = (gx, gy, gz)
+        self.accel = (ax, ay, az)
+
+        last = self.sensor_timestamp
+        self.sensor_timestamp = timestamp
+        if last is None:
+            return
+        dt = ((timestamp - last) & 0xFFFFFFFF) / SENSOR_CLOCK_HZ
+        if dt == 0.0:
+            return  # same sample as before
+        if dt > _MAX_DT:
+            dt = _MAX_DT
+
+        motion_filter = self.filter
+        motion_filter.update(gx, -gz, gy, ax, -az, ay, dt)
+        self.quaternion = (motion_filter.w, motion_filter.x, motion_filter.y, motion_filter.z)
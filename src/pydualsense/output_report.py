@@ -0,0 +1,136 @@
+import struct
+import time
+
+from .checksum import CRC_OFFSET, compute_fast
+from .enums import ConnectionType
+from .models import DeviceOutputState
+
+# Byte positions of the values returned by _values, see DeviceOutputState.prepareReport for what each of them
+# controls. The BT report has the same layout behind one more header byte.
+_USB_OFFSETS = (3, 4, 9, 10) + tuple(range(11, 22)) + tuple(range(22, 33)) + (39, 42, 43, 44, 45, 46, 47)
+_BT_OFFSETS = tuple(offset + 1 for offset in _USB_OFFSETS)
+
+# mic led, mute, led strips, player leds and motor power, see prepareReport
+_FLAGS = 0x1 | 0x2 | 0x4 | 0x10 | 0x40
+_BT_LED_INIT_FLAG = 0x08
+
+_CRC = struct.Struct("<I")
+
+
+def _values(state: DeviceOutputState) -> tuple:
+    # the 0-1 motor values are scaled to 0-255 on both connections, BT used to send int(value), i.e. 0 or 1
+    trigger_r = state.triggerR
+    trigger_l = state.triggerL
+    player_led = state.player_led
+    rgb = state.rgb_led
+    return (
+        int(state.right_motor * 255),
+        int(state.left_motor * 255),
+        state.microphone_led,
+        0x10 if state.microphone_mute is True else 0x00,
+        int(trigger_r.mode),
+        *trigger_r.forces[:10],
+        int(trigger_l.mode),
+        *trigger_l.forces[:10],
+        player_led.get_led_option(),
+        player_led.get_pulse_options(),
+        player_led.get_brightness(),
+        player_led.get_player_id(),
+        int(rgb.R * 255),
+        int(rgb.G * 255),
+        int(rgb.B * 255),
+    )
+
+
+class OutputReport:
+    """
+    Preallocated output report for one connection type.
+
+    :func:`poll` encodes the current :class:`DeviceOutputState`, patches only the bytes that differ from the last
+    report and returns the report only when something changed, so an idle output state costs no device write.
+    The produced bytes are identical to :func:`DeviceOutputState.prepareReport`.
+    """
+
+    def __init__(self, connection_type: ConnectionType, keepalive_interval: float | None = None) -> None:
+        """
+        Args:
+            connection_type (ConnectionType): connection the report is built for.
+            keepalive_interval (float | None, optional): resend an unchanged report after this many seconds.
+                Defaults to None, which never resends an unchanged report.
+        """
+        self.connection_type = connection_type
+        self.keepalive_interval = keepalive_interval
+
+        self.buffer = bytearray(connection_type.get_out_report_length())
+        self.buffer[0] = connection_type.get_type()
+
+        if connection_type == ConnectionType.USB:
+            self.buffer[1] = 0xFF
+            self.buffer[2] = _FLAGS
+            self._offsets = _USB_OFFSETS
+        elif connection_type == ConnectionType.BT:
+            self.buffer[1] = 0x02
+            self.buffer[2] = 0xFF
+            self.buffer[3] = _FLAGS
+            self._offsets = _BT_OFFSETS
+        else:
+            raise ValueError("Invalid Connection Type")
+
+        self._values: tuple | None = None
+        self._report: bytes = b""
+        self._last_write: float | None = None
+
+    def invalidate(self) -> None:
+        """Force the next :func:`poll` to return a report, e.g. after the device was reopened."""
+        self._values = None
+
+    def poll(self, state: DeviceOutputState, now: float | None = None) -> bytes | None:
+        """
+        Bring the report up to date with ``state``.
+
+        Args:
+            state (DeviceOutputState): output state to encode.
+            now (float | None, optional): current ``time.monotonic()``, looked up when not given.
+
+        Returns:
+            bytes | None: the report to write, or None if the device already has this state.
+        """
+        values = _values(state)
+        bt_led_init = self.connection_type == ConnectionType.BT and not state.bt_led_initialized
+
+        if values != self._values or bt_led_init:
+            self._patch(values, bt_led_init)
+            if bt_led_init:
+                state.bt_led_initialized = True
+        elif self.keepalive_interval is None:
+            return None
+        else:
+            if now is None:
+                now = time.monotonic()
+            if self._last_write is not None and now - self._last_write < self.keepalive_interval:
+                return None
+            if self.buffer[3] & _BT_LED_INIT_FLAG and self.connection_type == ConnectionType.BT:
+                self._patch(values, False)
+
+        self._last_write = time.monotonic() if now is None else now
+        return self._report
+
+    def _patch(self, values: tuple, bt_led_init: bool) -> None:
+        buffer = self.buffer
+        previous = self._values
+
+        if previous is None:
+            for offset, value in zip(self._offsets, values):
+                buffer[offset] = value
+        else:
+            for offset, value, old in zip(self._offsets, values, previous):
+                if value != old:
+                    buffer[offset] = value
+        self._values = values
+
+        if self.connection_type == ConnectionType.BT:
+            # the led init flag is only part of the first report, it is cleared again right after sending
+            buffer[3] = _FLAGS | _BT_LED_INIT_FLAG if bt_led_init else _FLAGS
+            _CRC.pack_into(buffer, CRC_OFFSET, compute_fast(buffer))
+
+        self._report = bytes(buffer)
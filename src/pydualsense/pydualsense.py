@@ -1,46 +1,192 @@
 import logging
 import os
 import sys
-from sys import platform
-
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from .cache import CachedDevice, DeviceCache
+from .checksum import verify_input
+from .combos import ComboRecognizer
+from .decoder import FastInputState
+from .events import InputEvents
+from .gestures import GestureTracker
+from .history import InputHistory
+from .instrumentation import DECODE, ENCODE, READ, WRITE, ReportStats
 from .models import DeviceOutputState, DeviceInputState
-import pathlib
+from .motion import ImuCalibration, MotionTracker
+from .output_report import OutputReport
+from .recording import ReportRecorder
+from .shared import SharedReportPublisher
+from .snapshot import SnapshotBuffer
+from .timeline import Clip, Timeline
+from .transport import HidapiTransport, Transport, load_hidapi
+from .writer import OutputWriter
+from .enums import ConnectionType  # type: ignore
 
+if TYPE_CHECKING:
+    import hidapi
 
-if platform.startswith("win") and sys.version_info >= (3, 8):
-    os.add_dll_directory(str(pathlib.Path(__file__).parent.absolute()))
+    from .dsu import DsuSlot
+    from .rumble import RumbleStream
 
-import hidapi
-from .enums import ConnectionType  # type: ignore
-import threading
+# longest time the report thread blocks in a read, it bounds how long close() waits for a silent controller
+READ_TIMEOUT_MS = 100
+
+# nominal input report rate, without a writer thread output reports are written at this rate
+INPUT_REPORT_RATE = 250.0
+
+
+def find_devices() -> "list[hidapi.DeviceInfo]":
+    """
+    List every connected dualsense
+
+    Raises:
+        Exception: HIDGuardian detected
+
+    Returns:
+        list[hidapi.DeviceInfo]: enumeration entries of the detected controllers
+    """
+    if sys.platform.startswith("win32"):
+        from . import hidguardian as hidguardian
+
+        if hidguardian.check_hide():
+            raise Exception(
+                "HIDGuardian detected. Delete the controller from HIDGuardian and restart PC to connect to controller"
+            )
+
+    devices = load_hidapi().enumerate(vendor_id=0x054C)
+    return [device for device in devices if device.vendor_id == 0x054C and device.product_id == 0x0CE6]
 
 
 class DualsenseController:
     report_thread: threading.Thread | None = None
+    device_path: bytes | str | None = None
+    serial_number: str | None = None
     kill_thread: bool = False
-
-    def __init__(self) -> None:
+    crc_errors: int = 0  # BT input reports dropped because of a checksum mismatch
+    recorder: ReportRecorder | None = None
+    publisher: SharedReportPublisher | None = None  # shared memory ring for other processes, see start_publishing
+    dsu: "DsuSlot | None" = None  # DSU server slot fed with every report, see DsuServer.add
+    stats: ReportStats | None = None  # loop instrumentation, see enable_stats
+    motion: MotionTracker | None = None  # calibrated IMU and orientation, see enable_motion
+    history: InputHistory | None = None  # buttons and axes of the last reports, see enable_history
+    combos: ComboRecognizer | None = None  # input sequence matching, see enable_combos
+    gestures: GestureTracker | None = None  # touchpad gestures, see enable_gestures
+    rumble: "RumbleStream | None" = None  # streamed motor amplitudes, see stream_rumble
+
+    def __init__(
+        self,
+        output_keepalive: float | None = None,
+        start_reader: bool = True,
+        device_info: "hidapi.DeviceInfo | None" = None,
+        transport: Transport | None = None,
+        output_rate: float | None = None,
+        device_cache: DeviceCache | None = None,
+        open_timeout: float | None = 2.0,
+    ) -> None:
         """
         initialise the library but dont connect to the controller. call :func:`init() <pydualsense.pydualsense.init>`
         to connect to the controller
 
         Args:
             verbose (bool, optional): display verbose out (debug prints of input and output). Defaults to False.
+            output_keepalive (float | None, optional): resend an unchanged output report after this many seconds.
+                Defaults to None, output reports are only written when the output state changed.
+            start_reader (bool, optional): start the background report thread. Without it reports have to be fed
+                to :func:`process_report` by the caller. Defaults to True.
+            device_info (hidapi.DeviceInfo | None, optional): controller to open, see :func:`find_devices`.
+                Defaults to None, which opens the last detected controller.
+            transport (Transport | None, optional): already opened connection, e.g. a
+                :class:`VirtualDualsense <pydualsense.virtual.VirtualDualsense>`. Defaults to None, which opens
+                ``device_info`` through hidapi.
+            output_rate (float | None, optional): write output reports from a separate thread, at most this many
+                times per second, see :class:`OutputWriter <pydualsense.writer.OutputWriter>`. Defaults to None,
+                which writes from the report thread after every input report.
+            device_cache (DeviceCache | None, optional): reuse what an earlier session learned about this controller
+                (connection type, calibration, firmware version) and refresh it in the background. Defaults to
+                None.
+            open_timeout (float | None, optional): seconds to wait for the first report when the connection type
+                can not be told from the enumeration data or the cache, None waits forever. Defaults to 2.0.
+
+        Raises:
+            TimeoutError: the controller did not send a report within ``open_timeout``
         """
 
         self.bt_led_initialized = False
 
-        self.device: hidapi.Device = self.__find_device()
+        owns_transport = transport is None
+        if transport is None:
+            transport = self.__find_device(device_info)
+        self.device: Transport | None = transport
+        self.device_path = transport.path
+        self.serial_number = transport.serial_number
 
-        self.input_state = DeviceInputState()  # controller states
+        # (snapshot version, state built from it), replaced as a whole so readers on any thread see a complete state
+        self._input: tuple[int, DeviceInputState] = (-1, DeviceInputState())
         self.output_state = DeviceOutputState()  # controller states
-
-        self.conType = self.determineConnectionType()  # determine USB or BT connection
-
-        self.report_thread = threading.Thread(target=self.read_task, daemon=True)
-        self.report_thread.start()
-
-    def determineConnectionType(self) -> ConnectionType:
+        self.events = InputEvents()  # button/axis/touch handlers, called from the report thread
+        self.snapshots = SnapshotBuffer()  # consistent per report views for other threads
+        self.timeline = Timeline()  # animations of the output state, evaluated per output report
+
+        self.calibration: ImuCalibration | None = None  # factory IMU calibration, if known
+        self.firmware_version: int | None = None
+        self.device_cache = device_cache
+        cached = device_cache.lookup(transport) if device_cache is not None else None
+        if cached is not None:
+            self._apply_cached(cached)
+
+        first_report = None
+        if transport.connection_type is not None:
+            # known from the enumeration data (bus type, sysfs, interface number)
+            self.conType = transport.connection_type
+        elif cached is not None and cached.path == os.fsdecode(transport.path):  # type: ignore
+            # same controller on the same HID node as last time, no need to wait for a report
+            self.conType = cached.connection_type
+        else:
+            try:
+                self.conType, first_report = self._probe_connection_type(open_timeout)
+            except BaseException:
+                if owns_transport:
+                    transport.close()
+                raise
+        self.output_report = OutputReport(self.conType, keepalive_interval=output_keepalive)
+        # the cached report is patched in place, so only one thread at a time may encode and write it
+        self._output_lock = threading.Lock()
+
+        self.output_writer: OutputWriter | None = None
+        if output_rate:
+            self.output_writer = OutputWriter(
+                transport,
+                self.output_report,
+                self.output_state,
+                output_rate,
+                timeline=self.timeline,
+                lock=self._output_lock,
+            )
+            self.output_writer.start()
+
+        if first_report is not None:
+            # the probe report is a regular input report, so the state is valid right away
+            self.process_report(first_report)
+
+        if start_reader:
+            self.report_thread = threading.Thread(target=self.read_task, daemon=True)
+            self.report_thread.start()
+
+        if device_cache is not None:
+            device_cache.refresh_in_background(transport, self.conType, self._apply_cached)
+
+    def _apply_cached(self, entry: CachedDevice) -> None:
+        calibration = entry.imu_calibration
+        if calibration is not None:
+            self.calibration = calibration
+            if self.motion is not None:
+                self.motion.calibration = calibration
+        if entry.firmware_version is not None:
+            self.firmware_version = entry.firmware_version
+
+    def determineConnectionType(self, timeout: float | None = None) -> ConnectionType:
         """
         Determine the connection type of the controller. eg USB or BT.
 
@@ -50,17 +196,28 @@ class DualsenseController:
 
         This way of determining is not pretty but it works..
 
+        Args:
+            timeout (float | None, optional): seconds to wait for a report, None waits forever. Defaults to None.
+
+        Raises:
+            TimeoutError: no report arrived in time
+
         Returns:
             ConnectionType: Detected connection type of the controller.
         """
+        return self._probe_connection_type(timeout)[0]
 
-        dummy_report = self.device.read(100)
-        input_report_length = len(dummy_report)  # type: ignore
+    def _probe_connection_type(self, timeout: float | None) -> tuple[ConnectionType, bytes]:
+        """determineConnectionType that also returns the report it read"""
+        dummy_report = self.device.read(100, -1 if timeout is None else max(int(timeout * 1000), 1))  # type: ignore
+        if dummy_report is None:
+            raise TimeoutError(f"Controller did not send a report within {timeout} s")
+        input_report_length = len(dummy_report)
 
         if input_report_length == ConnectionType.USB.get_in_report_length():
-            return ConnectionType.USB
+            return ConnectionType.USB, dummy_report
         elif input_report_length == ConnectionType.BT.get_in_report_length():
-            return ConnectionType.BT
+            return ConnectionType.BT, dummy_report
         else:
             raise Exception("Could not determine connection type")
 
@@ -70,70 +227,450 @@ class DualsenseController:
         """
         # TODO: reset trigger effect to default
 
+        if self.device is None:
+            return
+
+        self.stop_recording()
+
         if self.report_thread:
             self.kill_thread = True
 
             self.report_thread.join()
-            self.device.close()
             self.report_thread = None
 
-    def __find_device(self) -> hidapi.Device:
+        try:
+            if self.output_writer is not None:
+                self.output_writer.stop()  # raises if its last write failed
+        finally:
+            self.stop_publishing()
+            self.device.close()
+            self.device = None
+
+    def __find_device(self, device_info: "hidapi.DeviceInfo | None" = None) -> Transport:
         """
         find HID dualsense device and open it
 
+        Args:
+            device_info (hidapi.DeviceInfo | None, optional): device to open, the last detected one if None.
+
         Raises:
             Exception: HIDGuardian detected
             Exception: No device detected
 
         Returns:
-            hid.Device: returns opened controller device
+            Transport: returns opened controller device
         """
         # TODO: detect connection mode, bluetooth has a bigger write buffer
-        # TODO: implement multiple controllers working
-        if sys.platform.startswith("win32"):
-            from . import hidguardian as hidguardian
-
-            if hidguardian.check_hide():
-                raise Exception(
-                    "HIDGuardian detected. Delete the controller from HIDGuardian "
-                    "and restart PC to connect to controller"
-                )
+        if device_info is None:
+            devices = find_devices()
+            if not devices:
+                raise Exception("No device detected")
+            device_info = devices[-1]
 
-        detected_device: hidapi.Device | None = None
-
-        devices = hidapi.enumerate(vendor_id=0x054C)
-        for device in devices:
-            if device.vendor_id == 0x054C and device.product_id == 0x0CE6:
-                detected_device = device
-
-        if detected_device is None:
-            raise Exception("No device detected")
-
-        dual_sense = hidapi.Device(vendor_id=detected_device.vendor_id, product_id=detected_device.product_id)  # type: ignore
-        return dual_sense
+        return HidapiTransport(device_info)
 
     def read_task(self) -> None:
         """background thread handling the reading of the device and updating its states"""
+        if self.stats is not None:
+            return self._read_task_instrumented(self.stats)
+
         while True:
             if self.kill_thread:
                 break
 
-            # read data from the input report of the controller
-            inReport = self.device.read(self.conType.get_in_report_length())
+            # read data from the input report of the controller, the timeout lets close() stop a silent controller
+            inReport = self.device.read(self.conType.get_in_report_length(), READ_TIMEOUT_MS)
+            if inReport is None:
+                continue
+
+            if self.process_report(inReport):
+                self.update_output()
+
+    def _read_task_instrumented(self, stats: ReportStats) -> None:
+        """read_task with per stage timing, only used while instrumentation is enabled"""
+        clock = time.perf_counter_ns
+        length = self.conType.get_in_report_length()
+        sequence_index = 8 if self.conType == ConnectionType.BT else 7
+
+        while not self.kill_thread:
+            start = clock()
+            inReport = self.device.read(length, READ_TIMEOUT_MS)
+            if inReport is None:
+                continue
+            read_done = clock()
+            stats.add(READ, read_done - start)
+
+            if not self.process_report(inReport):
+                stats.dropped += 1
+                continue
+            done = clock()
+            stats.add(DECODE, done - read_done)
+            stats.sequence(inReport[sequence_index])
+
+            if self.output_writer is not None:
+                self.output_writer.notify()
+            else:
+                with self._output_lock:
+                    outReport = self._poll_output()
+                    encoded = clock()
+                    stats.add(ENCODE, encoded - done)
+                    done = encoded
+                    if outReport is not None:
+                        self.device.write(outReport)
+                        done = clock()
+                        stats.add(WRITE, done - encoded)
+
+            stats.tick(done)
+
+    def enable_stats(self, stats: ReportStats | None = None) -> ReportStats:
+        """
+        Time the stages of the report loop and count lost reports.
+
+        The report thread is restarted with an instrumented loop, so the regular loop does not pay for it while
+        instrumentation is disabled. The read stage is the time spent waiting for the device, so it is mostly the
+        report interval; decode covers :func:`process_report` including the event handlers. Encode and write are
+        timed by the writer thread when there is one.
+
+        Args:
+            stats (ReportStats | None, optional): collector to use, e.g. one with a callback. Defaults to None,
+                which creates a new :class:`ReportStats <pydualsense.instrumentation.ReportStats>`.
+
+        Returns:
+            ReportStats: the collector, :func:`ReportStats.snapshot` can be called from any thread
+        """
+        if stats is None:
+            stats = ReportStats()
+        self._restart_reader(stats)
+        return stats
+
+    def disable_stats(self) -> None:
+        """Go back to the uninstrumented report loop."""
+        if self.stats is not None:
+            self._restart_reader(None)
+
+    def _restart_reader(self, stats: ReportStats | None) -> None:
+        running = self.report_thread is not None
+        if running:
+            self.kill_thread = True
+            self.report_thread.join()  # type: ignore
+
+        self.stats = stats
+        if self.output_writer is not None:
+            self.output_writer.stats = stats
+
+        if running:
+            self.kill_thread = False
+            self.report_thread = threading.Thread(target=self.read_task, daemon=True)
+            self.report_thread.start()
+
+    @property
+    def input_state(self) -> DeviceInputState:
+        """
+        The last report as nested state models.
+
+        It is built from the latest snapshot when it is read after a new report arrived, so the report thread only
+        decodes every report once. Every new report gives a new object that is not modified afterwards, so it can be
+        read from any thread; reads until the next report return the same object.
+
+        Assigning a state replaces it until the next report arrives.
+        """
+        snapshots = self.snapshots
+        version = snapshots.version  # read before latest(), a newer snapshot is rebuilt at worst once more
+        cached_version, state = self._input
+        if version != cached_version:
+            state = DeviceInputState()
+            state.from_fast(snapshots.latest())
+            self._input = (version, state)
+        return state
+
+    @input_state.setter
+    def input_state(self, state: DeviceInputState) -> None:
+        self._input = (self.snapshots.version, state)
+
+    def process_report(self, inReport: bytes) -> bool:
+        """
+        Decode an input report into a new snapshot and dispatch its events.
+
+        Args:
+            inReport (bytes): input report as read from the device.
+
+        Returns:
+            bool: False if the report was dropped
+        """
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(inReport)
+
+        # decrypt the packet and bind the inputs
+        if self.conType == ConnectionType.BT:
+            # corrupted reports are dropped instead of being decoded
+            if not verify_input(inReport):
+                self.crc_errors += 1
+                return False
+
+            # the reports for BT and USB are structured the same,
+            # but there is one more byte at the start of the bluetooth report.
+            offset = 1
+        else:  # USB
+            offset = 0
+
+        # the only decode of the report, input_state is derived from it on demand
+        self.snapshots.publish(inReport, offset)
+        motion = self.motion
+        if motion is not None:
+            motion.process(inReport, offset)
+        history = self.history
+        if history is not None:
+            history.record(inReport, offset)
+        combos = self.combos
+        if combos is not None:
+            combos.process(inReport, offset)
+        gestures = self.gestures
+        if gestures is not None:
+            gestures.process(inReport, offset)
+        publisher = self.publisher
+        if publisher is not None:
+            publisher.publish(inReport)
+        dsu = self.dsu
+        if dsu is not None:
+            dsu.process(inReport, offset)
+        self.events.process(inReport, offset)
+        return True
+
+    def enable_motion(self, calibration: ImuCalibration | None = None, beta: float = 0.05) -> MotionTracker:
+        """
+        Apply the IMU calibration and track the orientation with every report.
+
+        Args:
+            calibration (ImuCalibration | None, optional): calibration to apply. Defaults to None, which uses the
+                cached calibration or reads it from the controller (feature report 0x05) and falls back to the
+                nominal ranges if that fails.
+            beta (float, optional): gain of the fusion filter. Defaults to 0.05.
+
+        Returns:
+            MotionTracker: the tracker, its ``quaternion``, ``gyro`` and ``accel`` are updated by the report thread
+        """
+        if calibration is None:
+            calibration = self.calibration
+        if calibration is None:
+            try:
+                calibration = ImuCalibration.read(self.device)  # type: ignore
+            except (OSError, ValueError):
+                calibration = ImuCalibration()
+        self.motion = MotionTracker(calibration, beta)
+        return self.motion
+
+    def disable_motion(self) -> None:
+        self.motion = None
+
+    def enable_history(self, seconds: float = 2.0, rate_hz: float = 1000.0) -> InputHistory:
+        """
+        Keep the buttons and axes of the last ``seconds`` for window queries, see
+        :class:`InputHistory <pydualsense.history.InputHistory>`.
+
+        Args:
+            seconds (float, optional): time to keep. Defaults to 2.0.
+            rate_hz (float, optional): highest expected report rate, sizes the ring. Defaults to 1000.0.
+
+        Returns:
+            InputHistory: the history, filled by the report thread
+        """
+        self.history = InputHistory(seconds, rate_hz)
+        return self.history
+
+    def disable_history(self) -> None:
+        self.history = None
+
+    def enable_combos(self) -> ComboRecognizer:
+        """
+        Match input sequences against every report, see :class:`ComboRecognizer <pydualsense.combos.ComboRecognizer>`.
+
+        Returns:
+            ComboRecognizer: the recognizer, register the sequences with :func:`ComboRecognizer.add`
+        """
+        if self.combos is None:
+            self.combos = ComboRecognizer()
+        return self.combos
+
+    def disable_combos(self) -> None:
+        self.combos = None
+
+    def enable_gestures(self, **thresholds) -> GestureTracker:
+        """
+        Recognize touchpad gestures in every report, see
+        :class:`GestureTracker <pydualsense.gestures.GestureTracker>`.
+
+        Args:
+            **thresholds: distances, times and smoothing passed to GestureTracker.
+
+        Returns:
+            GestureTracker: the tracker, subscribe with :func:`GestureTracker.on_gesture`
+        """
+        self.gestures = GestureTracker(**thresholds)
+        return self.gestures
+
+    def disable_gestures(self) -> None:
+        self.gestures = None
+
+    def start_recording(self, path: str, batch_size: int = 256) -> ReportRecorder:
+        """
+        Record every raw input report to a capture file.
+
+        :class:`ReportReplayer <pydualsense.recording.ReportReplayer>` plays it back through :func:`process_report`.
+
+        Args:
+            path (str): capture file, it is overwritten.
+            batch_size (int, optional): reports buffered before they are written. Defaults to 256.
+
+        Returns:
+            ReportRecorder: the active recorder
+        """
+        self.stop_recording()
+        self.recorder = ReportRecorder(path, self.conType, batch_size=batch_size)
+        return self.recorder
+
+    def stop_recording(self) -> None:
+        """Stop recording and flush the capture file."""
+        recorder = self.recorder
+        if recorder is not None:
+            self.recorder = None
+            recorder.close()
+
+    def start_publishing(self, name: str | None = None, slots: int = 64) -> SharedReportPublisher:
+        """
+        Publish every valid input report into shared memory, for other processes to read with a
+        :class:`SharedReportSubscriber <pydualsense.shared.SharedReportSubscriber>`.
+
+        Args:
+            name (str | None, optional): name of the shared memory segment. Defaults to None, a random name.
+            slots (int, optional): reports kept in the ring. Defaults to 64.
+
+        Returns:
+            SharedReportPublisher: the publisher, subscribers attach with its ``name``
+        """
+        self.stop_publishing()
+        self.publisher = SharedReportPublisher(self.conType, name=name, slots=slots)
+        return self.publisher
+
+    def stop_publishing(self) -> None:
+        """Stop publishing and remove the shared memory segment."""
+        publisher = self.publisher
+        if publisher is not None:
+            self.publisher = None
+            publisher.close()
+
+    def snapshot(self) -> FastInputState:
+        """
+        Input state of the last report as one consistent snapshot.
+
+        A snapshot is never modified after it was published, so it can be read from any thread without locking and
+        without building the nested models of :attr:`input_state`. Call again for newer data.
+
+        Returns:
+            FastInputState: read only view of the last report
+        """
+        return self.snapshots.latest()
+
+    def update_output(self, urgent: bool = False) -> None:
+        """
+        Send the output state, through the writer thread if there is one.
+
+        Args:
+            urgent (bool, optional): bypass the rate limit of the writer thread. Defaults to False.
+        """
+        if self.output_writer is not None:
+            self.output_writer.notify(urgent)
+        else:
+            self.write_output()
 
-            assert isinstance(inReport, bytes)
+    def play(self, clip: Clip) -> Clip:
+        """
+        Start an animation of the output state, see :class:`Clip <pydualsense.timeline.Clip>`.
 
-            # decrypt the packet and bind the inputs
-            if self.conType == ConnectionType.BT:
-                # the reports for BT and USB are structured the same,
-                # but there is one more byte at the start of the bluetooth report.
-                # We drop that byte, so that the format matches up again.
-                self.input_state.from_state(inReport[1:])
-            else:  # USB
-                self.input_state.from_state(inReport)
+        The clip is evaluated for every output report: by the writer thread at its rate if there is one, otherwise
+        after every input report.
 
-            # prepare new report for device
-            outReport = self.output_state.prepareReport(self.conType)
+        Returns:
+            Clip: the clip, :func:`Timeline.stop <pydualsense.timeline.Timeline.stop>` ends it early
+        """
+        self.timeline.play(clip)
+        if self.output_writer is not None:
+            self.output_writer.notify()
+        return clip
+
+    def stream_rumble(self, source=None, sample_rate: float | None = None, capacity_s: float = 0.25) -> "RumbleStream":
+        """
+        Play motor amplitudes sample by sample, see :class:`RumbleStream <pydualsense.rumble.RumbleStream>`.
+
+        The samples are resampled to the output report rate, ``output_rate`` if there is a writer thread, otherwise
+        the input report rate. A stream that is still playing is stopped. Requires numpy.
+
+        Args:
+            source (optional): (N,) or (N, 2) (left, right) array of amplitudes 0-1, or an iterable of such chunks,
+                e.g. a generator. Defaults to None, samples are passed to :func:`RumbleStream.write` by the caller.
+            sample_rate (float | None, optional): sample rate of ``source``. Defaults to None, the report rate.
+            capacity_s (float, optional): ring buffer length in seconds, bounds the latency. Defaults to 0.25.
+
+        Returns:
+            RumbleStream: the stream, with its :attr:`latency <pydualsense.rumble.RumbleStream.latency>` and
+            underrun count
+        """
+        import numpy as np
+
+        from .rumble import RumbleStream
+
+        writer = self.output_writer
+        stream = RumbleStream(
+            writer.max_rate_hz if writer is not None else INPUT_REPORT_RATE, sample_rate, capacity_s=capacity_s
+        )
+        previous, self.rumble = self.rumble, stream
+        if previous is not None:
+            previous.stop()
+        if writer is not None:
+            writer.rumble = stream
+            writer.notify()
+
+        if source is not None:
+            # a single buffer is one chunk, anything else is iterated chunk by chunk
+            chunks = (source,) if isinstance(source, (np.ndarray, list, tuple)) else source
+            stream.feed(chunks)
+        return stream
+
+    def stop_rumble(self) -> None:
+        """Stop both motors right away, safe to call from any thread."""
+        # under the output lock, so a report being polled on another thread can not apply a sample afterwards
+        with self._output_lock:
+            rumble = self.rumble
+            if rumble is not None:
+                rumble.stop()
+            self.output_state.left_motor = 0
+            self.output_state.right_motor = 0
+        self.update_output(urgent=True)
+
+    def write_output(self) -> bool:
+        """
+        Write the output state to the device if it changed since the last write.
+
+        Safe to call from any thread, writes are serialized with the report and writer threads.
+
+        Returns:
+            bool: True if a report was written
+        """
+        with self._output_lock:
+            outReport = self._poll_output()
 
             # write the report to the device
-            self.device.write(bytes(outReport))  # type: ignore
+            if outReport is None:
+                return False
+            self.device.write(outReport)  # type: ignore
+            return True
+
+    def _poll_output(self) -> bytes | None:
+        """Apply playing clips and streamed rumble, then patch the cached report, None if nothing changed."""
+        timeline = self.timeline
+        if timeline.active:
+            timeline.apply(self.output_state)
+        rumble = self.rumble
+        if rumble is not None and rumble.active:
+            rumble.apply(self.output_state)
+        return self.output_report.poll(self.output_state)
@@ -0,0 +1,206 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, Iterator
+
+from .enums import ConnectionType
+
+# File layout: one header followed by fixed size records, so record n starts at HEADER.size + n * RECORD.size.
+#
+#   header: magic, format version, connection type, record size
+#   record: monotonic timestamp in ns, report length, report padded to the BT report length
+MAGIC = b"DSRC"
+VERSION = 1
+HEADER = struct.Struct("<4sHBxH6x")
+MAX_REPORT_LENGTH = 78
+RECORD = struct.Struct(f"<QH{MAX_REPORT_LENGTH}s")
+_RECORD_PREFIX = struct.Struct("<QH")  # timestamp and length, followed by the report
+
+
+class ReportRecorder:
+    """
+    Appends raw input reports with their arrival time to a capture file.
+
+    Records are packed into a preallocated batch buffer and written with one ``write`` call per batch.
+    :func:`close` may be called from another thread than :func:`record`, reports recorded after it are dropped.
+    """
+
+    def __init__(self, path: str, connection_type: ConnectionType, batch_size: int = 256) -> None:
+        """
+        Args:
+            path (str): capture file, it is overwritten.
+            connection_type (ConnectionType): connection the reports were read from.
+            batch_size (int, optional): records buffered before they are written to the file. Defaults to 256.
+        """
+        self.path = path
+        self.connection_type = connection_type
+        self.count = 0
+
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, connection_type, RECORD.size))
+
+        self._batch = bytearray(RECORD.size * batch_size)
+        self._batch_size = batch_size
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def record(self, report, timestamp_ns: int | None = None) -> None:
+        """
+        Add one report.
+
+        Args:
+            report (bytes | bytearray | memoryview): raw input report as read from the device.
+            timestamp_ns (int | None, optional): arrival time, ``time.monotonic_ns()`` if not given.
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+
+        with self._lock:
+            if self._file.closed:
+                return
+            RECORD.pack_into(self._batch, self._pending * RECORD.size, timestamp_ns, len(report), report)
+            self._pending += 1
+            self.count += 1
+
+            if self._pending == self._batch_size:
+                self._flush()
+
+    def flush(self) -> None:
+        """Write the buffered records to the file."""
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush()
+            self._file.close()
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._file.write(memoryview(self._batch)[: self._pending * RECORD.size])
+            self._pending = 0
+        self._file.flush()
+
+    def __enter__(self) -> "ReportRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ReportReplayer:
+    """
+    Memory maps a capture file written by :class:`ReportRecorder`.
+
+    Reports are returned as memoryviews into the mapping, nothing is copied or read ahead.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): capture file.
+
+        Raises:
+            ValueError: not a capture file or unsupported version
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            # checked before mapping, an empty file can not be mapped at all
+            if os.fstat(self._file.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is not a report capture")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        self._view = memoryview(self._mmap)
+
+        magic, version, connection_type, record_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a supported report capture")
+
+        self.connection_type = ConnectionType(connection_type)
+        # a trailing partial record (recorder killed mid write) is ignored
+        self._count = (len(self._mmap) - HEADER.size) // RECORD.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def timestamp(self, index: int) -> int:
+        """
+        Returns:
+            int: arrival time of report ``index`` in ns
+        """
+        return _RECORD_PREFIX.unpack_from(self._mmap, HEADER.size + index * RECORD.size)[0]
+
+    def __getitem__(self, index: int) -> memoryview:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("report index out of range")
+        return self._report(HEADER.size + index * RECORD.size)
+
+    def __iter__(self) -> Iterator[tuple[int, memoryview]]:
+        """Yields (timestamp in ns, report) pairs."""
+        data = self._mmap
+        view = self._view
+        position = HEADER.size
+        for _ in range(self._count):
+            timestamp_ns, length = _RECORD_PREFIX.unpack_from(data, position)
+            start = position + _RECORD_PREFIX.size
+            yield timestamp_ns, view[start : start + length]
+            position += RECORD.size
+
+    def play(self, process: Callable[[memoryview], object], speed: float | None = 1.0) -> int:
+        """
+        Feed every report to ``process``, e.g. :func:`DualsenseController.process_report`.
+
+        Args:
+            process (Callable[[memoryview], object]): called with each raw report.
+            speed (float | None, optional): 1.0 replays in real time, 2.0 twice as fast and None (or 0) as fast as
+                possible. Defaults to 1.0.
+
+        Returns:
+            int: number of replayed reports
+        """
+        count = 0
+        start_ns = time.monotonic_ns()
+        first_ns: int | None = None
+
+        for timestamp_ns, report in self:
+            if speed:
+                if first_ns is None:
+                    first_ns = timestamp_ns
+                due_ns = start_ns + (timestamp_ns - first_ns) / speed
+                delay = (due_ns - time.monotonic_ns()) / 1e9
+                if delay > 0:
+                    time.sleep(delay)
+            process(report)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        """Unmap the file, reports returned earlier must not be used anymore."""
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # reports are still referenced, the mapping goes away together with them
+        self._file.close()
+
+    def __enter__(self) -> "ReportReplayer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _report(self, position: int) -> memoryview:
+        length = _RECORD_PREFIX.unpack_from(self._mmap, position)[1]
+        start = position + _RECORD_PREFIX.size
+        return self._view[start : start + length]
@@ -0,0 +1,276 @@
+"""
+Streaming rumble playback from sample buffers, e.g. envelopes of game audio.
+
+Requires numpy, which is not needed by the rest of the package:
+
+.. code-block:: python
+
+    envelope = np.abs(audio).reshape(-1, 480).max(axis=1)  # 100 Hz envelope of 48 kHz audio
+    stream = controller.stream_rumble(envelope, sample_rate=100)
+    print(stream.latency, stream.underruns)
+
+Samples are resampled to the output report rate when they are queued, so playback takes exactly one queued sample
+per output report, with no per report arithmetic besides the ring buffer index.
+"""
+
+import threading
+import time
+from typing import Iterable
+
+import numpy as np
+
+from .models import DeviceOutputState
+
+
+def _as_channels(samples) -> np.ndarray:
+    """(N,) amplitudes for both motors or (N, 2) (left, right) amplitudes as an (N, 2) float32 array in 0-1"""
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 1:
+        samples = np.repeat(samples[:, None], 2, axis=1)
+    elif samples.ndim != 2 or samples.shape[1] != 2:
+        raise ValueError(f"expected (N,) or (N, 2) motor amplitudes, got shape {samples.shape}")
+    return np.clip(samples, 0.0, 1.0)
+
+
+class Resampler:
+    """
+    Linear resampling of a chunked signal, continuous across chunk boundaries.
+
+    The last input sample of every chunk is kept, so the samples between two chunks are interpolated as if the
+    signal was passed in one piece.
+    """
+
+    def __init__(self, input_rate: float, output_rate: float) -> None:
+        """
+        Args:
+            input_rate (float): sample rate of the chunks.
+            output_rate (float): sample rate of the result.
+        """
+        if input_rate <= 0 or output_rate <= 0:
+            raise ValueError("sample rates have to be positive")
+        self.step = input_rate / output_rate  # input samples per output sample
+        self._previous: np.ndarray | None = None
+        self._position = 0.0  # position of the next output sample, relative to self._previous
+
+    def __call__(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            chunk (np.ndarray): (N, C) input samples.
+
+        Returns:
+            np.ndarray: (M, C) output samples, M is about N / step
+        """
+        if len(chunk) == 0:
+            return chunk
+        data = chunk if self._previous is None else np.concatenate((self._previous, chunk))
+
+        # output samples that lie before the last input sample, the rest needs the next chunk
+        positions = np.arange(self._position, len(data) - 1, self.step)
+        index = positions.astype(np.intp)
+        fraction = (positions - index).astype(np.float32)[:, None]
+        out = data[index] * (1 - fraction) + data[index + 1] * fraction
+
+        if len(positions):
+            self._position = positions[-1] + self.step
+        self._position -= len(data) - 1
+        self._previous = data[-1:]
+        return out
+
+    def flush(self) -> np.ndarray:
+        """The last input sample, if an output sample falls on it; call after the last chunk."""
+        previous, self._previous = self._previous, None
+        position, self._position = self._position, 0.0
+        if previous is None or position > 1e-9:
+            return np.empty((0, 2), dtype=np.float32)
+        return previous
+
+
+class RumbleStream:
+    """
+    Bounded ring buffer of motor amplitudes, played one sample per output report.
+
+    Producers :func:`write` chunks at any sample rate (or hand a chunk iterator to :func:`feed`), which blocks while
+    the ring is full. The writer thread calls :func:`apply` for every output report; the samples are bound to a
+    clock, so a late report skips the samples it missed instead of delaying the rest of the stream. When the ring
+    runs empty before :func:`close` the motors stop and :attr:`underruns` is counted; playback picks up with the
+    next sample written.
+    """
+
+    def __init__(self, rate_hz: float, sample_rate: float | None = None, capacity_s: float = 0.25) -> None:
+        """
+        Args:
+            rate_hz (float): output report rate the samples are played at.
+            sample_rate (float | None, optional): default sample rate of written chunks. Defaults to None,
+                ``rate_hz``.
+            capacity_s (float, optional): length of the ring buffer in seconds, the upper bound of :attr:`latency`.
+                Defaults to 0.25.
+        """
+        self.rate_hz = rate_hz
+        self.sample_rate = sample_rate or rate_hz
+        self.capacity = max(1, round(capacity_s * rate_hz))
+
+        self.underruns = 0  # times the ring ran empty while the stream was open
+        self.skipped = 0  # samples dropped because output reports came late
+
+        self._buffer = np.zeros((self.capacity, 2), dtype=np.float32)
+        self._cond = threading.Condition()
+        self._written = 0  # total samples queued, the ring position is this modulo capacity
+        self._read = 0  # total samples played
+        self._epoch: float | None = None  # time of sample 0 of the current run, None until playback (re)starts
+        self._closed = False
+        self._finished = False
+        self._resampler = self._make_resampler()
+        self._feeder: threading.Thread | None = None
+
+    def _make_resampler(self) -> Resampler | None:
+        # at the report rate samples are queued as they are, without holding back the last one of each chunk
+        return Resampler(self.sample_rate, self.rate_hz) if self.sample_rate != self.rate_hz else None
+
+    @property
+    def active(self) -> bool:
+        """False once the stream was closed and played to the end, or stopped."""
+        return not self._finished
+
+    @property
+    def queued(self) -> int:
+        return self._written - self._read
+
+    @property
+    def latency(self) -> float:
+        """Seconds until a sample written now is played, i.e. the queued samples at the report rate."""
+        return (self._written - self._read) / self.rate_hz
+
+    def write(self, samples, timeout: float | None = None) -> int:
+        """
+        Queue amplitudes, blocking while the ring buffer is full.
+
+        Args:
+            samples (array_like): (N,) amplitudes for both motors or (N, 2) (left, right) amplitudes, 0-1, at
+                :attr:`sample_rate`.
+            timeout (float | None, optional): give up after this many seconds, None waits as long as needed.
+                Defaults to None.
+
+        Raises:
+            ValueError: the stream was closed or samples have the wrong shape
+
+        Returns:
+            int: number of resampled samples queued, less than produced when the timeout expired or the stream was
+            stopped
+        """
+        if self._finished:
+            return 0
+        if self._closed:
+            raise ValueError("write to a closed RumbleStream")
+        samples = _as_channels(samples)
+        if self._resampler is not None:
+            samples = self._resampler(samples)
+        return self._enqueue(samples, timeout)
+
+    def _enqueue(self, samples: np.ndarray, timeout: float | None) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        buffer, capacity = self._buffer, self.capacity
+        done = 0
+        with self._cond:
+            while done < len(samples):
+                free = capacity - (self._written - self._read)
+                if free == 0:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if self._finished or (remaining is not None and remaining <= 0):
+                        break
+                    self._cond.wait(remaining)
+                    continue
+
+                start = self._written % capacity
+                count = min(free, len(samples) - done, capacity - start)
+                buffer[start : start + count] = samples[done : done + count]
+                self._written += count
+                done += count
+        return done
+
+    def feed(self, chunks: Iterable, sample_rate: float | None = None) -> threading.Thread:
+        """
+        Queue the chunks of an iterator from a daemon thread and :func:`close` the stream after the last one.
+
+        Args:
+            chunks (Iterable): chunks as accepted by :func:`write`, e.g. a generator reading an audio stream.
+            sample_rate (float | None, optional): sample rate of the chunks. Defaults to None, :attr:`sample_rate`.
+
+        Returns:
+            threading.Thread: the started thread
+        """
+        if sample_rate is not None and sample_rate != self.sample_rate:
+            self.sample_rate = sample_rate
+            self._resampler = self._make_resampler()
+
+        def task() -> None:
+            for chunk in chunks:
+                if self._finished:
+                    return
+                self.write(chunk)
+            self.close()
+
+        self._feeder = threading.Thread(target=task, daemon=True)
+        self._feeder.start()
+        return self._feeder
+
+    def close(self) -> None:
+        """End of the stream: the queued samples are still played, then the motors stop."""
+        if self._closed:
+            return
+        if self._resampler is not None:
+            self._enqueue(self._resampler.flush(), None)
+        self._closed = True
+
+    def stop(self) -> None:
+        """Stop right away, queued samples are discarded."""
+        with self._cond:
+            self._closed = True
+            self._finished = True
+            self._read = self._written
+            self._cond.notify_all()
+
+    def apply(self, state: DeviceOutputState, now: float | None = None) -> bool:
+        """
+        Set the motors of ``state`` to the sample due at ``now``.
+
+        Args:
+            state (DeviceOutputState): output state to update.
+            now (float | None, optional): current ``time.monotonic()``. Defaults to None, looked up.
+
+        Returns:
+            bool: True while the stream is playing or waiting for samples
+        """
+        if self._finished:
+            return False
+        if now is None:
+            now = time.monotonic()
+
+        with self._cond:
+            available = self._written - self._read
+            if available == 0:
+                if self._closed:
+                    self._finished = True
+                elif self._epoch is not None:
+                    self.underruns += 1
+                if self._epoch is not None or self._finished:
+                    state.left_motor = state.right_motor = 0
+                self._epoch = None  # restart the clock with the next sample instead of skipping to catch up
+                return not self._finished
+
+            if self._epoch is None:
+                self._epoch = now - self._read / self.rate_hz
+            # half a period of tolerance, so jitter of the report timing does not alternate holds and skips
+            due = int((now - self._epoch) * self.rate_hz + 0.5) + 1 - self._read
+            if due <= 0:
+                return True  # reports faster than the sample rate keep the current sample
+            if due > available:
+                due = available
+            self.skipped += due - 1
+            self._read += due
+            # read while the lock is held, the writer may refill this slot as soon as it is released
+            index = (self._read - 1) % self.capacity
+            buffer = self._buffer
+            state.left_motor = buffer.item(index, 0)
+            state.right_motor = buffer.item(index, 1)
+            self._cond.notify()
+        return True
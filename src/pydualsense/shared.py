@@ -0,0 +1,274 @@
+import os
+import struct
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from .decoder import FastInputState
+from .enums import ConnectionType
+from .recording import MAX_REPORT_LENGTH
+
+# Segment layout: one header followed by a ring of fixed size slots, slot n starts at HEADER.size + n * SLOT.size.
+#
+#   header: magic, format version, connection type, slot count, slot size, number of published reports
+#   slot:   sequence stamp, monotonic timestamp in ns, report length, report padded to the BT report length
+#
+# Report number n (counted from 1) goes to slot (n - 1) % slots. Its stamp is 2n - 1 while the slot is written and
+# 2n afterwards, so a reader that sees the same even stamp before and after copying got an intact report.
+MAGIC = b"DSSM"
+VERSION = 1
+HEADER = struct.Struct("<4sHBxHH4xQ")
+SLOT = struct.Struct(f"<QQH6x{MAX_REPORT_LENGTH}s")
+_COUNT = struct.Struct("<Q")
+_COUNT_OFFSET = HEADER.size - _COUNT.size
+_SLOT_PREFIX = struct.Struct("<QQH")  # stamp, timestamp and length, followed by the report
+_REPORT_OFFSET = SLOT.size - MAX_REPORT_LENGTH
+
+
+class SharedReportPublisher:
+    """
+    Publishes raw input reports into a ``multiprocessing.shared_memory`` ring.
+
+    One process owns the controller and publishes every report; any number of :class:`SharedReportSubscriber`
+    in other processes read them without syscalls, pickling or locks. Slots are protected by a sequence stamp
+    (seqlock), so the writer never waits for readers and readers detect reports overwritten while they copied them.
+
+    :func:`close` may be called from another thread than :func:`publish`, reports published after it are dropped.
+    """
+
+    def __init__(self, connection_type: ConnectionType, name: str | None = None, slots: int = 64) -> None:
+        """
+        Args:
+            connection_type (ConnectionType): connection the reports are read from, subscribers decode accordingly.
+            name (str | None, optional): name of the shared memory segment. Defaults to None, a random name.
+            slots (int, optional): reports kept in the ring, how far a subscriber can fall behind. Defaults to 64.
+        """
+        if slots < 1:
+            raise ValueError("slots needs to be at least 1")
+        self.connection_type = connection_type
+        self.slots = slots
+        self.count = 0
+
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size + slots * SLOT.size)
+        self.name = self._shm.name
+        self._buf = self._shm.buf
+        HEADER.pack_into(self._buf, 0, MAGIC, VERSION, connection_type, slots, SLOT.size, 0)
+        self._lock = threading.Lock()  # keeps close from releasing the buffer while a report is written
+
+    def publish(self, report, timestamp_ns: int | None = None) -> None:
+        """
+        Add one report.
+
+        Args:
+            report (bytes | bytearray | memoryview): raw input report as read from the device.
+            timestamp_ns (int | None, optional): arrival time, ``time.monotonic_ns()`` if not given.
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+
+        with self._lock:
+            buf = self._buf
+            if buf is None:
+                return  # closed
+            count = self.count + 1
+            position = HEADER.size + (count - 1) % self.slots * SLOT.size
+
+            _SLOT_PREFIX.pack_into(buf, position, 2 * count - 1, timestamp_ns, len(report))
+            start = position + _REPORT_OFFSET
+            buf[start : start + len(report)] = report
+            _COUNT.pack_into(buf, position, 2 * count)
+            _COUNT.pack_into(buf, _COUNT_OFFSET, count)
+            self.count = count
+
+    def close(self) -> None:
+        """Remove the segment, subscribers that are still attached keep their mapping until they close it."""
+        with self._lock:
+            if self._buf is None:
+                return
+            self._buf.release()
+            self._buf = None
+        self._shm.close()
+        _track(self.name)
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedReportPublisher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        pass
+
+    # before Python 3.13 attaching registers the segment with the resource tracker, which would unlink it when this
+    # process exits, so the registration is dropped again. Processes started by multiprocessing share the tracker of
+    # their parent, there this also drops the publisher's registration, see _track.
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == "posix":
+        try:
+            resource_tracker.unregister("/" + shm.name, "shared_memory")
+        except OSError:
+            pass  # no tracker to forget it
+    return shm
+
+
+def _track(name: str) -> None:
+    """register the segment again before it is unlinked, a subscriber sharing the tracker may have dropped it"""
+    if os.name == "posix" and sys.version_info < (3, 13):
+        try:
+            resource_tracker.register("/" + name, "shared_memory")  # a no-op if it is still registered
+        except OSError:
+            pass
+
+
+class SharedReportSubscriber:
+    """
+    Reads the reports of a :class:`SharedReportPublisher` from another process.
+
+    Reports are copied into a buffer owned by the subscriber and decoded into its own :attr:`state` on request,
+    both are reused for every read. A subscriber is not thread safe, use one per thread.
+
+    .. code-block:: python
+
+        subscriber = SharedReportSubscriber(name)
+        while running:
+            if subscriber.read_next(timeout=0.1):
+                state = subscriber.decode()
+                print(state.cross, state.left_x)
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Args:
+            name (str): segment name, :attr:`SharedReportPublisher.name`.
+
+        Raises:
+            FileNotFoundError: no segment with this name
+            ValueError: the segment is not a report ring or has an unsupported version
+        """
+        self._shm = _attach(name)
+        self._buf = self._shm.buf
+        magic, version, connection_type, slots, slot_size, _ = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION or slot_size != SLOT.size:
+            self.close()
+            raise ValueError(f"{name} is not a supported report ring")
+
+        self.name = name
+        self.connection_type = ConnectionType(connection_type)
+        self.offset = 1 if self.connection_type == ConnectionType.BT else 0
+        self.slots = slots
+
+        # number of the report in :attr:`report`, read_next starts with the first report published after attaching
+        self.sequence = self.published
+        self.timestamp_ns = 0
+        self.lost = 0  # reports overwritten before read_next got to them
+        self.state = FastInputState()
+
+        self._report = bytearray(MAX_REPORT_LENGTH)
+        self._length = 0
+
+    @property
+    def published(self) -> int:
+        """Number of reports published so far."""
+        return _COUNT.unpack_from(self._buf, _COUNT_OFFSET)[0]
+
+    @property
+    def report(self) -> memoryview:
+        """The last read raw report, overwritten by the next read."""
+        return memoryview(self._report)[: self._length]
+
+    def _copy(self, sequence: int) -> bool:
+        buf = self._buf
+        position = HEADER.size + (sequence - 1) % self.slots * SLOT.size
+        stamp, timestamp_ns, length = _SLOT_PREFIX.unpack_from(buf, position)
+        if stamp != 2 * sequence:
+            return False  # still being written or already overwritten
+        start = position + _REPORT_OFFSET
+        self._report[:length] = buf[start : start + length]
+        if _COUNT.unpack_from(buf, position)[0] != stamp:
+            return False
+        self._length = length
+        self.sequence = sequence
+        self.timestamp_ns = timestamp_ns
+        return True
+
+    def read_latest(self) -> bool:
+        """
+        Copy the newest report into :attr:`report`.
+
+        Returns:
+            bool: True if it is newer than the last read report
+        """
+        while True:
+            sequence = _COUNT.unpack_from(self._buf, _COUNT_OFFSET)[0]
+            if sequence == self.sequence or sequence == 0:
+                return False
+            if self._copy(sequence):
+                return True
+
+    def read_next(self, timeout: float | None = 0.0, poll_interval: float = 0.0005) -> bool:
+        """
+        Copy the report after the last read one into :attr:`report`, so every report is seen once.
+
+        A subscriber that fell behind by more than the ring size skips to the oldest report still available and
+        counts the skipped ones in :attr:`lost`.
+
+        Args:
+            timeout (float | None, optional): seconds to wait for a new report, 0 returns right away and None waits
+                forever. Defaults to 0.0.
+            poll_interval (float, optional): sleep between checks while waiting, 0 busy waits. Defaults to 0.0005.
+
+        Returns:
+            bool: False if no new report arrived in time
+        """
+        deadline = None
+        while True:
+            published = _COUNT.unpack_from(self._buf, _COUNT_OFFSET)[0]
+            if published > self.sequence:
+                sequence = self.sequence + 1
+                oldest = published - self.slots + 1
+                if sequence < oldest:
+                    self.lost += oldest - sequence
+                    sequence = oldest
+                if self._copy(sequence):
+                    return True
+                # overwritten while copying, the ring moved on; count it and retry with the next one
+                self.lost += 1
+                self.sequence = sequence
+                continue
+
+            if timeout is not None:
+                if deadline is None:
+                    deadline = time.monotonic() + timeout
+                if time.monotonic() >= deadline:
+                    return False
+            if poll_interval:
+                time.sleep(poll_interval)
+
+    def decode(self) -> FastInputState:
+        """
+        Decode the last read report into :attr:`state`.
+
+        Returns:
+            FastInputState: the subscriber's state, updated in place
+        """
+        self.state.from_state(self._report, self.offset)
+        return self.state
+
+    def close(self) -> None:
+        if self._buf is None:
+            return
+        self._buf.release()
+        self._buf = None
+        self._shm.close()
+
+    def __enter__(self) -> "SharedReportSubscriber":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
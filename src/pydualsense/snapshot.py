@@ -0,0 +1,73 @@
+import sys
+
+from .decoder import FastInputState
+
+
+class SnapshotBuffer:
+    """
+    Publishes every decoded report as a snapshot that is never modified afterwards.
+
+    The writer decodes into a buffer that is not published, then swaps the ``latest`` reference, which is atomic for
+    readers. Buffers are recycled once no reader holds a reference to them anymore (checked with the CPython
+    reference count), so a reader can keep a snapshot for as long as it likes and steady state decoding allocates
+    nothing. Only when every spare buffer is still held a fresh one is allocated.
+    """
+
+    def __init__(self, depth: int = 4) -> None:
+        """
+        Args:
+            depth (int, optional): number of preallocated buffers, at least 2. Defaults to 4.
+        """
+        if depth < 2:
+            raise ValueError("depth needs to be at least 2")
+
+        self._ring = [FastInputState() for _ in range(depth)]
+        self._index = 0
+        self._latest = self._ring[0]
+
+        self.version = 0  # number of published reports
+        self.allocations = 0  # buffers replaced because readers still held all spare ones
+
+        # reference count of a buffer that is only referenced by the ring, measured the same way as in publish
+        probe = [object()]
+        self._free_refcount = sys.getrefcount(probe[0])
+
+    def latest(self) -> FastInputState:
+        """
+        Returns:
+            FastInputState: the last published snapshot, it must be treated as read only
+        """
+        return self._latest
+
+    def publish(self, report, offset: int = 0) -> FastInputState:
+        """
+        Decode ``report`` into a spare buffer and make it the latest snapshot.
+
+        Args:
+            report (bytes | bytearray | memoryview): raw input report.
+            offset (int, optional): position of the USB layout inside ``report``, 1 for BT reports. Defaults to 0.
+
+        Returns:
+            FastInputState: the new snapshot
+        """
+        ring = self._ring
+        depth = len(ring)
+        free_refcount = self._free_refcount
+
+        index = self._index
+        for _ in range(depth - 1):
+            index = (index + 1) % depth
+            if sys.getrefcount(ring[index]) <= free_refcount:
+                break
+        else:
+            index = (self._index + 1) % depth
+            ring[index] = FastInputState()
+            self.allocations += 1
+
+        snapshot = ring[index]
+        snapshot.from_state(report, offset)
+
+        self._index = index
+        self._latest = snapshot
+        self.version += 1
+        return snapshot
@@ -0,0 +1,205 @@
+import bisect
+import threading
+import time
+from typing import Any, Callable, Mapping, Sequence
+
+from .models import DeviceOutputState
+
+
+def _lerp(a, b, t: float):
+    if isinstance(a, tuple):
+        return tuple(x + (y - x) * t for x, y in zip(a, b))
+    return a + (b - a) * t
+
+
+def _set_rgb_led(state: DeviceOutputState, value) -> None:
+    led = state.rgb_led
+    led.R, led.G, led.B = value
+
+
+def _set_player_led(state: DeviceOutputState, value) -> None:
+    state.player_led.player_count = value
+
+
+def _set_player_led_brightness(state: DeviceOutputState, value) -> None:
+    state.player_led.brightness = value
+
+
+def _set_left_motor(state: DeviceOutputState, value) -> None:
+    state.left_motor = value
+
+
+def _set_right_motor(state: DeviceOutputState, value) -> None:
+    state.right_motor = value
+
+
+def _set_trigger_left(state: DeviceOutputState, value) -> None:
+    state.triggerL.set_effect(value)
+
+
+def _set_trigger_right(state: DeviceOutputState, value) -> None:
+    state.triggerR.set_effect(value)
+
+
+# animatable outputs: setter and whether values can be interpolated (False holds each keyframe until the next one)
+TARGETS: dict[str, tuple[Callable[[DeviceOutputState, Any], None], bool]] = {
+    "rgb_led": (_set_rgb_led, True),  # (R, G, B) 0-1
+    "player_led": (_set_player_led, False),  # player count 0-4
+    "player_led_brightness": (_set_player_led_brightness, True),  # 0-1
+    "left_motor": (_set_left_motor, True),
+    "right_motor": (_set_right_motor, True),
+    "triggerL": (_set_trigger_left, False),  # raw effects, see force_feedback.effect_*
+    "triggerR": (_set_trigger_right, False),
+}
+
+
+class Track:
+    """Keyframes of one output, sorted by time."""
+
+    __slots__ = ("target", "times", "values", "interpolate", "_apply")
+
+    def __init__(self, target: str, keyframes: Sequence[tuple[float, Any]], interpolate: bool | None = None) -> None:
+        """
+        Args:
+            target (str): output to animate, one of :data:`TARGETS`.
+            keyframes (Sequence[tuple[float, Any]]): (seconds since the clip start, value) pairs.
+            interpolate (bool | None, optional): interpolate linearly between keyframes instead of holding each
+                value until the next keyframe. Defaults to None, which interpolates where the target allows it.
+
+        Raises:
+            ValueError: unknown target, no keyframes or interpolation of a target that only steps
+        """
+        if target not in TARGETS:
+            raise ValueError(f"Unknown timeline target {target!r}, expected one of {', '.join(TARGETS)}")
+        if not keyframes:
+            raise ValueError("A track needs at least one keyframe")
+        apply, interpolatable = TARGETS[target]
+        if interpolate and not interpolatable:
+            raise ValueError(f"Timeline target {target!r} can not be interpolated")
+
+        keyframes = sorted(keyframes, key=lambda keyframe: keyframe[0])
+        self.target = target
+        self.times = [float(keyframe[0]) for keyframe in keyframes]
+        self.values = [keyframe[1] for keyframe in keyframes]
+        self._apply = apply
+        self.interpolate = interpolatable if interpolate is None else interpolate
+
+    @property
+    def duration(self) -> float:
+        return self.times[-1]
+
+    def value_at(self, t: float) -> Any:
+        times = self.times
+        index = bisect.bisect_right(times, t)
+        if index == 0:
+            return self.values[0]
+        if index == len(times) or not self.interpolate:
+            return self.values[index - 1]
+        start, end = times[index - 1], times[index]
+        return _lerp(self.values[index - 1], self.values[index], (t - start) / (end - start))
+
+    def apply(self, state: DeviceOutputState, t: float) -> None:
+        self._apply(state, self.value_at(t))
+
+
+class Clip:
+    """
+    A set of tracks played together.
+
+    .. code-block:: python
+
+        fade = Clip({"rgb_led": [(0.0, (1, 0, 0)), (0.5, (0, 0, 1))], "right_motor": [(0.0, 1.0), (0.2, 0.0)]})
+        controller.play(fade)
+    """
+
+    def __init__(
+        self,
+        tracks: Mapping[str, Sequence[tuple[float, Any]] | Track],
+        loop: bool = False,
+        duration: float | None = None,
+    ) -> None:
+        """
+        Args:
+            tracks (Mapping[str, Sequence[tuple[float, Any]] | Track]): keyframes or a :class:`Track` per target.
+            loop (bool, optional): restart after ``duration`` until stopped. Defaults to False.
+            duration (float | None, optional): length in seconds. Defaults to None, the last keyframe.
+
+        Raises:
+            ValueError: no tracks
+        """
+        if not tracks:
+            raise ValueError("A clip needs at least one track")
+        self.tracks = [track if isinstance(track, Track) else Track(target, track) for target, track in tracks.items()]
+        self.loop = loop
+        self.duration = max(track.duration for track in self.tracks) if duration is None else duration
+
+
+class Timeline:
+    """
+    Plays clips into an output state, evaluated once per output report.
+
+    Any number of clips can play at once; where clips animate the same output, the one started last wins. A
+    finished clip leaves its last values in place and is removed, so an idle timeline costs one check per report.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._playing: tuple[tuple[Clip, float], ...] = ()  # (clip, start time), replaced instead of mutated
+
+    @property
+    def active(self) -> bool:
+        return bool(self._playing)
+
+    def play(self, clip: Clip, start: float | None = None) -> Clip:
+        """
+        Args:
+            clip (Clip): clip to start.
+            start (float | None, optional): ``time.monotonic()`` of the clip start. Defaults to None, now.
+
+        Returns:
+            Clip: the clip, to :func:`stop` it later
+        """
+        if start is None:
+            start = time.monotonic()
+        with self._lock:
+            self._playing = self._playing + ((clip, start),)
+        return clip
+
+    def stop(self, clip: Clip) -> None:
+        """Stop a clip, the outputs keep their current values."""
+        with self._lock:
+            self._playing = tuple(entry for entry in self._playing if entry[0] is not clip)
+
+    def stop_all(self) -> None:
+        with self._lock:
+            self._playing = ()
+
+    def apply(self, state: DeviceOutputState, now: float | None = None) -> bool:
+        """
+        Write the values of all playing clips at ``now`` into ``state``.
+
+        Returns:
+            bool: True if clips are still playing afterwards
+        """
+        playing = self._playing
+        if not playing:
+            return False
+        if now is None:
+            now = time.monotonic()
+
+        finished = []
+        for clip, start in playing:
+            t = now - start
+            if t >= clip.duration:
+                if clip.loop and clip.duration > 0:
+                    t %= clip.duration
+                else:
+                    t = clip.duration
+                    finished.append(clip)
+            for track in clip.tracks:
+                track.apply(state, t)
+
+        if finished:
+            with self._lock:
+                self._playing = tuple(entry for entry in self._playing if entry[0] not in finished)
+        return bool(self._playing)
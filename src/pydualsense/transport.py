@@ -0,0 +1,232 @@
+import os
+import pathlib
+import select
+import sys
+from typing import TYPE_CHECKING, Any
+
+from .enums import ConnectionType
+
+if TYPE_CHECKING:
+    import hidapi
+
+_hidapi: Any = None
+
+
+def load_hidapi() -> Any:
+    """
+    Import hidapi on first use, so the package can be imported (and driven by a virtual device) without the
+    native hidapi library being installed.
+    """
+    global _hidapi
+    if _hidapi is None:
+        if sys.platform.startswith("win") and sys.version_info >= (3, 8):
+            os.add_dll_directory(str(pathlib.Path(__file__).parent.absolute()))
+
+        import hidapi
+
+        _hidapi = hidapi
+    return _hidapi
+
+
+class Transport:
+    """
+    Connection to one controller.
+
+    ``read`` follows the hidapi conventions: the first byte is the report id, a ``timeout_ms`` of -1 blocks until a
+    report arrives, 0 returns immediately and None is returned when no report arrived in time.
+    """
+
+    path: bytes | str | None = None
+    serial_number: str | None = None
+    connection_type: ConnectionType | None = None  # None if it has to be determined from the reports
+
+    def read(self, length: int, timeout_ms: int = -1) -> bytes | None:
+        raise NotImplementedError
+
+    def write(self, data: bytes) -> int:
+        raise NotImplementedError
+
+    def get_feature_report(self, report_id: int, length: int) -> bytes:
+        raise NotImplementedError
+
+    def send_feature_report(self, data: bytes, report_id: int) -> None:
+        raise NotImplementedError
+
+    def fileno(self) -> int | None:
+        """
+        Returns:
+            int | None: file descriptor that becomes readable with every report, None if there is none
+        """
+        return None
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class HidapiTransport(Transport):
+    """Controller opened through the hidapi library."""
+
+    def __init__(self, device_info: "hidapi.DeviceInfo") -> None:
+        hidapi = load_hidapi()
+        self.path = device_info.path
+        self.serial_number = device_info.serial_number
+        self.connection_type = connection_type_from_info(device_info)
+        self.device = hidapi.Device(path=device_info.path, blocking=False)
+
+    def read(self, length: int, timeout_ms: int = -1) -> bytes | None:
+        if timeout_ms < 0:
+            return self.device.read(length, blocking=True)
+        # the device is opened non-blocking, so a plain read returns right away
+        return self.device.read(length, timeout_ms=timeout_ms)
+
+    def write(self, data: bytes) -> int:
+        self.device.write(data)
+        return len(data)
+
+    def get_feature_report(self, report_id: int, length: int) -> bytes:
+        return self.device.get_feature_report(report_id, length)
+
+    def send_feature_report(self, data: bytes, report_id: int) -> None:
+        self.device.send_feature_report(data, report_id)
+
+    def close(self) -> None:
+        self.device.close()
+
+
+def _hidraw_ioctl(nr: int, length: int) -> int:
+    # _IOC(_IOC_READ | _IOC_WRITE, 'H', nr, length)
+    return (3 << 30) | (length << 16) | (ord("H") << 8) | nr
+
+
+class HidrawTransport(Transport):
+    """
+    Linux hidraw node opened non-blocking.
+
+    Its file descriptor can be watched by a selector or an event loop, so no thread has to block in a read.
+    """
+
+    def __init__(
+        self, path: bytes | str, serial_number: str | None = None, connection_type: ConnectionType | None = None
+    ) -> None:
+        self.path = path
+        self.serial_number = serial_number
+        self.connection_type = connection_type if connection_type is not None else _hidraw_connection_type(path)
+        self.fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def read(self, length: int, timeout_ms: int = -1) -> bytes | None:
+        try:
+            return os.read(self.fd, length)
+        except BlockingIOError:
+            if timeout_ms == 0:
+                return None
+
+        timeout = None if timeout_ms < 0 else timeout_ms / 1000
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return None
+        try:
+            return os.read(self.fd, length)
+        except BlockingIOError:
+            return None
+
+    def write(self, data: bytes) -> int:
+        return os.write(self.fd, data)
+
+    def get_feature_report(self, report_id: int, length: int) -> bytes:
+        import fcntl
+
+        buffer = bytearray(length + 1)
+        buffer[0] = report_id
+        fcntl.ioctl(self.fd, _hidraw_ioctl(0x07, len(buffer)), buffer, True)  # HIDIOCGFEATURE
+        return bytes(buffer[1:])
+
+    def send_feature_report(self, data: bytes, report_id: int) -> None:
+        import fcntl
+
+        buffer = bytearray([report_id]) + bytes(data)
+        fcntl.ioctl(self.fd, _hidraw_ioctl(0x06, len(buffer)), buffer, True)  # HIDIOCSFEATURE
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def device_id(serial_number: str | None, path: bytes | str) -> str:
+    """
+    Stable id of a controller.
+
+    The serial number reported by the dualsense is its MAC address, which stays the same across USB and BT and
+    across reconnects. The HID path is only used when the platform does not report a serial number.
+    """
+    if serial_number:
+        return serial_number.replace(":", "").replace("-", "").lower()
+    return path.decode() if isinstance(path, bytes) else path
+
+
+def is_hidraw_path(path: bytes | str | None) -> bool:
+    return sys.platform.startswith("linux") and path is not None and os.fsdecode(path).startswith("/dev/hidraw")
+
+
+# bus numbers of linux/input.h and hidapi's hid_bus_type
+_LINUX_BUS = {0x03: ConnectionType.USB, 0x05: ConnectionType.BT}
+_HIDAPI_BUS = {1: ConnectionType.USB, 2: ConnectionType.BT}
+_BT_HID_SERVICE = "00001124-0000-1000-8000-00805f9b34fb"  # part of Windows paths of bluetooth HID devices
+
+
+def _hidraw_connection_type(path: bytes | str) -> ConnectionType | None:
+    """Bus of a hidraw node from sysfs, e.g. HID_ID=0005:0000054C:00000CE6 for bluetooth."""
+    if not is_hidraw_path(path):
+        return None
+    name = os.path.basename(os.fsdecode(path))
+    try:
+        with open(f"/sys/class/hidraw/{name}/device/uevent") as uevent:
+            for line in uevent:
+                if line.startswith("HID_ID="):
+                    return _LINUX_BUS.get(int(line[7:].split(":")[0], 16))
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def connection_type_from_info(device_info: "hidapi.DeviceInfo") -> ConnectionType | None:
+    """
+    Connection type from enumeration data, so it is known before the controller sent a report.
+
+    Uses the bus type where hidapi reports it, the sysfs entry of Linux hidraw nodes, the bluetooth HID service in
+    Windows paths and finally the USB interface number, which hidapi sets to -1 for devices that are not on USB.
+
+    Returns:
+        ConnectionType | None: the connection type, None if it can not be told from the enumeration data
+    """
+    bus_type = _HIDAPI_BUS.get(getattr(device_info, "bus_type", None))  # type: ignore
+    if bus_type is not None:
+        return bus_type
+
+    path = device_info.path
+    if is_hidraw_path(path):
+        return _hidraw_connection_type(path)
+    if path is not None and _BT_HID_SERVICE in os.fsdecode(path).lower():
+        return ConnectionType.BT
+
+    interface_number = getattr(device_info, "interface_number", None)
+    if interface_number is None:
+        return None
+    return ConnectionType.USB if interface_number >= 0 else ConnectionType.BT
+
+
+def open_transport(device_info: "hidapi.DeviceInfo", prefer_hidraw: bool = False) -> Transport:
+    """
+    Open an enumerated controller.
+
+    Args:
+        device_info (hidapi.DeviceInfo): entry of :func:`find_devices <pydualsense.pydualsense.find_devices>`.
+        prefer_hidraw (bool, optional): open Linux hidraw nodes directly, which gives a pollable file descriptor.
+            Defaults to False.
+
+    Returns:
+        Transport: the opened controller
+    """
+    if prefer_hidraw and is_hidraw_path(device_info.path):
+        return HidrawTransport(device_info.path, device_info.serial_number, connection_type_from_info(device_info))
+    return HidapiTransport(device_info)
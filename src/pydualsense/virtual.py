@@ -0,0 +1,168 @@
+import collections
+import time
+
+from .checksum import BT_INPUT_SEED, CRC_OFFSET, compute_fast, verify_output
+from .decoder import REPORT_OFFSET, REPORT_STRUCT
+from .enums import Axis, Button, ConnectionType
+from .transport import Transport
+
+# Button.Dpad* bits -> dpad hat value, 8 is released
+_DPAD_HAT = [8] * 16
+for _hat, _mask in enumerate((0x1, 0x9, 0x8, 0xA, 0x2, 0x6, 0x4, 0x5)):
+    _DPAD_HAT[_mask] = _hat
+
+# sensor timestamp ticks per second
+_SENSOR_CLOCK = 3_000_000
+
+
+class VirtualDualsense(Transport):
+    """
+    In-process dualsense for tests and benchmarks without hardware.
+
+    Input reports are generated in USB or BT format at ``rate_hz`` from the values set with :func:`press`,
+    :func:`set_axis` and friends. Written output reports are kept in :attr:`output_reports`; BT reports with a
+    wrong CRC are counted in :attr:`output_crc_errors`.
+
+    .. code-block:: python
+
+        controller = DualsenseController(transport=VirtualDualsense(ConnectionType.BT))
+    """
+
+    def __init__(
+        self,
+        connection_type: ConnectionType = ConnectionType.USB,
+        rate_hz: float | None = 250.0,
+        serial_number: str = "00:00:00:00:00:00",
+        max_output_reports: int = 1024,
+    ) -> None:
+        """
+        Args:
+            connection_type (ConnectionType, optional): report format to generate. Defaults to ConnectionType.USB.
+            rate_hz (float | None, optional): input report rate, None generates reports as fast as they are read.
+                Defaults to 250.0.
+            serial_number (str, optional): reported serial number. Defaults to "00:00:00:00:00:00".
+            max_output_reports (int, optional): written output reports that are kept. Defaults to 1024.
+        """
+        self.connection_type = connection_type
+        self.rate_hz = rate_hz
+        self.path = f"virtual:{serial_number}"
+        self.serial_number = serial_number
+
+        self.sticks = [128, 128, 128, 128]  # raw LX, LY, RX, RY
+        self.triggers = [0, 0]  # raw L2, R2
+        self.buttons = Button(0)
+        self.gyro = [0, 0, 0]
+        self.accel = [0, 8192, 0]
+        self.touch = [0x80, 0x80]  # raw touch words, see decoder
+        self.battery = 0x08  # discharging, 85%
+        self.sequence = 0
+        self.sensor_timestamp = 0
+
+        self.feature_reports: dict[int, bytes] = {}
+        self.output_reports: collections.deque[bytes] = collections.deque(maxlen=max_output_reports)
+        self.output_crc_errors = 0
+        self.reports_sent = 0
+
+        self._report = bytearray(connection_type.get_in_report_length())
+        self._report[0] = 0x31 if connection_type == ConnectionType.BT else 0x01
+        self._offset = 1 if connection_type == ConnectionType.BT else 0
+        self._next_due: float | None = None
+        self._closed = False
+
+    # input
+
+    def press(self, button: Button) -> None:
+        self.buttons |= button
+
+    def release(self, button: Button) -> None:
+        self.buttons &= ~button
+
+    def set_axis(self, axis: Axis, value: int) -> None:
+        """
+        Args:
+            axis (Axis): stick or trigger axis.
+            value (int): raw value 0-255, sticks rest at 128.
+        """
+        if axis >= Axis.L2:
+            self.triggers[axis - Axis.L2] = value
+        else:
+            self.sticks[axis - Axis.LeftX] = value
+
+    def set_touch(self, index: int, x: int, y: int, touch_id: int = 0) -> None:
+        self.touch[index] = (touch_id & 0x7F) | ((x & 0x0FFF) << 8) | ((y & 0x0FFF) << 20)
+
+    def lift_touch(self, index: int) -> None:
+        self.touch[index] |= 0x80
+
+    # transport
+
+    def read(self, length: int, timeout_ms: int = -1) -> bytes | None:
+        if self._closed:
+            raise OSError("Trying to perform action on closed device.")
+
+        if self.rate_hz:
+            period = 1 / self.rate_hz
+            now = time.monotonic()
+            if self._next_due is None or self._next_due < now - 64 * period:
+                # first read or the reader fell far behind, like the device buffer we only keep recent reports
+                self._next_due = now
+            wait = self._next_due - now
+            if wait > 0:
+                if 0 <= timeout_ms < wait * 1000:
+                    time.sleep(timeout_ms / 1000)
+                    return None
+                time.sleep(wait)
+            self._next_due += period
+            self.sensor_timestamp += int(period * _SENSOR_CLOCK)
+        else:
+            self.sensor_timestamp += _SENSOR_CLOCK // 1000
+
+        report = self._build()
+        self.reports_sent += 1
+        return report[:length]
+
+    def write(self, data: bytes) -> int:
+        if self._closed:
+            raise OSError("Trying to perform action on closed device.")
+        data = bytes(data)
+        self.output_reports.append(data)
+        if data[0] == 0x31 and not verify_output(data):
+            self.output_crc_errors += 1
+        return len(data)
+
+    def get_feature_report(self, report_id: int, length: int) -> bytes:
+        if report_id not in self.feature_reports:
+            raise OSError(f"Failed to get feature report 0x{report_id:02X}")
+        return self.feature_reports[report_id][:length].ljust(length, b"\x00")
+
+    def send_feature_report(self, data: bytes, report_id: int) -> None:
+        self.feature_reports[report_id] = bytes(data)
+
+    def close(self) -> None:
+        self._closed = True
+
+    def _build(self) -> bytes:
+        report = self._report
+        buttons = int(self.buttons)
+        self.sequence = (self.sequence + 1) & 0xFF
+
+        REPORT_STRUCT.pack_into(
+            report,
+            self._offset + REPORT_OFFSET,
+            *self.sticks,
+            *self.triggers,
+            self.sequence,
+            (buttons & 0xF0) | _DPAD_HAT[buttons & 0x0F],
+            (buttons >> 8) & 0xFF,
+            (buttons >> 16) & 0xFF,
+            *self.gyro,
+            *self.accel,
+            self.sensor_timestamp & 0xFFFFFFFF,
+            *self.touch,
+            self.battery,
+        )
+
+        if self.connection_type == ConnectionType.BT:
+            crc = compute_fast(report, BT_INPUT_SEED)
+            report[CRC_OFFSET : CRC_OFFSET + 4] = crc.to_bytes(4, "little")
+        return bytes(report)
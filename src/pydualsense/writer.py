@@ -0,0 +1,175 @@
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from .instrumentation import ENCODE, WRITE, ReportStats
+from .models import DeviceOutputState
+from .output_report import OutputReport
+from .timeline import Timeline
+from .transport import Transport
+
+if TYPE_CHECKING:
+    from .rumble import RumbleStream
+
+
+class OutputWriter:
+    """
+    Writes output reports from its own thread, at most ``max_rate_hz`` times per second.
+
+    :func:`notify` only marks the output as pending, so the report thread never waits for a slow write. All changes
+    made to the output state until the writer gets to run are coalesced into one report of the latest state; urgent
+    notifications (e.g. stopping the rumble) skip the remaining rate limit delay.
+
+    A failed write (other than a full device buffer) stops the thread; the error is kept in :attr:`error` and raised
+    by the following :func:`notify` and :func:`stop` calls.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        output_report: OutputReport,
+        output_state: DeviceOutputState,
+        max_rate_hz: float = 125.0,
+        timeline: Timeline | None = None,
+        lock: "threading.Lock | None" = None,
+    ) -> None:
+        """
+        Args:
+            transport (Transport): device to write to.
+            output_report (OutputReport): cached report, also decides whether a write is needed at all.
+            output_state (DeviceOutputState): state to send.
+            max_rate_hz (float, optional): maximum number of writes per second. Defaults to 125.0.
+            timeline (Timeline | None, optional): clips evaluated before every write; while clips are playing the
+                writer ticks at ``max_rate_hz`` on its own. Defaults to None.
+            lock (threading.Lock | None, optional): held while the report is encoded and written, shared with other
+                threads writing the same ``output_report``. Defaults to None, a lock of its own.
+        """
+        self.transport = transport
+        self.output_report = output_report
+        self.output_state = output_state
+        self.max_rate_hz = max_rate_hz
+        self.timeline = timeline
+        self.lock = lock if lock is not None else threading.Lock()
+
+        self.writes = 0
+        self.coalesced = 0  # notifications folded into a later write
+        self.stats: ReportStats | None = None  # times encode and write when set
+        self.rumble: "RumbleStream | None" = None  # streamed motor samples, one per write
+        self.error: OSError | None = None  # why the thread stopped writing, e.g. the device was unplugged
+
+        self._cond = threading.Condition()
+        self._pending = False
+        self._urgent = False
+        self._stop = False
+        self._last_tick = 0.0
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop = False
+            self._thread = threading.Thread(target=self.write_task, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the thread after it wrote what is pending.
+
+        Raises:
+            OSError: a write failed, see :attr:`error`
+        """
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.error is not None:
+            raise self.error
+
+    def notify(self, urgent: bool = False) -> None:
+        """
+        Schedule a write of the current output state.
+
+        Args:
+            urgent (bool, optional): write as soon as possible, ignoring the rate limit. Defaults to False.
+
+        Raises:
+            OSError: a write failed and the thread stopped, see :attr:`error`
+        """
+        if self.error is not None:
+            raise self.error
+        with self._cond:
+            if self._pending:
+                self.coalesced += 1
+            self._pending = True
+            if urgent:
+                self._urgent = True
+            self._cond.notify()
+
+    def write_task(self) -> None:
+        """background thread writing the output reports"""
+        interval = 1 / self.max_rate_hz
+        cond = self._cond
+
+        while True:
+            with cond:
+                # without pending changes, playing clips or a rumble stream only wake up for the keep-alive resend
+                if not self._pending and not self._stop and not self._animated():
+                    cond.wait(self.output_report.keepalive_interval)
+
+                if not self._urgent and not self._stop:
+                    delay = self._last_tick + interval - time.monotonic()
+                    if delay > 0:
+                        cond.wait_for(lambda: self._urgent or self._stop, delay)
+
+                stop = self._stop
+                self._pending = False
+                self._urgent = False
+
+            self._write()
+            if stop or self.error is not None:
+                return
+
+    def _animated(self) -> bool:
+        """True while the output changes on its own, so the writer has to tick at its rate"""
+        timeline, rumble = self.timeline, self.rumble
+        return (timeline is not None and timeline.active) or (rumble is not None and rumble.active)
+
+    def _write(self) -> None:
+        with self.lock:
+            self._write_locked()
+
+    def _write_locked(self) -> None:
+        now = time.monotonic()
+        # stay on the tick grid while writes follow each other, so streamed samples are not slowly drifting behind
+        tick = self._last_tick + 1 / self.max_rate_hz
+        self._last_tick = tick if 0 <= now - tick < 1 / self.max_rate_hz else now
+        timeline = self.timeline
+        if timeline is not None and timeline.active:
+            timeline.apply(self.output_state, now)
+        rumble = self.rumble
+        if rumble is not None and rumble.active:
+            rumble.apply(self.output_state, now)
+
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter_ns()
+
+        report = self.output_report.poll(self.output_state, now)
+        if stats is not None:
+            encoded = time.perf_counter_ns()
+            stats.add(ENCODE, encoded - start)
+        if report is None:
+            return
+        try:
+            self.transport.write(report)
+        except BlockingIOError:
+            self.output_report.invalidate()
+            return
+        except OSError as error:
+            self.output_report.invalidate()
+            self.error = error
+            return
+        self.writes += 1
+        if stats is not None:
+            stats.add(WRITE, time.perf_counter_ns() - encoded)
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from pydualsense import DualsenseController, VirtualDualsense
+from pydualsense.checksum import CRC_OFFSET, compute, compute_fast, verify_input, verify_output
+from pydualsense.enums import ConnectionType
+from pydualsense.models import DeviceOutputState
+
+
+def test_compute_fast_matches_the_table_implementation():
+    rng = random.Random(3)
+    for _ in range(200):
+        report = bytes(rng.randrange(256) for _ in range(78))
+        assert compute_fast(report) == compute(report)
+        assert compute_fast(list(report)) == compute(report)
+
+
+def test_prepared_bt_report_has_a_valid_crc():
+    report = bytes(DeviceOutputState().prepareReport(ConnectionType.BT))
+    assert verify_output(report)
+    assert not verify_input(report)  # input reports use another seed
+
+
+@pytest.mark.parametrize("position", [0, 10, 40, CRC_OFFSET - 1, CRC_OFFSET, 77])
+def test_corrupted_bt_input_report_fails_verification(position):
+    report = bytearray(VirtualDualsense(ConnectionType.BT, rate_hz=None).read(78))
+    assert verify_input(report)
+    report[position] ^= 0x01
+    assert not verify_input(report)
+
+
+def test_truncated_report_fails_verification():
+    report = VirtualDualsense(ConnectionType.BT, rate_hz=None).read(78)
+    assert not verify_input(report[:CRC_OFFSET])
+
+
+def test_controller_drops_bt_input_reports_with_a_bad_crc():
+    device = VirtualDualsense(ConnectionType.BT, rate_hz=None)
+    controller = DualsenseController(transport=device, start_reader=False)
+    try:
+        report = bytearray(device.read(78))
+        report[CRC_OFFSET] ^= 0xFF
+        assert not controller.process_report(report)
+        assert controller.snapshots.version == 0
+        assert controller.process_report(device.read(78))
+        assert controller.snapshots.version == 1
+    finally:
+        controller.close()
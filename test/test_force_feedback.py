@@ -0,0 +1,127 @@
+import itertools
+
+import pytest
+
+from pydualsense import TriggerModes, force_feedback
+from pydualsense.enums import ConnectionType
+from pydualsense.models import DeviceOutputState, TriggerModel
+from pydualsense.output_report import OutputReport
+
+# ffb_* as they were before the effect encoder, the new functions have to return the same forces
+
+
+def _clip(value, min_value, max_value):
+    return max(min(max_value, value), min_value)
+
+
+def _zones(mode, position, value, frequency=None):
+    dst = TriggerModel()
+    zones = 0
+    active_zones = 0
+    for i in range(position, 10):
+        zones |= value << (3 * i)
+        active_zones |= 1 << i
+    dst.mode = mode
+    dst.forces[0] = (active_zones >> 0) & 0xFF
+    dst.forces[1] = (active_zones >> 8) & 0xFF
+    dst.forces[2] = (zones >> 0) & 0xFF
+    dst.forces[3] = (zones >> 8) & 0xFF
+    dst.forces[4] = (zones >> 16) & 0xFF
+    dst.forces[5] = (zones >> 24) & 0xFF
+    if frequency is not None:
+        dst.forces[8] = frequency
+    return dst
+
+
+def _old_feedback(position, strength):
+    return _zones(TriggerModes.FFB_Feedback, _clip(position, 0, 9), _clip(strength, 1, 8) - 1)
+
+
+def _old_weapon(start_position, end_position, strength):
+    dst = TriggerModel()
+    start_position = _clip(start_position, 2, 7)
+    end_position = _clip(end_position, start_position, 8)
+    strength = _clip(strength, 1, 8)
+    start_and_stop_zone = (1 << start_position) | (1 << end_position)
+    dst.mode = TriggerModes.FFB_Weapon
+    dst.forces[0] = (start_and_stop_zone >> 0) & 0xFF
+    dst.forces[1] = (start_and_stop_zone >> 8) & 0xFF
+    dst.forces[2] = strength - 1
+    return dst
+
+
+def _old_vibration(position, amplitude, frequency):
+    return _zones(
+        TriggerModes.FFB_Vibration,
+        _clip(position, 0, 9),
+        (_clip(amplitude, 1, 8) - 1) & 0x07,
+        _clip(frequency, 1, 255),
+    )
+
+
+def _same(new: TriggerModel, old: TriggerModel) -> bool:
+    return new.mode == old.mode and list(new.forces) == list(old.forces)
+
+
+POSITIONS = range(-1, 11)
+STRENGTHS = range(0, 10)
+
+
+def test_off_is_unchanged():
+    old = TriggerModel()
+    old.mode = TriggerModes.FFB_Off
+    assert _same(force_feedback.ffb_off(), old)
+
+
+@pytest.mark.parametrize("position, strength", list(itertools.product(POSITIONS, STRENGTHS)))
+def test_feedback_is_unchanged(position, strength):
+    assert _same(force_feedback.ffb_feedback(position, strength), _old_feedback(position, strength))
+
+
+@pytest.mark.parametrize("start, end", list(itertools.product(POSITIONS, POSITIONS)))
+def test_weapon_is_unchanged(start, end):
+    for strength in STRENGTHS:
+        assert _same(force_feedback.ffb_weapon(start, end, strength), _old_weapon(start, end, strength))
+
+
+@pytest.mark.parametrize("position, amplitude", list(itertools.product(POSITIONS, STRENGTHS)))
+def test_vibration_is_unchanged(position, amplitude):
+    for frequency in (-1, 0, 1, 2, 40, 255, 256):
+        new = force_feedback.ffb_vibration(position, amplitude, frequency)
+        assert _same(new, _old_vibration(position, amplitude, frequency))
+
+
+def test_every_trigger_mode_has_an_effect():
+    # iterating an IntFlag skips the multi bit modes, the legacy names are aliases of the FFB_ values
+    modes = {int(mode) for mode in TriggerModes.__members__.values()}
+    assert {int(mode) for mode in force_feedback.EFFECTS} == modes
+    for mode, effect in force_feedback.EFFECTS.items():
+        if mode in (TriggerModes.Off, TriggerModes.FFB_Off, TriggerModes.Calibration):
+            assert effect()[0] == mode
+
+
+@pytest.mark.parametrize(
+    "model, effect",
+    [
+        (force_feedback.ffb_bow(1, 6, 4, 8), force_feedback.effect_bow(1, 6, 4, 8)),
+        (force_feedback.ffb_galloping(1, 9, 2, 5, 40), force_feedback.effect_galloping(1, 9, 2, 5, 40)),
+        (force_feedback.ffb_machine(1, 9, 3, 7, 5, 3), force_feedback.effect_machine(1, 9, 3, 7, 5, 3)),
+    ],
+)
+def test_ffb_models_hold_the_raw_effect(model, effect):
+    assert len(effect) == force_feedback.EFFECT_LENGTH
+    assert bytes([int(model.mode), *model.forces]) == effect
+
+
+@pytest.mark.parametrize("connection_type", [ConnectionType.USB, ConnectionType.BT])
+def test_effects_are_written_unchanged(connection_type):
+    effect = force_feedback.effect_machine(1, 9, 3, 7, 5, 3)
+    state = DeviceOutputState()
+    state.triggerR.set_effect(effect)
+    state.triggerL = force_feedback.ffb_vibration(2, 5, 40)
+    report = OutputReport(connection_type).poll(state)
+
+    base = 11 if connection_type == ConnectionType.USB else 12
+    assert bytes(report[base : base + 11]) == effect
+    old = _old_vibration(2, 5, 40)
+    assert list(report[base + 11 : base + 22]) == [int(old.mode), *old.forces]
@@ -0,0 +1,45 @@
+import pytest
+
+from pydualsense import VirtualDualsense
+from pydualsense.enums import ConnectionType
+from pydualsense.recording import ReportRecorder, ReportReplayer
+
+
+@pytest.mark.parametrize("connection_type", [ConnectionType.USB, ConnectionType.BT])
+def test_replay_returns_the_recorded_reports(tmp_path, connection_type):
+    device = VirtualDualsense(connection_type, rate_hz=None)
+    reports = [device.read(connection_type.get_in_report_length()) for _ in range(10)]
+    path = str(tmp_path / "capture.dsrc")
+
+    with ReportRecorder(path, connection_type, batch_size=3) as recorder:
+        for index, report in enumerate(reports):
+            recorder.record(report, timestamp_ns=1000 + index)
+
+    with ReportReplayer(path) as replayer:
+        assert replayer.connection_type == connection_type
+        assert len(replayer) == len(reports)
+        assert [(timestamp, bytes(report)) for timestamp, report in replayer] == [
+            (1000 + index, report) for index, report in enumerate(reports)
+        ]
+        assert bytes(replayer[-1]) == reports[-1]
+
+
+def test_record_after_close_is_dropped(tmp_path):
+    path = str(tmp_path / "capture.dsrc")
+    recorder = ReportRecorder(path, ConnectionType.USB)
+    recorder.record(bytes(64))
+    recorder.close()
+    recorder.record(bytes(64))
+    recorder.flush()
+    recorder.close()
+
+    with ReportReplayer(path) as replayer:
+        assert len(replayer) == 1
+
+
+@pytest.mark.parametrize("content", [b"", b"DSRC", b"x" * 100])
+def test_replayer_rejects_other_files(tmp_path, content):
+    path = tmp_path / "capture.dsrc"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        ReportReplayer(str(path))
@@ -0,0 +1,130 @@
+import dataclasses
+import random
+import time
+
+import pytest
+
+from pydualsense import Axis, Button, DualsenseController, FastInputState, TriggerModes, VirtualDualsense
+from pydualsense.checksum import verify_output
+from pydualsense.enums import ConnectionType
+from pydualsense.models import DeviceInputState, DeviceOutputState
+from pydualsense.output_report import OutputReport
+
+CONNECTIONS = [ConnectionType.USB, ConnectionType.BT]
+
+
+def _offset(connection_type: ConnectionType) -> int:
+    return 1 if connection_type == ConnectionType.BT else 0
+
+
+def _virtual(connection_type: ConnectionType) -> VirtualDualsense:
+    device = VirtualDualsense(connection_type, rate_hz=None)
+    device.set_axis(Axis.LeftX, 10)
+    device.set_axis(Axis.LeftY, 200)
+    device.set_axis(Axis.RightX, 30)
+    device.set_axis(Axis.RightY, 255)
+    device.set_axis(Axis.L2, 7)
+    device.set_axis(Axis.R2, 250)
+    device.press(Button.Cross | Button.DpadDown | Button.DpadRight | Button.L1 | Button.R3 | Button.Mic)
+    device.gyro = [100, -200, 300]
+    device.accel = [-5, 6, 7]
+    device.set_touch(0, 1000, 900, 5)
+    device.set_touch(1, 3, 4, 9)
+    device.lift_touch(1)
+    device.battery = 0x17
+    return device
+
+
+@pytest.mark.parametrize("connection_type", CONNECTIONS)
+def test_decoders_agree_with_the_reference_decoder(connection_type):
+    device = _virtual(connection_type)
+    report = device.read(connection_type.get_in_report_length())
+    offset = _offset(connection_type)
+
+    reference = DeviceInputState()
+    reference.from_state(report[offset:])
+    fast = FastInputState()
+    fast.from_state(report, offset)
+    state = DeviceInputState()
+    state.from_fast(fast)
+
+    assert dataclasses.asdict(state) == dataclasses.asdict(reference)
+    assert reference.cross and reference.L1 and reference.right_joystick.pressed and reference.mic
+    assert (reference.dpad.down, reference.dpad.right, reference.dpad.up) == (True, True, False)
+    assert reference.trackPadTouch0.isActive and not reference.trackPadTouch1.isActive
+    assert (reference.trackPadTouch0.X, reference.trackPadTouch0.Y, reference.trackPadTouch0.ID) == (1000, 900, 5)
+
+
+@pytest.mark.parametrize("connection_type", CONNECTIONS)
+def test_controller_decodes_virtual_reports(connection_type):
+    device = _virtual(connection_type)
+    controller = DualsenseController(transport=device, start_reader=False)
+    try:
+        assert controller.process_report(device.read(connection_type.get_in_report_length()))
+        state = controller.input_state
+        assert state.cross and not state.circle
+        assert state.left_joystick.X == pytest.approx((10 - 127) / 127.0)
+
+        device.release(Button.Cross)
+        assert controller.process_report(device.read(connection_type.get_in_report_length()))
+        assert not controller.input_state.cross
+        assert state.cross  # a state that was handed out is not modified afterwards
+    finally:
+        controller.close()
+
+
+def _randomize(state: DeviceOutputState, rng: random.Random) -> None:
+    state.right_motor = rng.random()
+    state.left_motor = rng.random()
+    state.microphone_led = rng.random() < 0.5
+    state.microphone_mute = rng.random() < 0.5
+    for trigger in (state.triggerR, state.triggerL):
+        trigger.mode = rng.choice(list(TriggerModes))
+        trigger.forces = [rng.randrange(256) for _ in range(10)]
+    state.rgb_led.R, state.rgb_led.G, state.rgb_led.B = rng.random(), rng.random(), rng.random()
+
+
+@pytest.mark.parametrize("connection_type", CONNECTIONS)
+def test_output_report_matches_prepare_report(connection_type):
+    rng = random.Random(1)
+    state = DeviceOutputState()
+    state.prepareReport(connection_type)  # the first BT report also initializes the leds
+    output = OutputReport(connection_type)
+    output.poll(DeviceOutputState())
+
+    for _ in range(500):
+        _randomize(state, rng)
+        report = output.poll(state, time.monotonic())
+        expected = bytes(state.prepareReport(connection_type))
+        if report is None:
+            assert bytes(output.buffer) == expected
+        else:
+            assert bytes(report) == expected
+    assert output.poll(state) is None  # unchanged state, nothing to write
+
+
+@pytest.mark.parametrize("connection_type", CONNECTIONS)
+def test_trigger_parameters_use_the_same_layout_on_both_connections(connection_type):
+    state = DeviceOutputState()
+    state.triggerR.set_effect(bytes([0x26, *range(1, 11)]))
+    state.triggerL.set_effect(bytes([0x21, *range(11, 21)]))
+    report = OutputReport(connection_type).poll(state)
+
+    base = 11 + _offset(connection_type)
+    assert list(report[base : base + 11]) == [0x26, *range(1, 11)]
+    assert list(report[base + 11 : base + 22]) == [0x21, *range(11, 21)]
+
+
+def test_controller_writes_bt_reports_with_valid_crc():
+    device = VirtualDualsense(ConnectionType.BT, rate_hz=None)
+    controller = DualsenseController(transport=device, start_reader=False)
+    try:
+        for value in (0.25, 0.5, 1.0):
+            controller.output_state.left_motor = value
+            controller.write_output()
+        assert len(device.output_reports) >= 3
+        assert device.output_crc_errors == 0
+        assert all(verify_output(report) for report in device.output_reports)
+        assert device.output_reports[-1][5] == 255  # left motor, 0-1 scaled to 0-255
+    finally:
+        controller.close()
@@ -0,0 +1,91 @@
+import pytest
+
+from pydualsense import SharedReportPublisher, SharedReportSubscriber
+from pydualsense.enums import ConnectionType
+from pydualsense.shared import HEADER, _SLOT_PREFIX
+
+
+def _report(index: int) -> bytes:
+    return bytes([0x01, index]) + bytes(62)
+
+
+@pytest.fixture
+def ring():
+    publisher = SharedReportPublisher(ConnectionType.USB, slots=4)
+    subscriber = SharedReportSubscriber(publisher.name)
+    yield publisher, subscriber
+    subscriber.close()
+    publisher.close()
+
+
+def test_reports_are_read_in_order(ring):
+    publisher, subscriber = ring
+    assert not subscriber.read_next() and not subscriber.read_latest()
+
+    for index in range(3):
+        publisher.publish(_report(index), timestamp_ns=100 + index)
+    for index in range(3):
+        assert subscriber.read_next()
+        assert subscriber.sequence == index + 1
+        assert subscriber.timestamp_ns == 100 + index
+        assert bytes(subscriber.report) == _report(index)
+    assert not subscriber.read_next()
+    assert subscriber.lost == 0
+
+
+def test_overrun_skips_to_the_oldest_report_and_counts_the_lost_ones(ring):
+    publisher, subscriber = ring
+    for index in range(10):
+        publisher.publish(_report(index))
+
+    assert subscriber.read_next()
+    assert subscriber.sequence == 7 and subscriber.lost == 6
+    assert subscriber.report[1] == 6
+    assert subscriber.read_latest()
+    assert subscriber.sequence == 10 and subscriber.report[1] == 9
+
+
+def test_torn_slot_is_skipped(ring):
+    publisher, subscriber = ring
+    publisher.publish(_report(0))
+    # an odd stamp marks a slot the publisher is still writing
+    _SLOT_PREFIX.pack_into(publisher._buf, HEADER.size, 1, 0, 64)
+    assert not subscriber.read_next()
+    assert subscriber.lost == 1
+
+    publisher.publish(_report(1))
+    assert subscriber.read_next() and subscriber.report[1] == 1
+
+
+def test_decode_uses_the_connection_offset():
+    with SharedReportPublisher(ConnectionType.BT, slots=2) as publisher:
+        with SharedReportSubscriber(publisher.name) as subscriber:
+            assert subscriber.offset == 1
+            report = bytearray(78)
+            report[0] = 0x31
+            report[2] = 255  # left stick x, behind the report id and the BT header byte
+            publisher.publish(report)
+            assert subscriber.read_next()
+            assert subscriber.decode().left_x == pytest.approx((255 - 127) / 127.0)
+
+
+def test_publish_after_close_is_dropped():
+    publisher = SharedReportPublisher(ConnectionType.USB, slots=2)
+    publisher.close()
+    publisher.publish(_report(0))
+    assert publisher.count == 0
+    publisher.close()  # closing twice is fine
+
+
+def test_subscriber_keeps_its_mapping_after_the_publisher_closed():
+    publisher = SharedReportPublisher(ConnectionType.USB, slots=2)
+    subscriber = SharedReportSubscriber(publisher.name)
+    publisher.publish(_report(5))
+    publisher.close()
+
+    assert subscriber.published == 1
+    assert subscriber.read_latest() and subscriber.report[1] == 5
+    subscriber.close()
+
+    with pytest.raises(FileNotFoundError):
+        SharedReportSubscriber(publisher.name)
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from pydualsense import DualsenseController, VirtualDualsense
+from pydualsense.enums import ConnectionType
+from pydualsense.models import DeviceOutputState
+from pydualsense.output_report import OutputReport
+from pydualsense.writer import OutputWriter
+
+
+class _FlakyDevice(VirtualDualsense):
+    """fails the next writes with the given errors"""
+
+    def __init__(self, *errors: OSError) -> None:
+        super().__init__(ConnectionType.USB, rate_hz=None)
+        self.errors = list(errors)
+
+    def write(self, data: bytes) -> int:
+        if self.errors:
+            raise self.errors.pop(0)
+        return super().write(data)
+
+
+def _writer(device: VirtualDualsense, max_rate_hz: float = 1000.0) -> tuple[OutputWriter, DeviceOutputState]:
+    state = DeviceOutputState()
+    writer = OutputWriter(device, OutputReport(device.connection_type), state, max_rate_hz=max_rate_hz)
+    writer.start()
+    return writer, state
+
+
+def test_stop_writes_the_pending_state():
+    device = VirtualDualsense(rate_hz=None)
+    writer, state = _writer(device, max_rate_hz=1.0)
+    state.left_motor = 1.0
+    writer.notify()
+    state.right_motor = 1.0
+    writer.notify()
+    writer.stop()
+
+    assert device.output_reports[-1][3:5] == b"\xff\xff"
+    assert writer.error is None
+
+
+def test_notifications_are_coalesced():
+    device = VirtualDualsense(rate_hz=None)
+    writer, state = _writer(device, max_rate_hz=10.0)
+    for value in range(20):
+        state.left_motor = value / 20
+        writer.notify()
+    writer.stop()
+
+    assert writer.writes < 20
+    assert writer.coalesced > 0
+    assert device.output_reports[-1][4] == int(19 / 20 * 255)
+
+
+def test_full_device_buffer_retries_with_the_next_write():
+    device = _FlakyDevice(BlockingIOError())
+    writer, state = _writer(device)
+    state.left_motor = 0.5
+    writer.notify(urgent=True)
+    deadline = time.monotonic() + 1.0
+    while device.errors and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert not device.errors
+    writer.notify(urgent=True)  # nothing changed, but the failed report is sent again
+    writer.stop()
+
+    assert writer.error is None
+    assert device.output_reports[-1][4] == int(0.5 * 255)
+
+
+def test_failed_write_stops_the_writer_and_is_raised():
+    error = OSError("unplugged")
+    device = _FlakyDevice(error)
+    writer, state = _writer(device)
+    state.left_motor = 0.5
+    writer.notify(urgent=True)
+    writer._thread.join(1.0)
+
+    assert writer.error is error
+    assert not writer._thread.is_alive()
+    with pytest.raises(OSError):
+        writer.notify()
+    with pytest.raises(OSError):
+        writer.stop()
+
+
+def test_controller_close_raises_the_write_error_and_closes_the_device():
+    device = _FlakyDevice(OSError("unplugged"))
+    controller = DualsenseController(transport=device, start_reader=False, output_rate=1000.0)
+    controller.output_state.left_motor = 0.5
+    controller.update_output(urgent=True)
+    controller.output_writer._thread.join(1.0)
+
+    with pytest.raises(OSError):
+        controller.update_output()
+    with pytest.raises(OSError):
+        controller.close()
+    assert controller.device is None
+    controller.close()